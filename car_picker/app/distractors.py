@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import math
+import random
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .models import CarEntry, Difficulty, DistractorMode, QuizOption
+from .neighbors import NEIGHBOR_COUNT, FeatureScale, ModelKey, Vector, model_vectors, nearest_neighbors, nearest_to
+from .payloads import encode_option
+
+if TYPE_CHECKING:
+    from .indexer import CarDataset
+
+
+def format_label(make: str, model: str, year: str, difficulty: Difficulty) -> str:
+    if difficulty is Difficulty.MAKE:
+        return make
+    if difficulty is Difficulty.MAKE_MODEL:
+        return f"{make} {model}"
+    return f"{make} {model} {year}"
+
+
+def _build_option(make: str, model: str, year: str, difficulty: Difficulty) -> QuizOption:
+    label = format_label(make, model, year, difficulty)
+    if difficulty is Difficulty.MAKE:
+        return QuizOption(make=make, label=label)
+    if difficulty is Difficulty.MAKE_MODEL:
+        return QuizOption(make=make, model=model, label=label)
+    return QuizOption(make=make, model=model, year=year, label=label)
+
+
+class DistractorPools:
+    """난이도별로 라벨 중복을 제거한 보기 풀.
+
+    인덱싱 시점에 제조사, (제조사, 모델) 단위 풀을 만들어 두고, 출제할 때는
+    필요한 개수만큼만 부분 Fisher–Yates로 뽑는다. 사양이 비슷한 모델(k-최근접 이웃)
+    목록도 모델마다 미리 계산해 두어 어려운 보기 모드에서 바로 꺼내 쓴다.
+    """
+
+    def __init__(self) -> None:
+        self._options: Dict[Difficulty, Dict[str, QuizOption]] = {
+            difficulty: {} for difficulty in Difficulty
+        }
+        self._by_make: Dict[Difficulty, Dict[str, List[QuizOption]]] = {
+            Difficulty.MAKE_MODEL: {},
+            Difficulty.MAKE_MODEL_YEAR: {},
+        }
+        self._by_make_model: Dict[ModelKey, List[QuizOption]] = {}
+        self._variant_years: Dict[ModelKey, List[str]] = {}
+        self._global: Dict[Difficulty, List[QuizOption]] = {}
+        # 이웃 표: 모델마다 특징 벡터와 가까운 순서의 이웃 모델, 벡터의 표준화 기준
+        self._vectors: Dict[ModelKey, Vector] = {}
+        self._neighbors: Dict[ModelKey, List[ModelKey]] = {}
+        self._scale: Optional[FeatureScale] = None
+        self._similar: Dict[Difficulty, Dict[ModelKey, List[QuizOption]]] = {
+            Difficulty.MAKE: {},
+            Difficulty.MAKE_MODEL: {},
+        }
+        self._encoded: Dict[Difficulty, Dict[str, bytes]] = {difficulty: {} for difficulty in Difficulty}
+
+    @classmethod
+    def build(cls, dataset: "CarDataset") -> "DistractorPools":
+        """모든 모델로 보기 풀과 이웃 표를 만든다."""
+        pools = cls()
+        for make, model, years in dataset.iter_make_model_years():
+            pools._add_model(make, model, years)
+        pools._global = {
+            difficulty: list(options.values()) for difficulty, options in pools._options.items()
+        }
+        keys, vectors, pools._scale = model_vectors(dataset)
+        pools._vectors = dict(zip(keys, vectors))
+        pools._neighbors = {
+            key: [keys[index] for index in indices] for key, indices in zip(keys, nearest_neighbors(vectors))
+        }
+        pools._set_similar(keys)
+        return pools
+
+    def updated(self, dataset: "CarDataset", pairs: Iterable[ModelKey]) -> "DistractorPools":
+        """행이 추가/삭제된 (제조사, 모델)만 반영한 새 풀. 이 인스턴스는 변경하지 않는다.
+
+        표준화 기준은 그대로 두고, 벡터가 바뀐 모델의 이웃만 새로 계산한다. 다른 모델의
+        이웃 목록에서는 바뀐 모델을 빼고, 새 벡터가 더 가까우면 끼워 넣는다.
+        """
+        pairs = list(pairs)
+        pools = DistractorPools.__new__(DistractorPools)
+        pools._options = {difficulty: dict(options) for difficulty, options in self._options.items()}
+        pools._by_make = {difficulty: dict(groups) for difficulty, groups in self._by_make.items()}
+        pools._by_make_model = dict(self._by_make_model)
+        pools._variant_years = dict(self._variant_years)
+        pools._similar = {difficulty: dict(similar) for difficulty, similar in self._similar.items()}
+        pools._encoded = self._encoded
+        pools._vectors, pools._neighbors, pools._scale = self._vectors, self._neighbors, self._scale
+
+        # 이전 버전과 공유하는 그룹 목록은 수정하지 않고 복사한다.
+        for make in {make for make, _ in pairs}:
+            for groups in pools._by_make.values():
+                if make in groups:
+                    groups[make] = list(groups[make])
+        for pair in pairs:
+            pools._remove_model(pair, gone=not dataset.rows_by_make_model(*pair))
+        for make, model in pairs:
+            rows = dataset.rows_by_make_model(make, model)
+            if rows:
+                years = sorted({dataset.columns.years[row] for row in rows})
+                pools._add_model(make, model, [f"{year:04d}" for year in years])
+            elif not dataset.rows_by_make(make):
+                pools._options[Difficulty.MAKE].pop(make, None)
+        for groups in pools._by_make.values():
+            for make in [make for make, options in groups.items() if not options]:
+                del groups[make]
+        pools._global = {
+            difficulty: list(options.values()) for difficulty, options in pools._options.items()
+        }
+        pools._update_neighbors(dataset, pairs)
+        return pools
+
+    def _add_model(self, make: str, model: str, years: Sequence[str]) -> None:
+        self._add(Difficulty.MAKE, make, model, "", None)
+        self._add(Difficulty.MAKE_MODEL, make, model, "", make)
+        variants = self._by_make_model.setdefault((make, model), [])
+        for year in years:
+            option = self._add(Difficulty.MAKE_MODEL_YEAR, make, model, year, make)
+            if option is not None:
+                variants.append(option)
+        self._variant_years[(make, model)] = [option.year or "" for option in variants]
+
+    def _remove_model(self, pair: ModelKey, gone: bool) -> None:
+        """모델의 연식 보기를 뺀다. `gone`이면 모델 보기도 뺀다."""
+        make, model = pair
+        removed = [(Difficulty.MAKE_MODEL_YEAR, option.label) for option in self._by_make_model.pop(pair, ())]
+        self._variant_years.pop(pair, None)
+        if gone:
+            removed.append((Difficulty.MAKE_MODEL, format_label(make, model, "", Difficulty.MAKE_MODEL)))
+        for difficulty, label in removed:
+            option = self._options[difficulty].pop(label, None)
+            group = self._by_make[difficulty].get(make)
+            if option is not None and group is not None:
+                group[:] = [other for other in group if other is not option]
+
+    def _update_neighbors(self, dataset: "CarDataset", pairs: Sequence[ModelKey]) -> None:
+        keys, vectors, _ = model_vectors(dataset, self._scale, pairs)
+        fresh = dict(zip(keys, vectors))
+        changed = {pair for pair in pairs if fresh.get(pair) != self._vectors.get(pair)}
+        if not changed:
+            return
+        table = {key: vector for key, vector in self._vectors.items() if key not in changed}
+        added = [pair for pair in pairs if pair in changed and pair in fresh]
+        table.update((pair, fresh[pair]) for pair in added)
+
+        dist = math.dist
+        neighbors: Dict[ModelKey, List[ModelKey]] = {}
+        touched = []
+        for key, near in self._neighbors.items():
+            if key in changed:
+                continue
+            kept = [other for other in near if other not in changed]
+            if added or len(kept) != len(near):
+                # 삭제된 이웃 자리는 비워 두고 다음 전체 재구성 때 채운다.
+                vector = table[key]
+                candidates = kept + [pair for pair in added if pair != key]
+                kept = sorted(candidates, key=lambda other: dist(vector, table[other]))[:NEIGHBOR_COUNT]
+                if kept != near:
+                    touched.append(key)
+            neighbors[key] = kept
+        for pair in added:
+            neighbors[pair] = nearest_to(pair, table)
+            touched.append(pair)
+        for similar in self._similar.values():
+            for pair in changed:
+                similar.pop(pair, None)
+        self._vectors, self._neighbors = table, neighbors
+        self._set_similar(touched)
+
+    def _set_similar(self, keys: Iterable[ModelKey]) -> None:
+        make_options = self._options[Difficulty.MAKE]
+        model_options = self._options[Difficulty.MAKE_MODEL]
+        for make, model in keys:
+            similar = self._neighbors[(make, model)]
+            self._similar[Difficulty.MAKE_MODEL][(make, model)] = [
+                model_options[format_label(other_make, other_model, "", Difficulty.MAKE_MODEL)]
+                for other_make, other_model in similar
+            ]
+            makes = dict.fromkeys(other_make for other_make, _ in similar if other_make != make)
+            self._similar[Difficulty.MAKE][(make, model)] = [make_options[other_make] for other_make in makes]
+
+    def _add(
+        self,
+        difficulty: Difficulty,
+        make: str,
+        model: str,
+        year: str,
+        group: Optional[str],
+    ) -> Optional[QuizOption]:
+        options = self._options[difficulty]
+        label = format_label(make, model, year, difficulty)
+        if label in options:
+            return None
+        option = options[label] = _build_option(make, model, year, difficulty)
+        if group is not None:
+            self._by_make[difficulty].setdefault(group, []).append(option)
+        return option
+
+    def label_count(self, difficulty: Difficulty) -> int:
+        return len(self._options[difficulty])
+
+    def option_for(self, entry: CarEntry, difficulty: Difficulty) -> QuizOption:
+        label = format_label(entry.make, entry.model, entry.year, difficulty)
+        option = self._options[difficulty].get(label)
+        if option is None:
+            option = _build_option(entry.make, entry.model, entry.year, difficulty)
+        return option
+
+    def encoded(self, option: QuizOption, difficulty: Difficulty) -> bytes:
+        """보기의 JSON 조각. 라벨마다 처음 출제될 때 한 번만 인코딩한다."""
+        fragments = self._encoded[difficulty]
+        fragment = fragments.get(option.label)
+        if fragment is None:
+            fragment = fragments[option.label] = encode_option(option)
+        return fragment
+
+    def similar(self, entry: CarEntry, difficulty: Difficulty) -> Sequence[QuizOption]:
+        """사양이 정답 모델과 비슷한 모델의 보기 (가까운 순).
+
+        연식까지 맞히는 난이도에서는 이웃 모델마다 정답 연식과 가장 가까운 연식을 고른다.
+        사양 정보가 없는 모델이면 빈 목록.
+        """
+        key = (entry.make, entry.model)
+        if difficulty is not Difficulty.MAKE_MODEL_YEAR:
+            return self._similar[difficulty].get(key, ())
+        options = []
+        for other in self._neighbors.get(key, ()):
+            variants, years = self._by_make_model.get(other), self._variant_years.get(other)
+            if not variants or not years:
+                continue
+            position = min(bisect_left(years, entry.year), len(years) - 1)
+            if position > 0 and int(entry.year) - int(years[position - 1]) <= int(years[position]) - int(entry.year):
+                position -= 1
+            options.append(variants[position])
+        return options
+
+    def tiers(
+        self,
+        entry: CarEntry,
+        difficulty: Difficulty,
+        mode: DistractorMode = DistractorMode.RANDOM,
+    ) -> Iterator[Sequence[QuizOption]]:
+        """정답과 가까운 풀부터 차례로 반환. 어려운 모드는 사양이 비슷한 모델을 먼저 쓴다."""
+        if difficulty is Difficulty.MAKE_MODEL_YEAR:
+            yield self._by_make_model.get((entry.make, entry.model), ())
+        if mode is DistractorMode.HARD:
+            yield self.similar(entry, difficulty)
+        if difficulty is not Difficulty.MAKE:
+            yield self._by_make[difficulty].get(entry.make, ())
+        yield self._global[difficulty]
+
+
+def sample_into(
+    pool: Sequence[QuizOption],
+    chosen: Dict[str, QuizOption],
+    target: int,
+) -> None:
+    """풀에서 `chosen`에 없는 라벨을 `target`개가 될 때까지 무작위로 추가.
+
+    풀을 복사하지 않고 교체된 위치만 사전에 기록하는 부분 Fisher–Yates라서
+    비용은 풀 크기가 아니라 뽑은 개수에 비례한다.
+    """
+    size = len(pool)
+    swapped: Dict[int, int] = {}
+    for index in range(size):
+        if len(chosen) >= target:
+            return
+        pick = random.randrange(index, size)
+        position = swapped.get(pick, pick)
+        swapped[pick] = swapped.get(index, index)
+        option = pool[position]
+        if option.label not in chosen:
+            chosen[option.label] = option
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Tuple, Union
+
+from .scan import DataRoots
+from .storage import DIGEST_SIZE, FileDigests
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_READ_CHUNK = 1 << 20
+_NO_DIGEST = bytes(DIGEST_SIZE)
+_DIGEST_PATTERN = re.compile(f"[0-9a-f]{{{DIGEST_SIZE * 2}}}")
+
+
+def is_digest(value: str) -> bool:
+    """`digest_bytes`가 만드는 형식(소문자 hex)인지 확인. 경로를 만들기 전에 검사한다."""
+    return _DIGEST_PATTERN.fullmatch(value) is not None
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def _hash_file(path: Path) -> bytes:
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_READ_CHUNK), b""):
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+def content_digest(path: Path) -> str:
+    """파일 내용 해시 (`digest_bytes`와 같은 값)."""
+    return _hash_file(path).hex()
+
+
+def digest_files(
+    roots: DataRoots,
+    relative_paths: Sequence[str],
+    workers: Optional[int] = None,
+    previous: Optional[Mapping[str, Tuple[int, int, bytes]]] = None,
+) -> FileDigests:
+    """상대 경로마다 내용 해시와 파일 상태를 계산.
+
+    데이터셋을 만들거나 갱신할 때 호출해 요청 처리 중에는 파일을 읽지 않게 한다.
+    `previous`(경로 → (크기, mtime_ns, 해시))와 크기/mtime이 같은 파일은 다시 읽지 않고
+    이전 해시를 쓴다. 읽을 수 없는 파일은 0으로 채운다. hashlib은 큰 버퍼를 해시하는
+    동안 GIL을 놓으므로 스레드 풀로 병렬 처리한다.
+    """
+
+    def digest_one(relative_path: str) -> Tuple[bytes, int, int, bool]:
+        source = roots.locate(relative_path)
+        if source is None:
+            return _NO_DIGEST, 0, 0, False
+        try:
+            stat = os.stat(source)
+            known = previous.get(relative_path) if previous else None
+            if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+                return known[2], stat.st_size, stat.st_mtime_ns, False
+            return _hash_file(source), stat.st_size, stat.st_mtime_ns, True
+        except OSError:
+            return _NO_DIGEST, 0, 0, False
+
+    files = FileDigests()
+    if not relative_paths:
+        return files
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) + 4)
+    workers = max(1, min(workers, len(relative_paths)))
+    if workers == 1:
+        results = list(map(digest_one, relative_paths))
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dataset-digest") as executor:
+            results = list(executor.map(digest_one, relative_paths, chunksize=64))
+    files.digests = b"".join(result[0] for result in results)
+    files.sizes.extend(result[1] for result in results)
+    files.mtimes.extend(result[2] for result in results)
+    files.hashed = sum(result[3] for result in results)
+    return files
+
+
+def strong_etag(digest: str) -> str:
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class HotBytesCache:
+    """전체 크기 상한이 있는 이미지 바이트 LRU 캐시."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self._max_bytes = max_bytes
+        self._max_item_bytes = max_bytes // 8
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self._max_item_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._items[key] = data
+            self._size += len(data)
+            while self._size > self._max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class ImageStore:
+    """원본 이미지 바이트를 내용 해시로 찾고 자주 쓰이는 바이트를 메모리에 유지.
+
+    해시는 데이터셋 열(`CarEntry.digest`)에 있으므로 여기서는 계산하지 않는다.
+    """
+
+    def __init__(
+        self,
+        source_root: Union[Path, Sequence[Path], DataRoots],
+        cache: HotBytesCache,
+    ) -> None:
+        self.roots = DataRoots.of(source_root)
+        self.cache = cache
+
+    def source_path(self, relative_path: str) -> Optional[Path]:
+        return self.roots.source_path(relative_path)
+
+    def read(self, digest: str, relative_path: str) -> Optional[bytes]:
+        """해시가 일치하는 원본 바이트. 캐시에 있으면 디스크를 읽지 않는다."""
+        data = self.cache.get(digest)
+        if data is not None:
+            return data
+        source = self.source_path(relative_path)
+        if source is None:
+            return None
+        data = source.read_bytes()
+        if digest_bytes(data) != digest:
+            # URL이 가리키던 내용이 이미 바뀌었다.
+            return None
+        self.cache.put(digest, data)
+        return data
@@ -1,34 +1,122 @@
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
 from pathlib import Path
-from typing import DefaultDict, Dict, Iterable, List, Optional
+from typing import AbstractSet, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Union
 
+from . import snapshot
+from .distractors import DistractorPools
+from .images import digest_files
 from .models import CarEntry
+from .scan import IMAGE_SUFFIX, DataRoots, ScanResult, scan_roots
+from .storage import CATEGORY_SPECS, EMPTY_SPECS, NUMERIC_SPECS, IndexColumns, Row, Specs
+from .weighting import SamplingPolicy, StratifiedSampler
 
 LOGGER = logging.getLogger(__name__)
 
+PROGRESS_EVERY = 10000
+FILTER_CACHE_SIZE = 128
 
-def parse_filename(path: Path) -> Optional[CarEntry]:
-    """파일명을 파싱하여 CarEntry를 생성."""
-    name = path.stem
-    parts = name.split("_")
+# Make_Model_Year_MSRP_wheel_hp_disp_cyl_width_height_length_mpg_drivetrain_seats_doors_body_id
+SPEC_PART_COUNT = 17
+_NUMERIC_POSITIONS = (3, 4, 5, 6, 7, 8, 9, 10, 11, 13, 14)
+_CATEGORY_POSITIONS = (12, 15)
+_MISSING = "nan"
+# 숫자 사양 열(`I` 배열)에 담을 수 있는 최댓값
+_SPEC_MAX = 0xFFFFFFFF
+
+# (단계, 처리한 개수, 전체 개수)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def _ignore_progress(phase: str, done: int, total: int) -> None:
+    pass
+
+
+def _reporting(names: Sequence[str], progress: ProgressCallback) -> Iterator[str]:
+    total = len(names)
+    for index, name in enumerate(names):
+        if index % PROGRESS_EVERY == 0:
+            progress("parsing", index, total)
+        yield name
+
+
+@dataclass(frozen=True)
+class EntryFilter:
+    """문제 후보를 좁히는 조건. 범주 값은 대소문자를 구분하지 않는다."""
+
+    body: Optional[str] = None
+    drivetrain: Optional[str] = None
+    year_from: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return self.body is not None or self.drivetrain is not None or self.year_from is not None
+
+
+def _spec_number(value: str) -> int:
+    if not (value.isascii() and value.isdigit()):
+        return 0
+    number = int(value)
+    if number > _SPEC_MAX:
+        LOGGER.warning("사양 값이 범위를 벗어나 값 없음으로 처리: %s", value)
+        return 0
+    return number
+
+
+def _parse_specs(parts: List[str]) -> Specs:
+    """사양 필드를 해석. 필드 수가 규격과 다르면 모두 값 없음으로 둔다."""
+    if len(parts) != SPEC_PART_COUNT:
+        return EMPTY_SPECS
+    numbers = tuple(_spec_number(parts[position]) for position in _NUMERIC_POSITIONS)
+    labels = tuple("" if parts[position] == _MISSING else parts[position] for position in _CATEGORY_POSITIONS)
+    return numbers, labels
+
+
+def _parse_stem(stem: str, display_name: str) -> Optional[tuple[str, str, str, str, Specs]]:
+    """파일명(확장자 제외)을 (id, make, model, year, 사양)으로 분해."""
+    parts = stem.split("_")
     if len(parts) < 4:
-        LOGGER.debug("무시: 필드 수 부족 (%s)", path.name)
+        LOGGER.debug("무시: 필드 수 부족 (%s)", display_name)
         return None
 
     make, model, year = parts[0], parts[1], parts[2]
     if not make or not model:
-        LOGGER.debug("무시: 제조사/모델 정보 부족 (%s)", path.name)
+        LOGGER.debug("무시: 제조사/모델 정보 부족 (%s)", display_name)
         return None
     if len(year) != 4 or not year.isdigit():
-        LOGGER.debug("무시: 연식이 4자리 숫자가 아님 (%s)", path.name)
+        LOGGER.debug("무시: 연식이 4자리 숫자가 아님 (%s)", display_name)
         return None
 
-    relative_path = path.name
-    entry_id = name
+    return stem, make, model, year, _parse_specs(parts)
+
 
+def _split_path(relative_path: str) -> tuple[str, str]:
+    """상대 경로를 (디렉터리 접두사, 확장자를 뺀 파일명)으로 분리. 접두사는 `/`로 끝난다."""
+    cut = relative_path.rfind("/") + 1
+    name = relative_path[cut:]
+    if name.endswith(IMAGE_SUFFIX):
+        name = name[: -len(IMAGE_SUFFIX)]
+    return relative_path[:cut], name
+
+
+def parse_filename(path: Path) -> Optional[CarEntry]:
+    """파일명을 파싱하여 CarEntry를 생성."""
+    return parse_relative_path(path.name)
+
+
+def parse_relative_path(relative_path: str) -> Optional[CarEntry]:
+    """루트 기준 상대 경로를 파싱하여 CarEntry를 생성. 디렉터리는 파싱에 쓰지 않는다."""
+    directory, stem = _split_path(relative_path)
+    fields = _parse_stem(stem, relative_path)
+    if fields is None:
+        return None
+
+    entry_id, make, model, year, _ = fields
     return CarEntry(
         id=entry_id,
         make=make,
@@ -38,54 +126,551 @@ def parse_filename(path: Path) -> Optional[CarEntry]:
     )
 
 
+class EntrySequence(Sequence):
+    """행 번호 배열 위의 읽기 전용 뷰. CarEntry는 접근할 때 생성한다."""
+
+    __slots__ = ("_dataset", "_rows")
+
+    def __init__(self, dataset: "CarDataset", rows: Sequence[int]) -> None:
+        self._dataset = dataset
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._dataset.entry_at(row) for row in self._rows[index]]
+        return self._dataset.entry_at(self._rows[index])
+
+    def __iter__(self) -> Iterator[CarEntry]:
+        entry_at = self._dataset.entry_at
+        for row in self._rows:
+            yield entry_at(row)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (EntrySequence, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"EntrySequence(rows={len(self._rows)})"
+
+
+class PostingMapping(Mapping):
+    """키 → 행 번호 목록(posting list) 사전을 CarEntry 시퀀스로 보여주는 뷰."""
+
+    __slots__ = ("_dataset", "_postings", "_encode", "_decode")
+
+    def __init__(
+        self,
+        dataset: "CarDataset",
+        postings: Dict[Hashable, array],
+        encode: Callable[[Hashable], Optional[Hashable]],
+        decode: Callable[[Hashable], Hashable],
+    ) -> None:
+        self._dataset = dataset
+        self._postings = postings
+        self._encode = encode
+        self._decode = decode
+
+    def __getitem__(self, key: Hashable) -> EntrySequence:
+        code = self._encode(key)
+        rows = self._postings.get(code) if code is not None else None
+        if rows is None:
+            raise KeyError(key)
+        return EntrySequence(self._dataset, rows)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for code in self._postings:
+            yield self._decode(code)
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+
 class CarDataset:
-    """이미지 데이터셋 인덱스."""
-
-    def __init__(self, data_dir: Path) -> None:
-        self.data_dir = data_dir
-        self.entries: List[CarEntry] = []
-        self.by_make: DefaultDict[str, List[CarEntry]] = defaultdict(list)
-        self.by_model: DefaultDict[str, List[CarEntry]] = defaultdict(list)
-        self.make_model_map: DefaultDict[tuple[str, str], List[CarEntry]] = defaultdict(list)
-        self._load()
-
-    def _load(self) -> None:
-        LOGGER.info("데이터 디렉터리 스캔 중: %s", self.data_dir)
-        for path in sorted(self.data_dir.glob("*.jpg")):
-            entry = parse_filename(path)
-            if entry is None:
+    """이미지 데이터셋 인덱스.
+
+    한 번 만들어진 인스턴스는 변경하지 않는다. 새 파일이 추가되면
+    `apply_delta`로 새 버전을 만들어 교체하므로, 진행 중인 요청은
+    기존 버전을 그대로 사용할 수 있다.
+
+    항목은 `IndexColumns` 열 배열에 저장되고, 제조사/모델 인덱스는 행 번호
+    배열로 보관한다. `CarEntry`는 문제를 낼 때처럼 필요한 순간에만 만든다.
+
+    `data_dir`에 루트를 여러 개 주면 모두 재귀적으로 스캔해 하나의 인덱스로 합친다.
+    `CarEntry.relative_path`는 `DataRoots` 기준의 상대 경로다. 디스크에서 적재한
+    버전은 그때의 스캔 결과(`scan`)를 갖고 있어 갱신기가 변경 감지의 기준으로 쓴다.
+    """
+
+    def __init__(
+        self,
+        data_dir: Union[Path, Sequence[Path], DataRoots],
+        snapshot_path: Optional[Path] = None,
+        rebuild_snapshot: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        scan_workers: Optional[int] = None,
+    ) -> None:
+        self.roots = DataRoots.of(data_dir)
+        self.data_dir = self.roots.primary
+        self.snapshot_path = snapshot_path
+        self.scan_workers = scan_workers
+        self.version = 0
+        self.scan: Optional[ScanResult] = None
+        self._load(rebuild_snapshot, progress or _ignore_progress)
+
+    @classmethod
+    def from_names(cls, data_dir: Union[Path, Sequence[Path], DataRoots], names: Iterable[str]) -> "CarDataset":
+        """디스크를 읽지 않고 상대 경로(파일명) 목록으로 데이터셋을 생성."""
+        dataset = cls.__new__(cls)
+        dataset.roots = DataRoots.of(data_dir)
+        dataset.data_dir = dataset.roots.primary
+        dataset.scan_workers = None
+        dataset.snapshot_path = None
+        dataset.version = 0
+        dataset.scan = None
+        dataset._set_storage(IndexColumns.from_rows(cls._parse_names(names)))
+        return dataset
+
+    def _set_storage(self, columns: IndexColumns, rows: Optional[array] = None) -> None:
+        self._columns = columns
+        self._rows = rows if rows is not None else array("I", range(len(columns)))
+        self._make_rows: Dict[int, array] = {}
+        self._model_rows: Dict[int, array] = {}
+        self._pair_rows: Dict[tuple[int, int], array] = {}
+        self._year_rows: Dict[int, array] = {}
+        self._category_rows: Dict[str, Dict[int, array]] = {name: {} for name in CATEGORY_SPECS}
+        self._index_rows(self._rows)
+        self._init_filter_cache()
+        self._samplers: Dict[SamplingPolicy, StratifiedSampler] = {}
+        self.distractor_pools = DistractorPools.build(self)
+
+    def _init_filter_cache(self) -> None:
+        self._filter_cache: "OrderedDict[EntryFilter, array]" = OrderedDict()
+        self._filter_lock = threading.Lock()
+
+    def _index_rows(self, rows: Iterable[int]) -> None:
+        make_codes, model_codes = self._columns.make_codes, self._columns.model_codes
+        make_rows, model_rows, pair_rows = self._make_rows, self._model_rows, self._pair_rows
+        for row in rows:
+            make_code = make_codes[row]
+            model_code = model_codes[row]
+            postings = make_rows.get(make_code)
+            if postings is None:
+                postings = make_rows[make_code] = array("I")
+            postings.append(row)
+            postings = model_rows.get(model_code)
+            if postings is None:
+                postings = model_rows[model_code] = array("I")
+            postings.append(row)
+            postings = pair_rows.get((make_code, model_code))
+            if postings is None:
+                postings = pair_rows[(make_code, model_code)] = array("I")
+            postings.append(row)
+
+        years, year_rows = self._columns.years, self._year_rows
+        for row in rows:
+            postings = year_rows.get(years[row])
+            if postings is None:
+                postings = year_rows[years[row]] = array("I")
+            postings.append(row)
+        for name in CATEGORY_SPECS:
+            codes, category_rows = self._columns.category_codes[name], self._category_rows[name]
+            for row in rows:
+                postings = category_rows.get(codes[row])
+                if postings is None:
+                    postings = category_rows[codes[row]] = array("I")
+                postings.append(row)
+
+    def _load(self, rebuild_snapshot: bool = False, progress: ProgressCallback = _ignore_progress) -> None:
+        progress("listing", 0, 0)
+        scan = self.scan = scan_roots(self.roots, self.scan_workers)
+        names = scan.paths
+        fingerprint = snapshot.directory_fingerprint(self.roots, scan)
+
+        columns = previous = None
+        if self.snapshot_path is not None and not rebuild_snapshot:
+            loaded = snapshot.load_snapshot(self.snapshot_path)
+            if loaded is not None:
+                stored, previous = loaded
+                if stored == fingerprint:
+                    columns = previous
+                    LOGGER.info("인덱스 스냅샷 사용: %s", self.snapshot_path)
+
+        rebuilt = columns is None
+        if rebuilt:
+            LOGGER.info("데이터 디렉터리 스캔 중: %s", ", ".join(str(path) for path in self.roots.paths))
+            columns = IndexColumns.from_rows(self._parse_names(_reporting(names, progress)))
+        # 스냅샷이 최신이어도 제자리에서 덮어쓴 파일은 디렉터리 mtime을 바꾸지 않으므로
+        # 파일마다 크기/mtime을 확인하고, 달라진 파일만 다시 해시한다.
+        progress("hashing", 0, len(columns))
+        files = digest_files(
+            self.roots,
+            [self._relative_path(columns, row) for row in range(len(columns))],
+            self.scan_workers,
+            previous=self._file_states(previous) if previous is not None else None,
+        )
+        columns.set_files(files)
+        if files.hashed:
+            LOGGER.info("내용 해시 계산: %d개 파일", files.hashed)
+        if self.snapshot_path is not None and (rebuilt or files.hashed):
+            try:
+                snapshot.write_snapshot(self.snapshot_path, fingerprint, columns)
+            except OSError as exc:
+                LOGGER.warning("인덱스 스냅샷 저장 실패: %s (%s)", self.snapshot_path, exc)
+
+        progress("indexing", len(names), len(names))
+        self._set_storage(columns)
+        LOGGER.info("총 %d개의 항목 로드", len(self._rows))
+
+    @staticmethod
+    def _relative_path(columns: IndexColumns, row: int) -> str:
+        return columns.dir_at(row) + columns.id_at(row) + IMAGE_SUFFIX
+
+    @classmethod
+    def _file_states(cls, columns: IndexColumns) -> Dict[str, tuple[int, int, bytes]]:
+        states = {}
+        for row in range(len(columns)):
+            state = columns.file_state_at(row)
+            if state is not None:
+                states[cls._relative_path(columns, row)] = state
+        return states
+
+    @staticmethod
+    def _parse_names(names: Iterable[str]) -> Iterator[Row]:
+        for name in names:
+            if not name.endswith(IMAGE_SUFFIX):
+                continue
+            directory, stem = _split_path(name)
+            fields = _parse_stem(stem, name)
+            if fields is not None:
+                entry_id, make, model, year, specs = fields
+                yield entry_id, make, model, year, directory, specs
+
+    def apply_delta(
+        self,
+        added: Sequence[CarEntry],
+        removed_paths: AbstractSet[str],
+    ) -> "CarDataset":
+        """추가/삭제된 항목만 반영한 새 버전을 생성. 기존 인스턴스는 변경하지 않는다.
+
+        삭제된 행은 열 배열에 남겨 두고 인덱스에서만 제외하므로 행 번호가 유지된다.
+        추가된 파일의 내용 해시는 여기서(갱신 스레드에서) 계산한다.
+        """
+        columns = self._columns
+        removed_rows = set()
+        for path in removed_paths:
+            directory, stem = _split_path(path)
+            fields = _parse_stem(stem, path)
+            if fields is None:
                 continue
-            self.entries.append(entry)
-            self.by_make[entry.make].append(entry)
-            self.by_model[entry.model].append(entry)
-            self.make_model_map[(entry.make, entry.model)].append(entry)
+            entry_id, make, model, _, _ = fields
+            make_code, model_code = columns.makes.lookup(make), columns.models.lookup(model)
+            dir_code = columns.dirs.lookup(directory)
+            for row in self._pair_rows.get((make_code, model_code), ()):
+                if columns.dir_codes[row] == dir_code and columns.id_at(row) == entry_id:
+                    removed_rows.add(row)
+
+        if added:
+            columns = columns.appended(
+                [
+                    (
+                        entry.id,
+                        entry.make,
+                        entry.model,
+                        entry.year,
+                        _split_path(entry.relative_path)[0],
+                        _parse_specs(entry.id.split("_")),
+                    )
+                    for entry in added
+                ],
+                digest_files(self.roots, [entry.relative_path for entry in added], self.scan_workers),
+            )
+        added_rows = range(len(self._columns), len(columns))
+
+        dataset = CarDataset.__new__(CarDataset)
+        dataset.roots = self.roots
+        dataset.data_dir = self.data_dir
+        dataset.scan_workers = self.scan_workers
+        dataset.snapshot_path = self.snapshot_path
+        dataset.version = self.version + 1
+        dataset.scan = None
+        dataset._columns = columns
+        if removed_rows:
+            dataset._rows = array("I", (row for row in self._rows if row not in removed_rows))
+        else:
+            dataset._rows = array("I", self._rows)
+        dataset._rows.extend(added_rows)
+
+        dataset._make_rows = dict(self._make_rows)
+        dataset._model_rows = dict(self._model_rows)
+        dataset._pair_rows = dict(self._pair_rows)
+        dataset._year_rows = dict(self._year_rows)
+        dataset._category_rows = {name: dict(postings) for name, postings in self._category_rows.items()}
+        groups = [
+            (dataset._make_rows, lambda row: columns.make_codes[row]),
+            (dataset._model_rows, lambda row: columns.model_codes[row]),
+            (dataset._pair_rows, lambda row: (columns.make_codes[row], columns.model_codes[row])),
+            (dataset._year_rows, lambda row: columns.years[row]),
+        ]
+        for name in CATEGORY_SPECS:
+            codes = columns.category_codes[name]
+            groups.append((dataset._category_rows[name], lambda row, codes=codes: codes[row]))
+        touched_pairs: set = set()
+        for postings, key_of in groups:
+            touched = touched_pairs if postings is dataset._pair_rows else set()
+            for key in {key_of(row) for row in removed_rows}:
+                postings[key] = array("I", (row for row in postings[key] if row not in removed_rows))
+                touched.add(key)
+            for row in added_rows:
+                key = key_of(row)
+                if key not in touched:
+                    # 이전 버전과 공유하는 배열은 수정하지 않고 복사한다.
+                    postings[key] = array("I", postings.get(key, ()))
+                    touched.add(key)
+                postings[key].append(row)
+            for key in touched:
+                if not postings[key]:
+                    del postings[key]
+        dataset._init_filter_cache()
+        # 이전 버전에서 쓰던 추출 정책은 바로 다시 만든다. 층이 생기거나 없어지지 않았으면
+        # 별칭 표를 그대로 쓰고, 보기 풀은 행이 바뀐 (제조사, 모델)만 갱신한다.
+        strata_changed = any(
+            (key in self._pair_rows) != (key in dataset._pair_rows) for key in touched_pairs
+        )
+        dataset._samplers = {
+            policy: sampler.updated(dataset, policy, strata_changed)
+            for policy, sampler in self._samplers.items()
+        }
+        dataset.distractor_pools = self.distractor_pools.updated(
+            dataset,
+            [(columns.makes[make_code], columns.models[model_code]) for make_code, model_code in touched_pairs],
+        )
 
-        LOGGER.info("총 %d개의 항목 로드", len(self.entries))
+        LOGGER.info(
+            "데이터셋 버전 %d: %d개 추가, %d개 삭제 (총 %d개)",
+            dataset.version,
+            len(added_rows),
+            len(removed_rows),
+            len(dataset._rows),
+        )
+        return dataset
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def columns(self) -> IndexColumns:
+        return self._columns
+
+    @property
+    def rows(self) -> array:
+        """현재 버전에 포함된 행 번호 배열."""
+        return self._rows
+
+    def live_columns(self) -> IndexColumns:
+        """삭제된 행을 제외한 열 저장소 (스냅샷 저장용)."""
+        if len(self._rows) == len(self._columns):
+            return self._columns
+        return self._columns.compacted(self._rows)
+
+    def entry_at(self, row: int) -> CarEntry:
+        columns = self._columns
+        entry_id = columns.id_at(row)
+        # 인덱싱 시 이미 검증된 값이므로 pydantic 검증을 생략한다.
+        return CarEntry.construct(
+            id=entry_id,
+            make=columns.make_at(row),
+            model=columns.model_at(row),
+            year=columns.year_at(row),
+            relative_path=columns.dir_at(row) + entry_id + IMAGE_SUFFIX,
+            digest=columns.digest_at(row),
+        )
+
+    def id_of(self, row: int) -> str:
+        return self._columns.id_at(row)
+
+    def spec_of(self, row: int, name: str) -> int:
+        """숫자 사양 값. 0이면 값 없음."""
+        return self._columns.spec_at(row, name)
+
+    def category_of(self, row: int, name: str) -> str:
+        """범주 사양 값(`drivetrain`, `body`). 빈 문자열이면 값 없음."""
+        return self._columns.category_at(row, name)
+
+    def category_counts(self, name: str) -> Dict[str, int]:
+        """범주 값별 현재 항목 수 (값 없음 제외)."""
+        values = self._columns.categories[name].values
+        return {values[code]: len(rows) for code, rows in self._category_rows[name].items() if values[code]}
+
+    def filtered_rows(self, entry_filter: Optional[EntryFilter]) -> array:
+        """조건에 맞는 행 번호 배열 (행 번호 순).
+
+        전체 항목을 훑지 않는다. 조건마다 인덱스 목록(범주 값별, 연식별)을 찾아 가장 짧은
+        목록에서 시작하고, 나머지 조건은 그 목록의 행에 대해 열 값으로만 확인한다.
+        결과는 데이터셋 버전마다 최근 조건 몇 개만 캐시한다.
+        """
+        if not entry_filter:
+            return self._rows
+        with self._filter_lock:
+            cached = self._filter_cache.get(entry_filter)
+            if cached is not None:
+                self._filter_cache.move_to_end(entry_filter)
+                return cached
+
+        rows = self._intersect(entry_filter)
+        with self._filter_lock:
+            self._filter_cache[entry_filter] = rows
+            if len(self._filter_cache) > FILTER_CACHE_SIZE:
+                self._filter_cache.popitem(last=False)
+        return rows
+
+    def stratified_sampler(self, policy: SamplingPolicy) -> StratifiedSampler:
+        """추출 정책의 층화 추출기. 데이터셋 버전마다 처음 쓰일 때 한 번 만든다."""
+        sampler = self._samplers.get(policy)
+        if sampler is None:
+            sampler = self._samplers[policy] = StratifiedSampler.build(self, policy)
+        return sampler
+
+    def _intersect(self, entry_filter: EntryFilter) -> array:
+        columns = self._columns
+        candidates: List[Sequence[int]] = []
+        checks: List[tuple[array, int]] = []
+        for name, value in (("body", entry_filter.body), ("drivetrain", entry_filter.drivetrain)):
+            if value is None:
+                continue
+            code = self._category_code(name, value)
+            postings = self._category_rows[name].get(code) if code is not None else None
+            if not postings:
+                return array("I")
+            candidates.append(postings)
+            checks.append((columns.category_codes[name], code))
+
+        year_from = entry_filter.year_from
+        if year_from is not None:
+            year_lists = [rows for year, rows in self._year_rows.items() if year >= year_from]
+            if sum(map(len, year_lists)) < min(map(len, candidates), default=len(self._rows) + 1):
+                merged = array("I")
+                for rows in year_lists:
+                    merged.extend(rows)
+                candidates.append(array("I", sorted(merged)))
+
+        base = min(candidates, key=len)
+        years = columns.years
+        return array(
+            "I",
+            (
+                row
+                for row in base
+                if (year_from is None or years[row] >= year_from)
+                and all(codes[row] == code for codes, code in checks)
+            ),
+        )
+
+    def _category_code(self, name: str, value: str) -> Optional[int]:
+        vocabulary = self._columns.categories[name]
+        code = vocabulary.lookup(value)
+        if code is not None:
+            return code
+        lowered = value.lower()
+        for code, candidate in enumerate(vocabulary.values):
+            if candidate.lower() == lowered:
+                return code
+        return None
+
+    def path_of(self, row: int) -> str:
+        """루트 기준 상대 경로."""
+        columns = self._columns
+        return columns.dir_at(row) + columns.id_at(row) + IMAGE_SUFFIX
+
+    def make_of(self, row: int) -> str:
+        return self._columns.make_at(row)
+
+    def model_of(self, row: int) -> str:
+        return self._columns.model_at(row)
+
+    def year_of(self, row: int) -> str:
+        return self._columns.year_at(row)
+
+    def rows_by_make(self, make: str) -> array:
+        return self._make_rows.get(self._columns.makes.lookup(make), array("I"))
+
+    def rows_by_make_model(self, make: str, model: str) -> array:
+        key = (self._columns.makes.lookup(make), self._columns.models.lookup(model))
+        return self._pair_rows.get(key, array("I"))
+
+    def pair_postings(self) -> Mapping[tuple[int, int], array]:
+        """(제조사 코드, 모델 코드) → 행 번호 배열. 읽기 전용으로 다뤄야 한다."""
+        return self._pair_rows
+
+    def iter_make_model_rows(self) -> Iterator[tuple[str, str, array]]:
+        """(제조사, 모델, 행 번호 배열)을 인덱스 순서대로 반환."""
+        makes, models = self._columns.makes, self._columns.models
+        for (make_code, model_code), rows in self._pair_rows.items():
+            yield makes[make_code], models[model_code], rows
+
+    def iter_make_model_years(self) -> Iterator[tuple[str, str, List[str]]]:
+        """(제조사, 모델, 정렬된 연식 목록)을 인덱스 순서대로 반환."""
+        makes, models, years = self._columns.makes, self._columns.models, self._columns.years
+        for (make_code, model_code), rows in self._pair_rows.items():
+            distinct = sorted({years[row] for row in rows})
+            yield makes[make_code], models[model_code], [f"{year:04d}" for year in distinct]
+
+    @property
+    def entries(self) -> EntrySequence:
+        return EntrySequence(self, self._rows)
+
+    @property
+    def by_make(self) -> PostingMapping:
+        makes = self._columns.makes
+        return PostingMapping(self, self._make_rows, makes.lookup, makes.__getitem__)
+
+    @property
+    def by_model(self) -> PostingMapping:
+        models = self._columns.models
+        return PostingMapping(self, self._model_rows, models.lookup, models.__getitem__)
+
+    @property
+    def make_model_map(self) -> PostingMapping:
+        makes, models = self._columns.makes, self._columns.models
+
+        def encode(key: tuple[str, str]) -> Optional[tuple[int, int]]:
+            make_code, model_code = makes.lookup(key[0]), models.lookup(key[1])
+            if make_code is None or model_code is None:
+                return None
+            return make_code, model_code
+
+        def decode(code: tuple[int, int]) -> tuple[str, str]:
+            return makes[code[0]], models[code[1]]
+
+        return PostingMapping(self, self._pair_rows, encode, decode)
 
     @property
     def unique_makes(self) -> List[str]:
-        return list(self.by_make.keys())
+        makes = self._columns.makes
+        return [makes[code] for code in self._make_rows]
 
     @property
     def unique_models(self) -> List[str]:
-        return list(self.by_model.keys())
+        models = self._columns.models
+        return [models[code] for code in self._model_rows]
 
     def random_entries(self) -> Iterable[CarEntry]:
         import random
 
-        shuffled = self.entries[:]
+        shuffled = list(self.entries)
         random.shuffle(shuffled)
         return shuffled
 
-    def get_entries_by_make(self, make: str) -> List[CarEntry]:
-        return self.by_make.get(make, [])
-
-    def get_entries_by_model(self, model: str) -> List[CarEntry]:
-        return self.by_model.get(model, [])
+    def get_entries_by_make(self, make: str) -> EntrySequence:
+        return EntrySequence(self, self.rows_by_make(make))
 
-    def get_entries_by_make_model(self, make: str, model: str) -> List[CarEntry]:
-        return self.make_model_map.get((make, model), [])
+    def get_entries_by_model(self, model: str) -> EntrySequence:
+        return EntrySequence(self, self._model_rows.get(self._columns.models.lookup(model), array("I")))
 
-    def resolve_path(self, entry: CarEntry) -> Path:
-        return self.data_dir / entry.relative_path
+    def get_entries_by_make_model(self, make: str, model: str) -> EntrySequence:
+        return EntrySequence(self, self.rows_by_make_model(make, model))
 
+    def resolve_path(self, entry: CarEntry) -> Optional[Path]:
+        return self.roots.locate(entry.relative_path)
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .models import Difficulty
+from .score import Buckets, ScoreRecord
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"CPSC"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_NAME = "scores.snapshot"
+
+# 이벤트: 플래그(난이도 코드 | 정답 여부 | 초기화), 플레이어 이름 길이, UTC 일 번호
+_EVENT = struct.Struct("<BHI")
+# 이벤트와 스냅샷 기록의 이름 길이 필드(u16)에 들어가는 최대 바이트 수
+_MAX_NAME_BYTES = 0xFFFF
+_CORRECT_FLAG = 0x10
+_RESET_FLAG = 0x80
+_DIFFICULTY_MASK = 0x0F
+_DIFFICULTIES = list(Difficulty)
+_DIFFICULTY_CODES = {difficulty: code for code, difficulty in enumerate(Difficulty)}
+
+# magic, version, 스냅샷에 반영된 마지막 세그먼트 번호, 기록 수, 집계 수, payload crc32
+_SNAPSHOT_HEADER = struct.Struct("<4sHQIII")
+# points, streak, total_correct, total_attempts, 이름 길이
+_SNAPSHOT_RECORD = struct.Struct("<qIIIH")
+# 집계 기간(일 번호 또는 ALL_TIME), 난이도 코드
+_SNAPSHOT_BUCKET = struct.Struct("<iB")
+
+JournalEvent = Tuple[str, Optional[Difficulty], bool, int]
+CaptureState = Callable[[], Tuple[Dict[str, ScoreRecord], Buckets, bytes]]
+
+
+def encode_event(player: str, difficulty: Optional[Difficulty], correct: bool, day: int = 0) -> bytes:
+    name = player.encode("utf-8")
+    if len(name) > _MAX_NAME_BYTES:
+        raise ValueError(f"플레이어 이름이 너무 깁니다: {len(name)}바이트")
+    if difficulty is None:
+        flags = _RESET_FLAG
+    else:
+        flags = _DIFFICULTY_CODES[difficulty] | (_CORRECT_FLAG if correct else 0)
+    return _EVENT.pack(flags, len(name), day) + name
+
+
+def decode_events(data: bytes) -> Iterator[JournalEvent]:
+    """저널 바이트를 이벤트로 해석. 비정상 종료로 잘린 마지막 이벤트는 버린다."""
+    offset = 0
+    size = len(data)
+    while offset + _EVENT.size <= size:
+        flags, length, day = _EVENT.unpack_from(data, offset)
+        start = offset + _EVENT.size
+        if start + length > size:
+            return
+        player = data[start : start + length].decode("utf-8")
+        offset = start + length
+        if flags & _RESET_FLAG:
+            yield player, None, False, day
+        else:
+            yield player, _DIFFICULTIES[flags & _DIFFICULTY_MASK], bool(flags & _CORRECT_FLAG), day
+
+
+def _pack_record(record: ScoreRecord) -> bytes:
+    name = record.player.encode("utf-8")
+    header = _SNAPSHOT_RECORD.pack(
+        record.points, record.streak, record.total_correct, record.total_attempts, len(name)
+    )
+    return header + name
+
+
+def _unpack_record(payload: memoryview, offset: int) -> Tuple[ScoreRecord, int]:
+    points, streak, total_correct, total_attempts, length = _SNAPSHOT_RECORD.unpack_from(payload, offset)
+    offset += _SNAPSHOT_RECORD.size
+    player = bytes(payload[offset : offset + length]).decode("utf-8")
+    record = ScoreRecord(
+        player=player,
+        points=points,
+        streak=streak,
+        total_correct=total_correct,
+        total_attempts=total_attempts,
+    )
+    return record, offset + length
+
+
+def write_score_snapshot(path: Path, segment: int, records: Dict[str, ScoreRecord], buckets: Buckets) -> None:
+    """점수와 기간별 집계 스냅샷 저장 (임시 파일에 fsync 후 교체)."""
+    parts: List[bytes] = [_pack_record(record) for record in records.values()]
+    bucket_count = 0
+    for (period, difficulty), bucket in buckets.items():
+        prefix = _SNAPSHOT_BUCKET.pack(period, _DIFFICULTY_CODES[difficulty])
+        for entry in bucket.values():
+            parts.append(prefix + _pack_record(entry))
+            bucket_count += 1
+    payload = b"".join(parts)
+    header = _SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, segment, len(records), bucket_count, zlib.crc32(payload)
+    )
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(header)
+        handle.write(payload)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_score_snapshot(path: Path) -> Optional[Tuple[int, Dict[str, ScoreRecord], Buckets]]:
+    """(반영된 마지막 세그먼트 번호, 점수, 집계) 또는 스냅샷이 없거나 손상되었으면 None."""
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    if len(data) < _SNAPSHOT_HEADER.size:
+        return None
+    magic, version, segment, count, bucket_count, checksum = _SNAPSHOT_HEADER.unpack_from(data)
+    payload = memoryview(data)[_SNAPSHOT_HEADER.size :]
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or zlib.crc32(payload) != checksum:
+        LOGGER.warning("점수 스냅샷을 사용할 수 없습니다: %s", path)
+        return None
+
+    records: Dict[str, ScoreRecord] = {}
+    offset = 0
+    for _ in range(count):
+        record, offset = _unpack_record(payload, offset)
+        records[record.player] = record
+
+    buckets: Buckets = {}
+    for _ in range(bucket_count):
+        period, difficulty_code = _SNAPSHOT_BUCKET.unpack_from(payload, offset)
+        entry, offset = _unpack_record(payload, offset + _SNAPSHOT_BUCKET.size)
+        buckets.setdefault((period, _DIFFICULTIES[difficulty_code]), {})[entry.player] = entry
+    return segment, records, buckets
+
+
+class ScoreJournal:
+    """리더보드 변경을 기록하는 추가 전용 저널 (write-behind).
+
+    `append`는 메모리 버퍼에 이벤트를 덧붙이기만 하고, 백그라운드 스레드가
+    `flush_interval_seconds`마다 모아서 현재 세그먼트에 쓰고 fsync한다.
+    `snapshot_every`개 이벤트마다 전체 점수를 스냅샷으로 남기고 그 이전 세그먼트를
+    지우므로, 시작 시 복원 시간은 전체 이력이 아니라 마지막 스냅샷 이후 분량에 비례한다.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        flush_interval_seconds: float = 1.0,
+        snapshot_every: int = 10000,
+    ) -> None:
+        self.directory = directory
+        self._flush_interval_seconds = flush_interval_seconds
+        self._snapshot_every = snapshot_every
+        self._pending = bytearray()
+        self._pending_count = 0
+        self._pending_lock = threading.Lock()
+        # 세그먼트 쓰기, 교체, 스냅샷을 직렬화한다. 잠금 순서: _io_lock -> ScoreBoard 잠금 -> _pending_lock
+        self._io_lock = threading.Lock()
+        self._segment = 0
+        self._handle: Optional[BinaryIO] = None
+        self._events_since_snapshot = 0
+        self._capture: Optional[CaptureState] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.directory / SNAPSHOT_NAME
+
+    def segment_path(self, segment: int) -> Path:
+        return self.directory / f"journal-{segment:010d}.log"
+
+    def load(self) -> Tuple[Dict[str, ScoreRecord], Buckets, List[JournalEvent]]:
+        """마지막 스냅샷의 점수/집계와 그 이후 세그먼트의 이벤트를 읽고 새 세그먼트를 연다."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        loaded = read_score_snapshot(self.snapshot_path)
+        covered, records, buckets = loaded if loaded is not None else (0, {}, {})
+
+        events: List[JournalEvent] = []
+        last_segment = covered
+        for segment in self._segments():
+            if segment <= covered:
+                continue
+            events.extend(decode_events(self.segment_path(segment).read_bytes()))
+            last_segment = segment
+        LOGGER.info("점수 %d명, 저널 이벤트 %d개 복원", len(records), len(events))
+
+        with self._io_lock:
+            self._events_since_snapshot = len(events)
+            self._open_segment(last_segment + 1)
+        return records, buckets, events
+
+    def attach(self, capture: CaptureState) -> None:
+        """스냅샷을 만들 때 일관된 점수 사본을 가져올 함수를 등록."""
+        self._capture = capture
+
+    def encode(self, player: str, difficulty: Difficulty, correct: bool, day: int) -> bytes:
+        """시도 이벤트를 인코딩. 이름이 길이 필드를 넘으면 ValueError."""
+        return encode_event(player, difficulty, correct, day)
+
+    def append(self, player: str, difficulty: Difficulty, correct: bool, day: int) -> None:
+        self.append_encoded(self.encode(player, difficulty, correct, day))
+
+    def append_encoded(self, event: bytes) -> None:
+        """`encode`로 미리 만든 이벤트를 추가. 점수를 바꾸기 전에 인코딩할 때 쓴다."""
+        with self._pending_lock:
+            self._pending += event
+            self._pending_count += 1
+
+    def append_reset(self) -> None:
+        with self._pending_lock:
+            self._pending += encode_event("", None, False)
+            self._pending_count += 1
+
+    def take_pending(self) -> bytes:
+        """버퍼를 비우고 내용을 반환. `_io_lock`을 잡은 상태에서 호출한다."""
+        with self._pending_lock:
+            pending = bytes(self._pending)
+            self._events_since_snapshot += self._pending_count
+            self._pending.clear()
+            self._pending_count = 0
+        return pending
+
+    def flush(self) -> int:
+        """버퍼의 이벤트를 현재 세그먼트에 쓰고 fsync. 쓴 바이트 수를 반환."""
+        with self._io_lock:
+            pending = self.take_pending()
+            self._write(pending)
+        return len(pending)
+
+    def compact(self) -> None:
+        """현재 점수를 스냅샷으로 남기고 스냅샷에 반영된 세그먼트를 삭제."""
+        if self._capture is None:
+            return
+        with self._io_lock:
+            records, buckets, pending = self._capture()
+            # 스냅샷에 반영된 이벤트는 현재 세그먼트에 남기고, 이후 이벤트는 새 세그먼트로 간다.
+            self._write(pending)
+            covered = self._segment
+            self._open_segment(covered + 1)
+            write_score_snapshot(self.snapshot_path, covered, records, buckets)
+            self._events_since_snapshot = 0
+        for segment in self._segments():
+            if segment <= covered:
+                self.segment_path(segment).unlink(missing_ok=True)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="score-journal", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        if self._events_since_snapshot:
+            self.compact()
+        with self._io_lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def _segments(self) -> List[int]:
+        segments = []
+        for path in self.directory.glob("journal-*.log"):
+            try:
+                segments.append(int(path.stem.split("-", 1)[1]))
+            except ValueError:
+                continue
+        return sorted(segments)
+
+    def _open_segment(self, segment: int) -> None:
+        if self._handle is not None:
+            self._handle.close()
+        self._segment = segment
+        self._handle = open(self.segment_path(segment), "ab")
+
+    def _write(self, data: bytes) -> None:
+        if not data or self._handle is None:
+            return
+        self._handle.write(data)
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._flush_interval_seconds):
+            try:
+                self.flush()
+                if self._events_since_snapshot >= self._snapshot_every:
+                    self.compact()
+            except Exception:  # 백그라운드 스레드가 죽지 않도록 기록만 한다.
+                LOGGER.exception("점수 저널 기록 실패")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .indexer import CarDataset, ProgressCallback
+
+LOGGER = logging.getLogger(__name__)
+
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class DatasetLoader:
+    """데이터셋을 백그라운드 스레드에서 만들고 진행 상황을 보고.
+
+    서버는 적재가 끝나기 전에도 연결을 받는다. 적재가 끝나면 `on_ready`가 로더
+    스레드에서 한 번 호출되며, 그 전에 `stop`이 불렸으면 호출하지 않는다.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[ProgressCallback], CarDataset],
+        on_ready: Callable[[CarDataset], None],
+    ) -> None:
+        self._build = build
+        self._on_ready = on_ready
+        self._state = LOADING
+        self._phase = "pending"
+        self._done = 0
+        self._total = 0
+        self._error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._finished = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="dataset-loader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """적재가 끝날 때까지 기다린다. 준비되었으면 True."""
+        self._finished.wait(timeout)
+        return self.ready
+
+    def progress(self) -> Dict[str, object]:
+        with self._lock:
+            finished_at = self._finished_at if self._finished_at is not None else time.monotonic()
+            elapsed = finished_at - self._started_at if self._started_at is not None else 0.0
+            return {
+                "state": self._state,
+                "phase": self._phase,
+                "done": self._done,
+                "total": self._total,
+                "elapsedSeconds": round(elapsed, 3),
+                "error": self._error,
+            }
+
+    def _report(self, phase: str, done: int, total: int) -> None:
+        with self._lock:
+            self._phase, self._done, self._total = phase, done, total
+
+    def _run(self) -> None:
+        try:
+            dataset = self._build(self._report)
+            with self._lock:
+                if self._stop_event.is_set():
+                    return
+                self._on_ready(dataset)
+                self._state = READY
+                self._phase = READY
+                self._done = self._total = len(dataset)
+                self._finished_at = time.monotonic()
+            self._ready.set()
+            LOGGER.info("데이터셋 준비 완료 (%.2f초)", self._finished_at - self._started_at)
+        except Exception as exc:  # 백그라운드 스레드가 죽지 않도록 기록만 한다.
+            LOGGER.exception("데이터셋 적재 실패")
+            with self._lock:
+                self._state = FAILED
+                self._error = str(exc)
+                self._finished_at = time.monotonic()
+        finally:
+            self._finished.set()
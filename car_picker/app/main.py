@@ -2,17 +2,27 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 
 from .indexer import CarDataset
-from .routes import router as api_router
-from .score import ScoreBoard
-from .settings import get_settings
-from .store import QuestionStore
+from .loader import DatasetLoader
+from .metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from .models import Difficulty
+from .routes import DATASET_RETRY_AFTER_SECONDS, router as api_router
+from .scan import DataRoots
+from .score import ScoreBackend, ScoreBoard
+from .settings import AppSettings, get_settings
+from .store import QuestionBackend, QuestionStore
+
+# 선택 기능과 시작 후에 쓰는 구성 요소의 모듈(sqlite3, cProfile, jinja2, 이미지, 세션,
+# 사전 생성, 갱신 등)은 사용할 때 가져와 워커 시작을 줄인다.
+if TYPE_CHECKING:
+    from .sqlite_backend import SQLiteDatabase
 
 LOGGER = logging.getLogger("car_picker.app")
 
@@ -31,30 +41,264 @@ def create_app() -> FastAPI:
         StaticFiles(directory=str(static_root)),
         name="assets",
     )
-    app.mount(
-        f"{settings.static_url_prefix}/{settings.cars_mount_name}",
-        StaticFiles(directory=str(settings.data_dir)),
-        name=settings.cars_mount_name,
-    )
-
-    templates = Jinja2Templates(directory=str(templates_root))
+    roots = DataRoots(settings.data_roots())
+    # 루트가 여러 개면 상대 경로의 첫 구간이 루트 레이블이므로 루트마다 따로 마운트한다.
+    for label, root in roots.mounts():
+        mount_path = f"{settings.static_url_prefix}/{settings.cars_mount_name}"
+        app.mount(
+            f"{mount_path}/{label}" if label else mount_path,
+            StaticFiles(directory=str(root)),
+            name=f"{settings.cars_mount_name}-{label}" if label else settings.cars_mount_name,
+        )
 
     @app.on_event("startup")
     async def startup_event() -> None:
-        LOGGER.info("Application startup - loading dataset")
-        dataset = CarDataset(settings.data_dir)
-        app.state.dataset = dataset
-        app.state.scoreboard = ScoreBoard(settings.leaderboard_size)
-        app.state.question_store = QuestionStore(limit=settings.question_store_limit)
-        app.state.templates = templates
+        from .images import HotBytesCache, ImageStore
+        from .sessions import SessionStore
+        from .thumbnails import ThumbnailService
+        from .weighting import SamplingPolicy
+
+        LOGGER.info("Application startup - loading dataset in background")
+        database = None
+        if settings.storage_backend == "sqlite":
+            from .sqlite_backend import SQLiteDatabase
+
+            database = SQLiteDatabase(settings.sqlite_path)
+        scoreboard = _create_scoreboard(settings, database)
+        scoreboard.start()
+        app.state.scoreboard = scoreboard
+        question_store = _create_question_store(settings, database)
+        question_store.start()
+        app.state.question_store = question_store
+        session_store = SessionStore(
+            limit=settings.session_limit,
+            ttl_seconds=settings.session_ttl_seconds,
+            max_bytes=settings.session_max_bytes,
+            sweep_interval_seconds=settings.session_sweep_seconds,
+        )
+        session_store.start()
+        app.state.session_store = session_store
+        app.state.images = ImageStore(roots, HotBytesCache(settings.image_cache_bytes))
+        app.state.thumbnails = ThumbnailService(
+            roots,
+            settings.thumbnail_cache_dir,
+            settings.thumbnail_widths,
+            webp=settings.thumbnail_webp,
+            max_workers=settings.thumbnail_workers,
+        )
+
+        if settings.metrics_enabled:
+            _register_state_gauges(app)
+
+        app.state.sampling_policy = SamplingPolicy.load(settings.sampling_policy, settings.sampling_weights_path)
+        loader = DatasetLoader(
+            lambda progress: CarDataset(
+                roots,
+                snapshot_path=settings.index_snapshot_path,
+                progress=progress,
+                scan_workers=settings.scan_workers,
+            ),
+            on_ready=lambda dataset: _on_dataset_ready(app, settings, dataset),
+        )
+        loader.start()
+        app.state.dataset_loader = loader
+        if settings.dataset_startup_wait_seconds > 0:
+            await run_in_threadpool(loader.wait, settings.dataset_startup_wait_seconds)
+
+        profiler = getattr(app.state, "profiler", None)
+        if profiler is not None:
+            profiler.start()
+
+    @app.on_event("shutdown")
+    async def shutdown_event() -> None:
+        loader = getattr(app.state, "dataset_loader", None)
+        if loader is not None:
+            loader.stop()
+        refresher = getattr(app.state, "dataset_refresher", None)
+        if refresher is not None:
+            refresher.stop()
+        prefetcher = getattr(app.state, "question_prefetcher", None)
+        if prefetcher is not None:
+            prefetcher.stop()
+        question_store = getattr(app.state, "question_store", None)
+        if question_store is not None:
+            question_store.stop()
+        session_store = getattr(app.state, "session_store", None)
+        if session_store is not None:
+            session_store.stop()
+        scoreboard = getattr(app.state, "scoreboard", None)
+        if scoreboard is not None:
+            scoreboard.stop()
+        thumbnails = getattr(app.state, "thumbnails", None)
+        if thumbnails is not None:
+            thumbnails.shutdown()
+        profiler = getattr(app.state, "profiler", None)
+        if profiler is not None:
+            profiler.stop()
 
     @app.get("/", response_class=HTMLResponse)
     async def index(request: Request):
+        templates = getattr(app.state, "templates", None)
+        if templates is None:
+            from fastapi.templating import Jinja2Templates
+
+            templates = app.state.templates = Jinja2Templates(directory=str(templates_root))
         return templates.TemplateResponse("index.html", {"request": request})
 
+    @app.get("/healthz", include_in_schema=False)
+    def healthz() -> Response:
+        """프로세스가 요청을 처리할 수 있으면 항상 200 (liveness)."""
+        return Response(b'{"status":"ok"}', media_type="application/json")
+
+    @app.get("/readyz", include_in_schema=False)
+    def readyz() -> Response:
+        """데이터셋 적재가 끝났으면 200, 아니면 진행 상황과 함께 503 (readiness)."""
+        loader = getattr(app.state, "dataset_loader", None)
+        if loader is None:
+            progress = {"state": "pending"}
+        else:
+            progress = loader.progress()
+            if loader.ready:
+                return JSONResponse(progress)
+        return JSONResponse(
+            progress,
+            status_code=503,
+            headers={"Retry-After": str(DATASET_RETRY_AFTER_SECONDS)},
+        )
+
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware, registry=REGISTRY)
+
+        @app.get("/metrics", include_in_schema=False)
+        def metrics() -> Response:
+            return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
     app.include_router(api_router)
 
+    if settings.profile_sample_rate > 0 or settings.profile_trigger_header:
+        from .profiling import RequestProfiler
+
+        profiler = RequestProfiler(
+            settings.profile_output_dir,
+            sample_rate=settings.profile_sample_rate,
+            trigger_header=settings.profile_trigger_header,
+        )
+        profiler.install(app)
+        app.state.profiler = profiler
+
     return app
 
 
-app = create_app()
+def _on_dataset_ready(app: FastAPI, settings: AppSettings, dataset: CarDataset) -> None:
+    """로더 스레드에서 한 번 호출된다. 데이터셋이 필요한 구성 요소는 여기서 시작한다."""
+    app.state.dataset = dataset
+
+    if settings.question_pool_high_watermark > 0:
+        from .prefetch import QuestionPrefetcher
+
+        prefetcher = QuestionPrefetcher(
+            lambda: app.state.dataset,
+            low_watermark=settings.question_pool_low_watermark,
+            high_watermark=settings.question_pool_high_watermark,
+            policy=app.state.sampling_policy,
+        )
+        prefetcher.start()
+        app.state.question_prefetcher = prefetcher
+        if settings.metrics_enabled:
+            REGISTRY.gauge_callback(
+                "car_picker_question_pool_size",
+                "Prefetched questions waiting per difficulty.",
+                lambda: [({"difficulty": level.value}, prefetcher.size(level)) for level in Difficulty],
+            )
+
+    if settings.dataset_refresh_interval_seconds > 0:
+        from .refresh import DatasetRefresher
+
+        refresher = DatasetRefresher(
+            dataset,
+            on_swap=lambda updated: setattr(app.state, "dataset", updated),
+            interval_seconds=settings.dataset_refresh_interval_seconds,
+        )
+        refresher.start()
+        app.state.dataset_refresher = refresher
+
+
+def _register_state_gauges(app: FastAPI) -> None:
+    """수집 시점에 app.state의 구성 요소에서 읽는 게이지."""
+    state = app.state
+    REGISTRY.gauge_callback(
+        "car_picker_dataset_rows",
+        "Live rows in the current dataset version.",
+        lambda: [({}, len(state.dataset))] if getattr(state, "dataset", None) is not None else [],
+    )
+    REGISTRY.gauge_callback(
+        "car_picker_question_store",
+        "Question store size, limit and cumulative issue/resolve counts.",
+        lambda: [({"stat": name}, value) for name, value in state.question_store.stats().items()],
+    )
+    REGISTRY.gauge_callback(
+        "car_picker_sessions",
+        "Play session count, bitset bytes and cumulative create/expire/evict counts.",
+        lambda: [({"stat": name}, value) for name, value in state.session_store.stats().items()],
+    )
+    REGISTRY.gauge_callback(
+        "car_picker_image_cache_bytes",
+        "Bytes held in the hot image cache.",
+        lambda: [({}, state.images.cache.size)],
+    )
+    REGISTRY.gauge_callback(
+        "car_picker_dataset_ready",
+        "1 once the dataset has finished loading.",
+        lambda: [({}, 1.0 if state.dataset_loader.ready else 0.0)],
+    )
+
+
+def _create_scoreboard(settings: AppSettings, database: Optional["SQLiteDatabase"]) -> ScoreBackend:
+    if database is not None:
+        from .sqlite_backend import SQLiteScoreBoard
+
+        return SQLiteScoreBoard(database, settings.leaderboard_size)
+    if settings.leaderboard_journal_dir is not None:
+        from .journal import ScoreJournal
+
+        journal = ScoreJournal(
+            settings.leaderboard_journal_dir,
+            flush_interval_seconds=settings.leaderboard_flush_seconds,
+            snapshot_every=settings.leaderboard_snapshot_every,
+        )
+        return ScoreBoard(settings.leaderboard_size, journal=journal)
+    return ScoreBoard(settings.leaderboard_size)
+
+
+def _create_question_store(settings: AppSettings, database: Optional["SQLiteDatabase"]) -> QuestionBackend:
+    if settings.question_mode == "token":
+        from .tokens import SignedQuestionTokens
+
+        return SignedQuestionTokens(
+            settings.question_token_secret.encode("utf-8"),
+            ttl_seconds=settings.question_store_ttl_seconds,
+            replay_cache_size=settings.question_token_replay_cache_size,
+        )
+    if database is not None:
+        from .sqlite_backend import SQLiteQuestionStore
+
+        return SQLiteQuestionStore(
+            database,
+            limit=settings.question_store_limit,
+            ttl_seconds=settings.question_store_ttl_seconds,
+            sweep_interval_seconds=settings.question_store_sweep_seconds,
+        )
+    return QuestionStore(
+        limit=settings.question_store_limit,
+        ttl_seconds=settings.question_store_ttl_seconds,
+        sweep_interval_seconds=settings.question_store_sweep_seconds,
+    )
+
+
+def __getattr__(name: str):
+    # `uvicorn car_picker.app.main:app`처럼 처음 접근할 때 앱을 만든다.
+    # 테스트나 도구가 create_app만 가져갈 때는 앱을 만들지 않는다.
+    if name == "app":
+        application = globals()["app"] = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
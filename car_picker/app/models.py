@@ -3,7 +3,7 @@ from __future__ import annotations
 import enum
 from typing import Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, constr, validator
 
 
 class Difficulty(enum.Enum):
@@ -19,12 +19,36 @@ class Difficulty(enum.Enum):
             raise ValueError(f"지원하지 않는 난이도: {value}") from exc
 
 
+class DistractorMode(enum.Enum):
+    RANDOM = "random"
+    HARD = "hard"
+
+    @classmethod
+    def from_str(cls, value: str) -> "DistractorMode":
+        try:
+            return cls(value)
+        except ValueError as exc:
+            raise ValueError(f"지원하지 않는 보기 모드: {value}") from exc
+
+
+# 점수 기록과 저널은 이름 길이를 16비트로 저장하므로 UTF-8 4바이트 문자로도 넘지 않게 둔다.
+PLAYER_NAME_MAX_LENGTH = 64
+
+
+class LeaderboardWindow(enum.Enum):
+    ALL = "all"
+    DAY = "day"
+    WEEK = "week"
+
+
 class CarEntry(BaseModel):
     id: str
     make: str
     model: str
     year: str
     relative_path: str
+    # 원본 내용 해시(hex). 데이터셋을 만들 때 계산하며, 파일을 읽지 못했으면 None.
+    digest: Optional[str] = None
 
 
 class QuizOption(BaseModel):
@@ -44,6 +68,7 @@ class QuestionPayload(BaseModel):
     qid: str
     difficulty: Difficulty
     image_url: str = Field(..., alias="imageUrl")
+    image_srcset: str = Field("", alias="imageSrcset")
     prompt: str
     correct: QuizOption
     options: list[QuizOption]
@@ -53,11 +78,23 @@ class QuestionPayload(BaseModel):
         allow_population_by_field_name = True
 
 
+class QuestionBatch(BaseModel):
+    questions: list[QuestionPayload]
+
+
+class SessionResponse(BaseModel):
+    session_id: str = Field(..., alias="sessionId")
+    ttl_seconds: int = Field(..., alias="ttlSeconds")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
 class QuestionAnswer(BaseModel):
     qid: str
     difficulty: Difficulty
     answer: QuizOption
-    player: Optional[str] = None
+    player: Optional[constr(max_length=PLAYER_NAME_MAX_LENGTH)] = None
     timeout: bool = False
 
 
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import heapq
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .storage import NUMERIC_SPECS
+
+if TYPE_CHECKING:
+    from .indexer import CarDataset
+
+# 모델마다 보관하는 가까운 모델 수
+NEIGHBOR_COUNT = 16
+# 차체 형식 one-hot 성분의 가중치. 형식이 다르면 제곱 거리가 2 * BODY_WEIGHT**2 늘어난다.
+BODY_WEIGHT = 1.5
+# 모델마다 사양 평균을 낼 때 보는 최대 행 수. 같은 모델의 사양은 거의 같다.
+SAMPLE_ROWS = 32
+# NumPy 거리 행렬을 이 행 수씩 나눠 계산해 메모리를 모델 수에 선형으로 묶는다.
+_BLOCK_ROWS = 1024
+
+ModelKey = Tuple[str, str]
+Vector = Tuple[float, ...]
+
+
+@dataclass(frozen=True)
+class FeatureScale:
+    """특징 벡터의 표준화 기준: 숫자 사양마다 (평균, 표준편차)와 차체 형식 목록.
+
+    전체 재구성 때 정하고 증분 갱신 사이에는 그대로 써서, 모델 하나가 바뀌어도
+    다른 모델의 벡터가 달라지지 않게 한다.
+    """
+
+    scales: Tuple[Tuple[float, float], ...]
+    body_names: Tuple[str, ...]
+
+
+def _load_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def model_vectors(
+    dataset: "CarDataset",
+    scale: Optional[FeatureScale] = None,
+    pairs: Optional[Iterable[ModelKey]] = None,
+) -> Tuple[List[ModelKey], List[Vector], FeatureScale]:
+    """(제조사, 모델)마다 사양 특징 벡터를 만든다.
+
+    숫자 사양은 모델 평균(값 없음 제외)을 표준화하고, 값이 없으면 평균(0)으로 둔다.
+    가장 흔한 차체 형식은 `BODY_WEIGHT` 크기의 one-hot 성분이다. 사양이 하나도 없는
+    모델은 제외한다. `scale`이 없으면 모델 전체에서 표준화 기준을 정하고, `pairs`가
+    주어지면 그 모델들의 벡터만 만든다.
+    """
+    columns = dataset.columns
+    numeric = [columns.numeric[name] for name in NUMERIC_SPECS]
+    body_codes, body_values = columns.category_codes["body"], columns.categories["body"].values
+    if pairs is None:
+        groups: Iterable[Tuple[str, str, Sequence[int]]] = dataset.iter_make_model_rows()
+    else:
+        groups = [(make, model, dataset.rows_by_make_model(make, model)) for make, model in pairs]
+
+    keys: List[ModelKey] = []
+    means: List[List[Optional[float]]] = []
+    bodies: List[str] = []
+    for make, model, rows in groups:
+        sample = rows[:: max(1, len(rows) // SAMPLE_ROWS)]
+        mean: List[Optional[float]] = []
+        for values in numeric:
+            present = [values[row] for row in sample if values[row]]
+            mean.append(sum(present) / len(present) if present else None)
+        counts = Counter(body_values[body_codes[row]] for row in sample)
+        counts.pop("", None)
+        if not counts and all(value is None for value in mean):
+            continue
+        keys.append((make, model))
+        means.append(mean)
+        bodies.append(counts.most_common(1)[0][0] if counts else "")
+
+    if scale is None:
+        scales = []
+        for position in range(len(NUMERIC_SPECS)):
+            present = [mean[position] for mean in means if mean[position] is not None]
+            center = sum(present) / len(present) if present else 0.0
+            spread = math.sqrt(sum((value - center) ** 2 for value in present) / len(present)) if present else 0.0
+            scales.append((center, spread or 1.0))
+        scale = FeatureScale(tuple(scales), tuple(sorted({body for body in bodies if body})))
+
+    vectors: List[Vector] = []
+    for mean, body in zip(means, bodies):
+        features = [
+            (value - center) / spread if value is not None else 0.0
+            for value, (center, spread) in zip(mean, scale.scales)
+        ]
+        # 기준에 없는 새 차체 형식은 다음 전체 재구성 전까지 성분 없이 둔다.
+        features.extend(BODY_WEIGHT if name == body else 0.0 for name in scale.body_names)
+        vectors.append(tuple(features))
+    return keys, vectors, scale
+
+
+def nearest_to(key: ModelKey, vectors: Mapping[ModelKey, Vector], k: int = NEIGHBOR_COUNT) -> List[ModelKey]:
+    """모델 하나에 대해 자신을 제외하고 가까운 순서로 최대 k개의 모델."""
+    vector, dist = vectors[key], math.dist
+    nearest = heapq.nsmallest(k + 1, vectors, key=lambda other: dist(vector, vectors[other]))
+    return [other for other in nearest if other != key][:k]
+
+
+def nearest_neighbors(vectors: Sequence[Sequence[float]], k: int = NEIGHBOR_COUNT) -> List[List[int]]:
+    """벡터마다 자신을 제외하고 유클리드 거리가 가까운 순서로 최대 k개의 인덱스.
+
+    NumPy가 있으면 블록 단위 행렬 연산으로, 없으면 `math.dist`로 계산한다.
+    """
+    k = min(k, len(vectors) - 1)
+    if k <= 0:
+        return [[] for _ in vectors]
+    numpy = _load_numpy()
+    if numpy is not None:
+        return _nearest_numpy(numpy, vectors, k)
+    return _nearest_python(vectors, k)
+
+
+def _nearest_python(vectors: Sequence[Sequence[float]], k: int) -> List[List[int]]:
+    dist = math.dist
+    others = range(len(vectors))
+    neighbors = []
+    for index, vector in enumerate(vectors):
+        nearest = heapq.nsmallest(k + 1, others, key=lambda other: dist(vector, vectors[other]))
+        neighbors.append([other for other in nearest if other != index][:k])
+    return neighbors
+
+
+def _nearest_numpy(numpy, vectors: Sequence[Sequence[float]], k: int) -> List[List[int]]:
+    matrix = numpy.asarray(vectors, dtype=numpy.float64)
+    squared = numpy.einsum("ij,ij->i", matrix, matrix)
+    neighbors: List[List[int]] = []
+    for start in range(0, len(matrix), _BLOCK_ROWS):
+        block = matrix[start : start + _BLOCK_ROWS]
+        positions = numpy.arange(len(block))
+        distances = squared[start : start + len(block), None] + squared[None, :] - 2.0 * (block @ matrix.T)
+        distances[positions, positions + start] = numpy.inf
+        nearest = numpy.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = numpy.argsort(numpy.take_along_axis(distances, nearest, axis=1), axis=1, kind="stable")
+        neighbors.extend(numpy.take_along_axis(nearest, order, axis=1).tolist())
+    return neighbors
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from typing import Optional, Sequence
+
+from fastapi.responses import Response
+
+from .models import Difficulty, PlayerScore, QuizOption
+
+# FastAPI의 JSONResponse와 같은 형식
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def encode_option(option: QuizOption) -> bytes:
+    """검증이 끝난 보기를 JSON 조각으로 인코딩."""
+    return _dumps(
+        {"make": option.make, "model": option.model, "year": option.year, "label": option.label}
+    ).encode("utf-8")
+
+
+def encode_question(
+    qid: str,
+    difficulty: Difficulty,
+    image_url: str,
+    image_srcset: str,
+    prompt: str,
+    correct: bytes,
+    options: Sequence[bytes],
+    timeout: int,
+) -> bytes:
+    """`QuestionPayload`와 같은 JSON을 미리 인코딩된 보기 조각으로 조립."""
+    head = (
+        f'{{"qid":{_dumps(qid)},"difficulty":"{difficulty.value}",'
+        f'"imageUrl":{_dumps(image_url)},"imageSrcset":{_dumps(image_srcset)},'
+        f'"prompt":{_dumps(prompt)},"correct":'
+    ).encode("utf-8")
+    return b"".join((head, correct, b',"options":[', b",".join(options), b'],"timeout":%d}' % timeout))
+
+
+def encode_answer(correct: bool, correct_answer: bytes, message: str, score: Optional[PlayerScore]) -> bytes:
+    """`AnswerResponse`와 같은 JSON을 조립."""
+    score_json = "null" if score is None else _dumps(score.dict())
+    head = f'{{"correct":{"true" if correct else "false"},"correctAnswer":'.encode("utf-8")
+    tail = f',"message":{_dumps(message)},"score":{score_json}}}'.encode("utf-8")
+    return head + correct_answer + tail
+
+
+class PreEncodedJSONResponse(Response):
+    """이미 인코딩된 JSON 바이트를 그대로 보내는 응답.
+
+    라우트가 이 응답을 반환하면 FastAPI는 response_model 검증과 인코딩을 건너뛴다.
+    response_model은 문서화 용도로만 남는다.
+    """
+
+    media_type = "application/json"
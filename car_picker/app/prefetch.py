@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from .indexer import CarDataset
+from .models import CarEntry, Difficulty, QuizOption
+from .sampler import build_question_with_row
+from .sessions import RowBitset
+from .weighting import SamplingPolicy
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledQuestion:
+    dataset: CarDataset
+    row: int
+    entry: CarEntry
+    correct: QuizOption
+    options: List[QuizOption]
+
+
+class QuestionPrefetcher:
+    """난이도별로 미리 만든 문제를 보관하고 백그라운드 스레드에서 보충."""
+
+    def __init__(
+        self,
+        get_dataset: Callable[[], CarDataset],
+        low_watermark: int = 8,
+        high_watermark: int = 32,
+        idle_seconds: float = 1.0,
+        policy: Optional[SamplingPolicy] = None,
+    ) -> None:
+        self._get_dataset = get_dataset
+        self._policy = policy
+        self._low_watermark = low_watermark
+        self._high_watermark = high_watermark
+        self._idle_seconds = idle_seconds
+        self._queues: Dict[Difficulty, Deque[PooledQuestion]] = {
+            difficulty: deque(maxlen=high_watermark) for difficulty in Difficulty
+        }
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="question-prefetcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def pop(
+        self,
+        dataset: CarDataset,
+        difficulty: Difficulty,
+        exclude_ids: Set[str],
+        seen: Optional[RowBitset] = None,
+    ) -> Optional[PooledQuestion]:
+        """제외 목록과 `seen`에 없는 문제를 하나 꺼낸다. 없으면 None (호출자가 동기 생성).
+
+        꺼낸 문제의 행은 `seen`에 추가하며, 같은 세션의 다른 요청이 먼저 추가한 행은 건너뛴다.
+        """
+        found = None
+        with self._lock:
+            queue = self._queues[difficulty]
+            while queue and queue[0].dataset is not dataset:
+                # 데이터셋이 교체되기 전에 만든 문제는 버린다.
+                queue.popleft()
+            for index, pooled in enumerate(queue):
+                if seen is not None and pooled.row in seen:
+                    continue
+                if pooled.dataset is not dataset or pooled.entry.id in exclude_ids:
+                    continue
+                if seen is None or seen.try_add(pooled.row):
+                    found = pooled
+                    del queue[index]
+                    break
+            remaining = len(queue)
+        if remaining < self._low_watermark:
+            self._wakeup.set()
+        return found
+
+    def size(self, difficulty: Difficulty) -> int:
+        with self._lock:
+            return len(self._queues[difficulty])
+
+    def fill(self) -> None:
+        """모든 난이도를 상한까지 채운다."""
+        dataset = self._get_dataset()
+        for difficulty in Difficulty:
+            queue = self._queues[difficulty]
+            while len(queue) < self._high_watermark and not self._stop_event.is_set():
+                try:
+                    row, entry, correct, options = build_question_with_row(dataset, difficulty, policy=self._policy)
+                except ValueError:
+                    # 이 데이터셋으로는 해당 난이도 문제를 만들 수 없다.
+                    break
+                with self._lock:
+                    queue.append(PooledQuestion(dataset, row, entry, correct, options))
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.fill()
+            except Exception:  # 백그라운드 스레드가 죽지 않도록 기록만 한다.
+                LOGGER.exception("문제 미리 생성 실패")
+            self._wakeup.wait(self._idle_seconds)
+            self._wakeup.clear()
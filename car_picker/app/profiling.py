@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import contextvars
+import functools
+import logging
+import pstats
+import random
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+LOGGER = logging.getLogger(__name__)
+
+# 미들웨어가 이 요청을 프로파일링하기로 했는지. 스레드 풀로도 전달된다.
+_SAMPLED: contextvars.ContextVar[bool] = contextvars.ContextVar("car_picker_profile_sampled", default=False)
+
+
+def profile_filename(method: str, path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    return f"{method}_{slug}.pstats"
+
+
+class RequestProfiler:
+    """일부 요청의 엔드포인트 실행을 cProfile로 기록하고 라우트별로 합쳐 pstats 파일로 저장.
+
+    설정에서 켰을 때만 `install`로 미들웨어와 엔드포인트 래퍼가 붙으므로, 꺼져 있으면
+    요청 경로에 아무 코드도 추가되지 않는다. cProfile은 스레드 단위라서 CPU 작업이
+    스레드 풀에서 실행되는 동기 엔드포인트만 감싼다. Python 3.12부터는 프로파일러를
+    한 번에 하나만 켤 수 있으므로 동시에 하나만 기록하고, 이미 기록 중이거나 켜지 않으면
+    그 요청은 프로파일링 없이 실행한다.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        sample_rate: float = 0.0,
+        trigger_header: Optional[str] = None,
+        flush_interval_seconds: float = 30.0,
+    ) -> None:
+        self.output_dir = output_dir
+        self._sample_rate = sample_rate
+        self._trigger_header = trigger_header.lower().encode("latin-1") if trigger_header else None
+        self._flush_interval_seconds = flush_interval_seconds
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._dirty: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        # 기록 중인 프로파일이 있으면 잡혀 있다.
+        self._active = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def install(self, app: FastAPI) -> None:
+        """라우트 등록이 끝난 앱에 미들웨어와 엔드포인트 래퍼를 붙인다."""
+        app.add_middleware(ProfilingMiddleware, profiler=self)
+        for route in app.routes:
+            if isinstance(route, APIRoute) and not asyncio.iscoroutinefunction(route.dependant.call):
+                name = profile_filename(sorted(route.methods)[0], route.path)
+                route.dependant.call = self._wrap(route.dependant.call, name)
+
+    def should_sample(self, headers) -> bool:
+        if self._trigger_header is not None:
+            for name, _ in headers:
+                if name == self._trigger_header:
+                    return True
+        return self._sample_rate > 0 and random.random() < self._sample_rate
+
+    def record(self, name: str, profile: cProfile.Profile) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                self._stats[name] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+            self._dirty[name] = True
+
+    def flush(self) -> int:
+        """변경된 라우트의 누적 프로파일을 저장하고 저장한 파일 수를 반환."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with self._lock:
+            for name, dirty in self._dirty.items():
+                if not dirty:
+                    continue
+                target = self.output_dir / name
+                tmp_path = target.with_name(target.name + ".tmp")
+                self._stats[name].dump_stats(tmp_path)
+                tmp_path.replace(target)
+                self._dirty[name] = False
+                written += 1
+        return written
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _wrap(self, call: Callable, name: str) -> Callable:
+        @functools.wraps(call)
+        def profiled(*args, **kwargs):
+            if not _SAMPLED.get() or not self._active.acquire(blocking=False):
+                return call(*args, **kwargs)
+            try:
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError as exc:
+                    # 다른 프로파일링 도구가 이미 켜져 있다.
+                    LOGGER.warning("프로파일러를 켜지 못해 건너뜀: %s", exc)
+                    return call(*args, **kwargs)
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    profile.disable()
+                    self.record(name, profile)
+            finally:
+                self._active.release()
+
+        return profiled
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._flush_interval_seconds):
+            try:
+                self.flush()
+            except Exception:  # 백그라운드 스레드가 죽지 않도록 기록만 한다.
+                LOGGER.exception("프로파일 저장 실패")
+
+
+class ProfilingMiddleware:
+    """요청마다 프로파일링 여부를 정해 컨텍스트 변수에 기록하는 ASGI 미들웨어."""
+
+    def __init__(self, app, profiler: RequestProfiler) -> None:
+        self.app = app
+        self._profiler = profiler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self._profiler.should_sample(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        token = _SAMPLED.set(True)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _SAMPLED.reset(token)
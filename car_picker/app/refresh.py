@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from . import snapshot
+from .indexer import CarDataset, parse_relative_path
+from .models import CarEntry
+from .scan import ScanResult, changed_directories, list_directory, scan_roots, scan_subtree
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DatasetRefresher:
+    """데이터 루트를 주기적으로 확인하여 변경분만 반영한 새 데이터셋 버전으로 교체.
+
+    매번 전체를 다시 스캔하지 않고, 지난 스캔에서 본 디렉터리의 mtime만 확인해
+    바뀐 디렉터리만 한 단계 다시 훑는다. 새로 생긴 하위 디렉터리는 그 아래만 재귀적으로
+    스캔하고, 사라진 디렉터리는 그 아래 파일을 모두 삭제로 처리한다. 처음 확인할 때도
+    데이터셋을 적재할 때의 스캔 결과를 기준으로 삼는다. 파싱할 수 없는 파일만 바뀌었으면
+    새 버전을 만들지 않는다.
+    """
+
+    def __init__(
+        self,
+        dataset: CarDataset,
+        on_swap: Callable[[CarDataset], None],
+        interval_seconds: float = 60.0,
+    ) -> None:
+        self.current = dataset
+        self._on_swap = on_swap
+        self._interval_seconds = interval_seconds
+        # 디렉터리 절대 경로 → mtime_ns, 상대 경로 접두사, 바로 아래 이미지 상대 경로
+        self._directories: Dict[str, int] = {}
+        self._prefixes: Dict[str, str] = {}
+        self._files: Dict[str, Set[str]] = {}
+        if dataset.scan is not None:
+            self._seed(dataset.scan)
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="dataset-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def refresh_now(self) -> bool:
+        """변경분을 즉시 반영. 새 버전으로 교체했으면 True."""
+        with self._refresh_lock:
+            roots = self.current.roots
+            if self._directories:
+                added_names, removed_names = self._rescan_changed()
+            else:
+                scan = scan_roots(roots, self.current.scan_workers)
+                known = {self.current.path_of(row) for row in self.current.rows}
+                current_names = set(scan.paths)
+                added_names, removed_names = current_names - known, known - current_names
+                self._seed(scan)
+            if not added_names and not removed_names:
+                return False
+
+            added: List[CarEntry] = []
+            for name in sorted(added_names):
+                entry = parse_relative_path(name)
+                if entry is not None:
+                    added.append(entry)
+            removed_names = {name for name in removed_names if parse_relative_path(name) is not None}
+            if not added and not removed_names:
+                return False
+
+            dataset = self.current.apply_delta(added, removed_names)
+            self.current = dataset
+            self._on_swap(dataset)
+
+            if dataset.snapshot_path is not None:
+                fingerprint = snapshot.DirectoryFingerprint(
+                    mtime_ns=max(self._directories.values(), default=0),
+                    file_count=sum(map(len, self._files.values())),
+                    roots_key=roots.key(),
+                )
+                try:
+                    snapshot.write_snapshot(dataset.snapshot_path, fingerprint, dataset.live_columns())
+                except OSError as exc:
+                    LOGGER.warning("인덱스 스냅샷 갱신 실패: %s (%s)", dataset.snapshot_path, exc)
+            return True
+
+    def _seed(self, scan: ScanResult) -> None:
+        self._directories = dict(scan.directories)
+        self._prefixes = dict(scan.prefixes)
+        by_prefix = {prefix: directory for directory, prefix in self._prefixes.items()}
+        self._files = {directory: set() for directory in self._directories}
+        for path in scan.paths:
+            directory = by_prefix.get(path[: path.rfind("/") + 1])
+            if directory is not None:
+                self._files[directory].add(path)
+
+    def _rescan_changed(self) -> Tuple[Set[str], Set[str]]:
+        """mtime이 바뀐 디렉터리만 다시 훑어 (추가된 경로, 삭제된 경로)를 반환."""
+        added: Set[str] = set()
+        removed: Set[str] = set()
+        for directory in changed_directories(self._directories):
+            prefix = self._prefixes.get(directory)
+            if prefix is None:
+                # 앞서 처리한 상위 디렉터리와 함께 이미 제거되었다.
+                continue
+            try:
+                paths, subdirectories, mtime_ns = list_directory(directory, prefix)
+            except FileNotFoundError:
+                removed |= self._forget(directory)
+                continue
+
+            self._directories[directory] = mtime_ns
+            previous = self._files.get(directory, set())
+            current = set(paths)
+            added |= current - previous
+            removed |= previous - current
+            self._files[directory] = current
+
+            known_children = {child for child in self._prefixes if os.path.dirname(child) == directory}
+            for child in known_children - subdirectories.keys():
+                removed |= self._forget(child)
+            for child, child_prefix in subdirectories.items():
+                if child in known_children:
+                    continue
+                child_paths, child_mtimes, child_prefixes = scan_subtree(child, child_prefix)
+                self._directories.update(child_mtimes)
+                self._prefixes.update(child_prefixes)
+                by_prefix = {value: key for key, value in child_prefixes.items()}
+                for nested in child_mtimes:
+                    self._files.setdefault(nested, set())
+                for path in child_paths:
+                    self._files[by_prefix[path[: path.rfind("/") + 1]]].add(path)
+                added.update(child_paths)
+
+        # 같은 이름으로 다시 만들어진 디렉터리의 파일은 그대로 둔다.
+        unchanged = added & removed
+        return added - unchanged, removed - unchanged
+
+    def _forget(self, directory: str) -> Set[str]:
+        """디렉터리와 그 아래 디렉터리를 추적 대상에서 빼고, 그 안에 있던 경로를 반환."""
+        nested = directory + os.sep
+        removed: Set[str] = set()
+        for candidate in [key for key in self._directories if key == directory or key.startswith(nested)]:
+            del self._directories[candidate]
+            self._prefixes.pop(candidate, None)
+            removed |= self._files.pop(candidate, set())
+        return removed
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval_seconds):
+            try:
+                self.refresh_now()
+            except Exception:  # 백그라운드 스레드가 죽지 않도록 기록만 한다.
+                LOGGER.exception("데이터셋 갱신 실패")
@@ -1,29 +1,53 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
 
 from .models import (
     AnswerResponse,
+    CarEntry,
     Difficulty,
+    DistractorMode,
     LeaderboardResponse,
     LeaderboardReset,
+    LeaderboardWindow,
     QuestionAnswer,
+    QuestionBatch,
     QuestionPayload,
     QuizOption,
+    SessionResponse,
 )
-from .sampler import build_question
+from .indexer import EntryFilter
+from .metrics import QUESTION_POOL_REQUESTS
+from .payloads import PreEncodedJSONResponse, encode_answer, encode_option, encode_question
+from .sampler import build_question, build_questions
+from .sessions import RowBitset
+from .images import IMMUTABLE_CACHE_CONTROL, ImageStore, digest_bytes, etag_matches, is_digest, strong_etag
 from .settings import get_settings
+from .thumbnails import ThumbnailService, render_thumbnail
+from .weighting import SamplingPolicy
 
 
 router = APIRouter(prefix="/api", tags=["quiz"])
 
+QUESTION_PROMPT = "Guess the vehicle information."
+DATASET_RETRY_AFTER_SECONDS = 2
+
 
 def _get_dataset(request: Request):
     dataset = getattr(request.app.state, "dataset", None)
     if dataset is None:
-        raise RuntimeError("Dataset is not initialized.")
+        # 백그라운드 적재가 끝나기 전. 클라이언트는 잠시 후 다시 시도한다.
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Dataset is loading.",
+            headers={"Retry-After": str(DATASET_RETRY_AFTER_SECONDS)},
+        )
     return dataset
 
 
@@ -34,6 +58,35 @@ def _get_store(request: Request):
     return store
 
 
+def _get_sessions(request: Request):
+    sessions = getattr(request.app.state, "session_store", None)
+    if sessions is None:
+        raise RuntimeError("Session store is not initialized.")
+    return sessions
+
+
+def _get_seen(request: Request, session: Optional[str]) -> Optional[RowBitset]:
+    """세션 id가 주어지면 그 세션의 출제 기록. 없거나 만료된 세션이면 404."""
+    if session is None:
+        return None
+    found = _get_sessions(request).get(session)
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown or expired session.")
+    return found.seen
+
+
+def _get_policy(request: Request) -> Optional[SamplingPolicy]:
+    return getattr(request.app.state, "sampling_policy", None)
+
+
+def _get_thumbnails(request: Request) -> Optional[ThumbnailService]:
+    return getattr(request.app.state, "thumbnails", None)
+
+
+def _get_images(request: Request) -> Optional[ImageStore]:
+    return getattr(request.app.state, "images", None)
+
+
 def _get_scoreboard(request: Request):
     scoreboard = getattr(request.app.state, "scoreboard", None)
     if scoreboard is None:
@@ -47,41 +100,153 @@ def get_question(
     difficulty: str = Query("make_model_year"),
     exclude: Optional[List[str]] = Query(default=None),
     timer: Optional[int] = Query(default=None, ge=10, le=60),
+    body: Optional[str] = Query(default=None),
+    drive: Optional[str] = Query(default=None),
+    year_from: Optional[int] = Query(default=None, ge=1900, le=2100),
+    distractors: str = Query("random"),
+    session: Optional[str] = Query(default=None),
 ):
-    settings = get_settings()
     dataset = _get_dataset(request)
     store = _get_store(request)
+    difficulty_enum = _parse_difficulty(difficulty)
+    entry_filter = _entry_filter(body, drive, year_from)
+    mode = _parse_distractor_mode(distractors)
+    seen = _get_seen(request, session)
+
+    exclude_ids = set(exclude or [])
+
+    # 미리 만든 문제는 조건 없이 기본 보기로 만든 것이므로 조건이나 보기 모드가 있으면 쓰지 않는다.
+    pool_usable = not entry_filter and mode is DistractorMode.RANDOM
+    prefetcher = getattr(request.app.state, "question_prefetcher", None) if pool_usable else None
+    pooled = prefetcher.pop(dataset, difficulty_enum, exclude_ids, seen) if prefetcher is not None else None
+    if prefetcher is not None:
+        QUESTION_POOL_REQUESTS.inc(("hit" if pooled is not None else "miss",))
+    if pooled is not None:
+        entry, correct_option, options = pooled.entry, pooled.correct, pooled.options
+    else:
+        try:
+            entry, correct_option, options = build_question(
+                dataset, difficulty_enum, exclude_ids, entry_filter, mode, _get_policy(request), seen
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    stored = store.issue(difficulty=difficulty_enum, correct=correct_option)
+    encoded = _encode_question(request, dataset, stored.qid, difficulty_enum, entry, correct_option, options, timer)
+    return PreEncodedJSONResponse(encoded)
+
+
+@router.get("/questions", response_model=QuestionBatch)
+def get_questions(
+    request: Request,
+    difficulty: str = Query("make_model_year"),
+    count: int = Query(5, ge=1, le=20),
+    exclude: Optional[List[str]] = Query(default=None),
+    timer: Optional[int] = Query(default=None, ge=10, le=60),
+    body: Optional[str] = Query(default=None),
+    drive: Optional[str] = Query(default=None),
+    year_from: Optional[int] = Query(default=None, ge=1900, le=2100),
+    distractors: str = Query("random"),
+    session: Optional[str] = Query(default=None),
+):
+    """클라이언트 선행 로딩용으로 서로 다른 이미지의 문제 여러 개를 반환."""
+    dataset = _get_dataset(request)
+    store = _get_store(request)
+    difficulty_enum = _parse_difficulty(difficulty)
+    entry_filter = _entry_filter(body, drive, year_from)
+    mode = _parse_distractor_mode(distractors)
+    seen = _get_seen(request, session)
 
     try:
-        difficulty_enum = Difficulty.from_str(difficulty)
+        questions = build_questions(
+            dataset, difficulty_enum, count, set(exclude or []), entry_filter, mode, _get_policy(request), seen
+        )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    exclude_ids = set(exclude or [])
+    issued = store.issue_many([(difficulty_enum, correct) for _, correct, _ in questions])
+    encoded = [
+        _encode_question(request, dataset, stored.qid, difficulty_enum, entry, correct_option, options, timer)
+        for stored, (entry, correct_option, options) in zip(issued, questions)
+    ]
+    return PreEncodedJSONResponse(b'{"questions":[' + b",".join(encoded) + b"]}")
+
+
+@router.post("/sessions", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
+def create_session(request: Request):
+    """플레이 세션을 만든다. 문제 요청에 `session`을 주면 이 세션에서 출제한 이미지는 다시 나오지 않는다."""
+    sessions = _get_sessions(request)
+    dataset = getattr(request.app.state, "dataset", None)
+    created = sessions.create(capacity=len(dataset.columns) if dataset is not None else 0)
+    return SessionResponse(session_id=created.sid, ttl_seconds=sessions.ttl_seconds)
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_session(request: Request, session_id: str):
+    if not _get_sessions(request).delete(session_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown or expired session.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+
+def _entry_filter(body: Optional[str], drive: Optional[str], year_from: Optional[int]) -> EntryFilter:
+    return EntryFilter(body=body or None, drivetrain=drive or None, year_from=year_from)
+
+
+def _parse_difficulty(difficulty: str) -> Difficulty:
     try:
-        entry, correct_option, options = build_question(dataset, difficulty_enum, exclude_ids)
+        return Difficulty.from_str(difficulty)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    stored = store.issue(difficulty=difficulty_enum, correct=correct_option)
 
+def _parse_distractor_mode(value: str) -> DistractorMode:
+    try:
+        return DistractorMode.from_str(value)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+def _encode_question(
+    request: Request,
+    dataset,
+    qid: str,
+    difficulty: Difficulty,
+    entry: CarEntry,
+    correct_option: QuizOption,
+    options: List[QuizOption],
+    timer: Optional[int],
+) -> bytes:
+    """보기는 데이터셋 버전별로 미리 인코딩된 조각을 재사용해 응답 JSON을 조립."""
+    settings = get_settings()
     image_url = f"{settings.static_url_prefix}/{settings.cars_mount_name}/{entry.relative_path}"
+    image_srcset = ""
+
+    # 해시는 데이터셋을 만들 때 계산해 두었으므로 여기서는 파일을 건드리지 않는다.
+    digest = entry.digest if _get_images(request) is not None else None
+    if digest is not None:
+        # 내용 해시가 들어간 URL은 내용이 바뀌면 URL도 바뀌므로 영구 캐시할 수 있다.
+        image_url = f"{router.prefix}/images/{digest}/{entry.relative_path}"
+        thumbnails = _get_thumbnails(request)
+        if thumbnails is not None:
+            image_srcset = thumbnails.srcset(f"{router.prefix}/thumbnails", digest, entry.relative_path)
     timeout_value = timer if timer is not None else settings.timeout_seconds
 
-    return QuestionPayload(
-        qid=stored.qid,
-        difficulty=difficulty_enum,
-        imageUrl=image_url,
-        prompt="Guess the vehicle information.",
-        correct=correct_option,
-        options=options,
+    pools = dataset.distractor_pools
+    return encode_question(
+        qid=qid,
+        difficulty=difficulty,
+        image_url=image_url,
+        image_srcset=image_srcset,
+        prompt=QUESTION_PROMPT,
+        correct=pools.encoded(correct_option, difficulty),
+        options=[pools.encoded(option, difficulty) for option in options],
         timeout=timeout_value,
     )
 
 
 @router.post("/answer", response_model=AnswerResponse)
 def submit_answer(request: Request, payload: QuestionAnswer):
+    """채점은 발급된 문제의 정답만 보므로 데이터셋을 적재하는 중에도 처리한다."""
     store = _get_store(request)
     scoreboard = _get_scoreboard(request)
 
@@ -105,12 +270,8 @@ def submit_answer(request: Request, payload: QuestionAnswer):
         record = scoreboard.register_attempt(payload.player, stored.difficulty, is_correct)
         score_model = record.to_model()
 
-    return AnswerResponse(
-        correct=is_correct,
-        correctAnswer=correct_option,
-        message=message,
-        score=score_model,
-    )
+    encoded = encode_answer(is_correct, encode_option(correct_option), message, score_model)
+    return PreEncodedJSONResponse(encoded)
 
 
 def _check_answer(correct: QuizOption, answer: QuizOption, difficulty: Difficulty) -> bool:
@@ -128,11 +289,99 @@ def _check_answer(correct: QuizOption, answer: QuizOption, difficulty: Difficult
     )
 
 
+@router.get("/images/{digest}/{relative_path:path}")
+def get_image(request: Request, digest: str, relative_path: str):
+    """내용 해시로 주소가 정해진 원본 이미지. 한 번 받은 클라이언트는 다시 검증하지 않는다."""
+    images = _get_images(request)
+    if images is None or not is_digest(digest):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found.")
+
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": strong_etag(digest)}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    data = images.read(digest, relative_path)
+    if data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found.")
+    # 캐시에 보관된 bytes 객체를 복사 없이 그대로 응답 본문으로 사용한다.
+    return Response(content=data, media_type="image/jpeg", headers=headers)
+
+
+@router.get("/thumbnails/{width}/{digest}/{relative_path:path}")
+async def get_thumbnail(request: Request, width: int, digest: str, relative_path: str):
+    """고정 폭 파생 이미지를 반환. 캐시에 없으면 프로세스 풀에서 생성한다."""
+    thumbnails = _get_thumbnails(request)
+    images = _get_images(request)
+    if thumbnails is None or images is None or width not in thumbnails.widths:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown thumbnail size.")
+    if not is_digest(digest):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found.")
+
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": strong_etag(f"{digest}-{width}")}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    target = thumbnails.target_for(digest, width)
+    if not target.exists():
+        # 원본 내용이 URL의 해시와 같은지 확인한다. 읽은 바이트는 캐시에 남는다.
+        if await run_in_threadpool(images.read, digest, relative_path) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found.")
+        source = images.source_path(relative_path)
+        loop = asyncio.get_running_loop()
+        executor = thumbnails.executor
+        try:
+            await loop.run_in_executor(executor, render_thumbnail, source, target, width, thumbnails.image_format)
+        except BrokenProcessPool:
+            # 디코딩 중 작업 프로세스가 죽었다. 풀을 새로 만들고 이 이미지는 거절한다.
+            thumbnails.discard_executor(executor)
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported image.")
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported image.")
+        except OSError:
+            # 디코딩할 수 없는 이미지는 원본을 그대로 보낸다.
+            return FileResponse(source, media_type="image/jpeg")
+
+    return FileResponse(target, media_type=thumbnails.media_type, headers=headers)
+
+
 @router.get("/leaderboard", response_model=LeaderboardResponse)
-def get_leaderboard(request: Request):
+def get_leaderboard(
+    request: Request,
+    window: LeaderboardWindow = Query(LeaderboardWindow.ALL),
+    difficulty: Optional[str] = Query(default=None),
+):
+    difficulty_enum = _parse_difficulty(difficulty) if difficulty is not None else None
+    body, etag = _leaderboard_body(request, window, difficulty_enum)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _leaderboard_body(
+    request: Request,
+    window: LeaderboardWindow,
+    difficulty: Optional[Difficulty],
+) -> tuple[bytes, str]:
+    """직렬화된 리더보드 응답과 ETag. 메모리 리더보드는 버전이 같으면 그대로 재사용한다."""
     scoreboard = _get_scoreboard(request)
-    entries = scoreboard.top_entries()
-    return LeaderboardResponse(entries=entries)
+    version_of = getattr(scoreboard, "version_of", None)
+    # 버전을 먼저 읽어야 캐시된 내용이 그 버전보다 오래되지 않는다.
+    version = version_of(window, difficulty) if version_of is not None else None
+    cache = getattr(request.app.state, "leaderboard_cache", None)
+    if cache is None:
+        cache = request.app.state.leaderboard_cache = {}
+    key = (window, difficulty)
+    cached = cache.get(key)
+    if version is not None and cached is not None and cached[0] is scoreboard and cached[1] == version:
+        return cached[2], cached[3]
+
+    entries = scoreboard.top_entries(window, difficulty)
+    body = LeaderboardResponse(entries=entries).json().encode("utf-8")
+    etag = strong_etag(digest_bytes(body))
+    if version is not None:
+        cache[key] = (scoreboard, version, body, etag)
+    return body, etag
 
 
 @router.post("/leaderboard/reset", response_model=LeaderboardReset)
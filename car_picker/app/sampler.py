@@ -1,165 +1,153 @@
 from __future__ import annotations
 
 import random
-from typing import List, Set
+from functools import partial
+from typing import List, Optional, Sequence, Set
 
-from .indexer import CarDataset
-from .models import CarEntry, Difficulty, QuizOption
+from .distractors import sample_into
+from .indexer import CarDataset, EntryFilter
+from .metrics import BUILD_QUESTION_SECONDS
+from .models import CarEntry, Difficulty, DistractorMode, QuizOption
+from .sessions import RowBitset
+from .weighting import SamplingPolicy, StratifiedSampler
+
+# 제외 목록이 데이터셋의 절반 이하이면 이 횟수 안에 실패할 확률은 2^-32 이하다.
+REJECTION_ATTEMPTS = 32
 
 
 def build_question(
     dataset: CarDataset,
     difficulty: Difficulty,
     exclude_ids: Set[str] | None = None,
+    entry_filter: Optional[EntryFilter] = None,
+    mode: DistractorMode = DistractorMode.RANDOM,
+    policy: Optional[SamplingPolicy] = None,
+    seen: Optional[RowBitset] = None,
 ) -> tuple[CarEntry, QuizOption, List[QuizOption]]:
-    """질문과 보기 목록을 생성한다."""
-    exclude_ids = exclude_ids or set()
-    candidates = [entry for entry in dataset.entries if entry.id not in exclude_ids]
-    if not candidates:
-        raise ValueError("사용 가능한 항목이 없습니다.")
+    """질문과 보기 목록을 생성한다. 정답 항목은 `entry_filter`에 맞는 행에서 고른다.
 
-    correct_entry = random.choice(candidates)
-    correct_option = _make_option(correct_entry, difficulty)
-    options = _generate_options(dataset, correct_entry, difficulty)
-    return correct_entry, correct_option, options
+    `mode`가 HARD이면 사양이 비슷한 모델을 오답 보기로 우선 사용한다. `policy`가 있으면
+    정답 항목을 그 정책의 층화 추출로 고르며, 조건이 있으면 조건에 맞는 행에서 균등하게 고른다.
+    `seen`(세션의 출제 기록)을 주면 그 행들은 고르지 않고, 고를 때 `seen`에 추가한다.
+    """
+    _, entry, correct_option, options = build_question_with_row(
+        dataset, difficulty, exclude_ids, entry_filter, mode, policy, seen
+    )
+    return entry, correct_option, options
 
 
-def _generate_options(
+def build_question_with_row(
     dataset: CarDataset,
-    correct: CarEntry,
     difficulty: Difficulty,
-    option_count: int = 10,
-) -> List[QuizOption]:
-    option_map: dict[str, QuizOption] = {}
-
-    def add_option(entry: CarEntry) -> None:
-        option = _make_option(entry, difficulty)
-        if option.label in option_map:
-            return
-        option_map[option.label] = option
-
-    add_option(correct)
-
-    if difficulty is Difficulty.MAKE:
-        _fill_make_options(dataset, correct.make, option_map, option_count)
-    elif difficulty is Difficulty.MAKE_MODEL:
-        _fill_make_model_options(dataset, correct, option_map, option_count)
-    else:
-        _fill_make_model_year_options(dataset, correct, option_map, option_count)
-
-    options = list(option_map.values())
-    if len(options) < option_count:
-        raise ValueError("충분한 보기 생성에 실패했습니다.")
-
-    random.shuffle(options)
-    return options[:option_count]
-
-
-def _fill_make_options(
+    exclude_ids: Set[str] | None = None,
+    entry_filter: Optional[EntryFilter] = None,
+    mode: DistractorMode = DistractorMode.RANDOM,
+    policy: Optional[SamplingPolicy] = None,
+    seen: Optional[RowBitset] = None,
+) -> tuple[int, CarEntry, QuizOption, List[QuizOption]]:
+    """`build_question`과 같고 정답 항목의 행 번호를 함께 반환."""
+    with BUILD_QUESTION_SECONDS.time((difficulty.value,)):
+        sampler = dataset.stratified_sampler(policy) if policy and not entry_filter else None
+        row = pick_row(dataset, exclude_ids or set(), dataset.filtered_rows(entry_filter), sampler, seen)
+        correct_entry = dataset.entry_at(row)
+        correct_option = dataset.distractor_pools.option_for(correct_entry, difficulty)
+        options = _generate_options(dataset, correct_entry, difficulty, mode)
+    return row, correct_entry, correct_option, options
+
+
+def build_questions(
     dataset: CarDataset,
-    correct_make: str,
-    option_map: dict[str, QuizOption],
-    option_count: int,
-) -> None:
-    makes = dataset.unique_makes[:]
-    random.shuffle(makes)
-    for make in makes:
-        if make == correct_make:
-            continue
-        entries = dataset.get_entries_by_make(make)
-        if not entries:
-            continue
-        entry = random.choice(entries)
-        option = _make_option(entry, Difficulty.MAKE)
-        if option.label not in option_map:
-            option_map[option.label] = option
-        if len(option_map) >= option_count:
-            break
-
-
-def _fill_make_model_options(
+    difficulty: Difficulty,
+    count: int,
+    exclude_ids: Set[str] | None = None,
+    entry_filter: Optional[EntryFilter] = None,
+    mode: DistractorMode = DistractorMode.RANDOM,
+    policy: Optional[SamplingPolicy] = None,
+    seen: Optional[RowBitset] = None,
+) -> List[tuple[CarEntry, QuizOption, List[QuizOption]]]:
+    """서로 다른 항목으로 최대 `count`개의 질문을 생성한다."""
+    excluded = set(exclude_ids or ())
+    questions = []
+    for _ in range(count):
+        try:
+            question = build_question(dataset, difficulty, excluded, entry_filter, mode, policy, seen)
+        except ValueError:
+            if questions:
+                break
+            raise
+        if seen is None:
+            excluded.add(question[0].id)
+        questions.append(question)
+    return questions
+
+
+def pick_row(
     dataset: CarDataset,
-    correct: CarEntry,
-    option_map: dict[str, QuizOption],
-    option_count: int,
-) -> None:
-    same_make_entries = dataset.get_entries_by_make(correct.make)
-    shuffled = same_make_entries[:]
-    random.shuffle(shuffled)
-    for entry in shuffled:
-        if entry.model == correct.model:
-            continue
-        option = _make_option(entry, Difficulty.MAKE_MODEL)
-        if option.label not in option_map:
-            option_map[option.label] = option
-        if len(option_map) >= option_count:
-            return
+    exclude_ids: Set[str],
+    rows: Optional[Sequence[int]] = None,
+    sampler: Optional[StratifiedSampler] = None,
+    seen: Optional[RowBitset] = None,
+) -> int:
+    """제외 목록에 없는 행을 균등하게 하나 선택. `rows`를 주면 그 행들 중에서 고른다.
+
+    거절 샘플링으로 데이터셋 크기와 무관한 시간에 뽑고, 제외 목록이 조밀해
+    계속 실패할 때만 전체 후보를 모아 고른다. `sampler`를 주면 균등 추출 대신
+    층화 추출로 뽑고, 후보를 모으는 마지막 단계에서는 가중치가 0인 층을 뺀 행에서
+    균등하게 고른다. `seen`에 있는 행도 제외 목록처럼 건너뛰고, 고른 행은 `try_add`로
+    `seen`에 넣는다. 같은 세션의 다른 요청이 먼저 넣은 행은 건너뛰므로 두 요청이 같은
+    행을 고르지 않는다.
+    """
+    if rows is None:
+        rows = dataset.rows
+    if not rows:
+        raise ValueError("사용 가능한 항목이 없습니다.")
+    draw = sampler.draw if sampler is not None else partial(random.choice, rows)
+    if not exclude_ids and seen is None:
+        return draw()
 
-    _fill_random_entries(dataset, option_map, option_count, Difficulty.MAKE_MODEL)
+    id_of = dataset.id_of
 
+    def available(row: int) -> bool:
+        if seen is not None and row in seen:
+            return False
+        return not exclude_ids or id_of(row) not in exclude_ids
 
-def _fill_make_model_year_options(
-    dataset: CarDataset,
-    correct: CarEntry,
-    option_map: dict[str, QuizOption],
-    option_count: int,
-) -> None:
-    variants = dataset.get_entries_by_make_model(correct.make, correct.model)
-    shuffled = variants[:]
-    random.shuffle(shuffled)
-    for entry in shuffled:
-        if entry.year == correct.year:
-            continue
-        option = _make_option(entry, Difficulty.MAKE_MODEL_YEAR)
-        if option.label not in option_map:
-            option_map[option.label] = option
-        if len(option_map) >= option_count:
-            return
-
-    same_make = dataset.get_entries_by_make(correct.make)
-    shuffled_same_make = same_make[:]
-    random.shuffle(shuffled_same_make)
-    for entry in shuffled_same_make:
-        if entry.model == correct.model and entry.year == correct.year:
-            continue
-        option = _make_option(entry, Difficulty.MAKE_MODEL_YEAR)
-        if option.label not in option_map:
-            option_map[option.label] = option
-        if len(option_map) >= option_count:
-            return
+    def claim(row: int) -> bool:
+        return seen is None or seen.try_add(row)
+
+    if len(exclude_ids) + (len(seen) if seen is not None else 0) < len(rows):
+        for _ in range(REJECTION_ATTEMPTS):
+            row = draw()
+            if available(row) and claim(row):
+                return row
 
-    _fill_random_entries(dataset, option_map, option_count, Difficulty.MAKE_MODEL_YEAR)
+    pool = sampler.rows() if sampler is not None else rows
+    candidates = [row for row in pool if available(row)]
+    random.shuffle(candidates)
+    for row in candidates:
+        if claim(row):
+            return row
+    raise ValueError("사용 가능한 항목이 없습니다.")
 
 
-def _fill_random_entries(
+def _generate_options(
     dataset: CarDataset,
-    option_map: dict[str, QuizOption],
-    option_count: int,
+    correct: CarEntry,
     difficulty: Difficulty,
-) -> None:
-    entries = dataset.entries[:]
-    random.shuffle(entries)
-    for entry in entries:
-        option = _make_option(entry, difficulty)
-        if option.label in option_map:
-            continue
-        option_map[option.label] = option
-        if len(option_map) >= option_count:
-            return
-
-
-def _format_label(entry: CarEntry, difficulty: Difficulty) -> str:
-    if difficulty is Difficulty.MAKE:
-        return entry.make
-    if difficulty is Difficulty.MAKE_MODEL:
-        return f"{entry.make} {entry.model}"
-    return f"{entry.make} {entry.model} {entry.year}"
+    mode: DistractorMode = DistractorMode.RANDOM,
+    option_count: int = 10,
+) -> List[QuizOption]:
+    pools = dataset.distractor_pools
+    if pools.label_count(difficulty) < option_count:
+        raise ValueError("충분한 보기 생성에 실패했습니다.")
 
+    correct_option = pools.option_for(correct, difficulty)
+    option_map: dict[str, QuizOption] = {correct_option.label: correct_option}
+    for pool in pools.tiers(correct, difficulty, mode):
+        sample_into(pool, option_map, option_count)
+        if len(option_map) >= option_count:
+            break
 
-def _make_option(entry: CarEntry, difficulty: Difficulty) -> QuizOption:
-    label = _format_label(entry, difficulty)
-    if difficulty is Difficulty.MAKE:
-        return QuizOption(make=entry.make, label=label)
-    if difficulty is Difficulty.MAKE_MODEL:
-        return QuizOption(make=entry.make, model=entry.model, label=label)
-    return QuizOption(make=entry.make, model=entry.model, year=entry.year, label=label)
+    options = list(option_map.values())
+    random.shuffle(options)
+    return options
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+IMAGE_SUFFIX = ".jpg"
+
+# (루트 기준 상대 경로 목록, 디렉터리 절대 경로 → mtime_ns, 디렉터리 절대 경로 → 상대 경로 접두사)
+Subtree = Tuple[List[str], Dict[str, int], Dict[str, str]]
+
+
+class DataRoots:
+    """이미지 루트 디렉터리 목록과 상대 경로 ↔ 실제 경로 변환.
+
+    루트가 하나면 상대 경로는 그 루트 기준이라 기존 URL이 그대로 유지된다. 여러 개면
+    상대 경로 앞에 루트 이름(디렉터리 이름, 겹치면 순번을 붙임)을 붙여 구분한다.
+    루트 목록이 같으면 같은 파일은 언제나 같은 상대 경로를 가진다.
+    """
+
+    def __init__(self, roots: Sequence[Path]) -> None:
+        if not roots:
+            raise ValueError("이미지 루트 디렉터리가 하나 이상 필요합니다.")
+        self.paths: List[Path] = [Path(root).resolve() for root in roots]
+        self.labels: List[str] = []
+        if len(self.paths) > 1:
+            for index, path in enumerate(self.paths):
+                label = path.name or f"root{index}"
+                if label in self.labels:
+                    label = f"{label}-{index}"
+                self.labels.append(label)
+        else:
+            self.labels.append("")
+        self._by_label = dict(zip(self.labels, self.paths))
+
+    @classmethod
+    def of(cls, value: Union["DataRoots", Path, Sequence[Path]]) -> "DataRoots":
+        if isinstance(value, DataRoots):
+            return value
+        if isinstance(value, (str, os.PathLike)):
+            return cls([Path(value)])
+        return cls(list(value))
+
+    @property
+    def primary(self) -> Path:
+        return self.paths[0]
+
+    def prefix(self, index: int) -> str:
+        label = self.labels[index]
+        return f"{label}/" if label else ""
+
+    def key(self) -> int:
+        """루트 구성이 바뀌면 달라지는 값 (스냅샷 유효성 판단용)."""
+        return zlib.crc32("\0".join(str(path) for path in self.paths).encode("utf-8"))
+
+    def _split(self, relative_path: str) -> Optional[Tuple[Path, str]]:
+        if len(self.paths) == 1:
+            return self.paths[0], relative_path
+        label, _, rest = relative_path.partition("/")
+        root = self._by_label.get(label)
+        if root is None or not rest:
+            return None
+        return root, rest
+
+    def locate(self, relative_path: str) -> Optional[Path]:
+        """상대 경로가 가리키는 실제 경로. 존재 여부와 루트 이탈은 확인하지 않는다."""
+        split = self._split(relative_path)
+        return split[0] / split[1] if split is not None else None
+
+    def source_path(self, relative_path: str) -> Optional[Path]:
+        """레이블이 가리키는 루트 밖으로 나가지 않는 실제 파일 경로. 없으면 None."""
+        split = self._split(relative_path)
+        if split is None:
+            return None
+        root, rest = split
+        source = (root / rest).resolve()
+        if root not in source.parents or not source.is_file():
+            return None
+        return source
+
+    def mounts(self) -> List[Tuple[str, Path]]:
+        """(URL 접두사 레이블, 루트 경로). 루트가 하나면 레이블은 빈 문자열."""
+        return list(zip(self.labels, self.paths))
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+@dataclass
+class ScanResult:
+    # 정렬된 이미지 상대 경로 (루트 접두사 포함, 구분자는 `/`)
+    paths: List[str]
+    # 스캔한 디렉터리의 절대 경로 → mtime_ns. 변경 감지에 사용한다.
+    directories: Dict[str, int]
+    # 스캔한 디렉터리의 절대 경로 → 그 안 파일의 상대 경로 접두사 (`/`로 끝나거나 빈 문자열)
+    prefixes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def latest_mtime_ns(self) -> int:
+        return max(self.directories.values(), default=0)
+
+
+def list_directory(
+    directory: str,
+    prefix: str,
+    suffix: str = IMAGE_SUFFIX,
+) -> Tuple[List[str], Dict[str, str], int]:
+    """디렉터리 한 단계만 훑는다. (이미지 상대 경로, 하위 디렉터리 → 접두사, mtime_ns).
+
+    디렉터리가 없으면 FileNotFoundError.
+    """
+    mtime_ns = os.stat(directory).st_mtime_ns
+    paths: List[str] = []
+    subdirectories: Dict[str, str] = {}
+    with os.scandir(directory) as iterator:
+        for item in iterator:
+            name = item.name
+            if name.startswith("."):
+                continue
+            if item.is_dir(follow_symlinks=False):
+                subdirectories[item.path] = f"{prefix}{name}/"
+            elif name.endswith(suffix):
+                paths.append(prefix + name)
+    return paths, subdirectories, mtime_ns
+
+
+def scan_subtree(directory: str, prefix: str, suffix: str = IMAGE_SUFFIX) -> Subtree:
+    """디렉터리 하나를 재귀적으로 훑는다 (작업 스레드에서 실행)."""
+    paths: List[str] = []
+    mtimes: Dict[str, int] = {}
+    prefixes: Dict[str, str] = {}
+    stack = [(directory, prefix)]
+    while stack:
+        current, current_prefix = stack.pop()
+        try:
+            mtimes[current] = os.stat(current).st_mtime_ns
+            prefixes[current] = current_prefix
+            with os.scandir(current) as iterator:
+                for item in iterator:
+                    name = item.name
+                    if name.startswith("."):
+                        continue
+                    if item.is_dir(follow_symlinks=False):
+                        stack.append((item.path, f"{current_prefix}{name}/"))
+                    elif name.endswith(suffix):
+                        paths.append(current_prefix + name)
+        except FileNotFoundError:
+            # 스캔 도중 삭제된 디렉터리
+            mtimes.pop(current, None)
+            prefixes.pop(current, None)
+    return paths, mtimes, prefixes
+
+
+def scan_roots(
+    roots: DataRoots,
+    workers: Optional[int] = None,
+    suffix: str = IMAGE_SUFFIX,
+) -> ScanResult:
+    """모든 루트를 재귀적으로 스캔. 루트 바로 아래 하위 디렉터리마다 작업 하나를 나눠 맡긴다.
+
+    `os.scandir`/`stat`은 시스템 호출 동안 GIL을 놓으므로 스레드 풀로도 디렉터리 수와
+    디스크(볼륨) 수만큼 병렬로 진행된다. `.`으로 시작하는 파일과 디렉터리는 건너뛴다.
+    """
+    paths: List[str] = []
+    directories: Dict[str, int] = {}
+    prefixes: Dict[str, str] = {}
+    subtrees: List[Tuple[str, str]] = []
+    for index, root in enumerate(roots.paths):
+        prefix = roots.prefix(index)
+        directories[str(root)] = os.stat(root).st_mtime_ns
+        prefixes[str(root)] = prefix
+        with os.scandir(root) as iterator:
+            for item in iterator:
+                name = item.name
+                if name.startswith("."):
+                    continue
+                if item.is_dir(follow_symlinks=False):
+                    subtrees.append((item.path, f"{prefix}{name}/"))
+                elif name.endswith(suffix):
+                    paths.append(prefix + name)
+
+    if subtrees:
+        if workers is None:
+            workers = min(32, (os.cpu_count() or 1) + 4)
+        workers = max(1, min(workers, len(subtrees)))
+        if workers == 1:
+            results = [scan_subtree(directory, prefix, suffix) for directory, prefix in subtrees]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dataset-scan") as executor:
+                results = list(
+                    executor.map(lambda subtree: scan_subtree(subtree[0], subtree[1], suffix), subtrees)
+                )
+        for subtree_paths, subtree_mtimes, subtree_prefixes in results:
+            paths.extend(subtree_paths)
+            directories.update(subtree_mtimes)
+            prefixes.update(subtree_prefixes)
+
+    paths.sort()
+    return ScanResult(paths=paths, directories=directories, prefixes=prefixes)
+
+
+def changed_directories(directories: Dict[str, int]) -> List[str]:
+    """스캔 이후 mtime이 바뀌었거나 사라진 디렉터리 (경로 순).
+
+    파일 추가/삭제/이름 변경은 부모 디렉터리의 mtime을 바꾸므로, 파일 수보다 훨씬 적은
+    디렉터리만 stat해서 어느 디렉터리를 다시 훑을지 정할 수 있다.
+    """
+    changed = []
+    for directory, mtime_ns in directories.items():
+        try:
+            if os.stat(directory).st_mtime_ns != mtime_ns:
+                changed.append(directory)
+        except FileNotFoundError:
+            changed.append(directory)
+    changed.sort()
+    return changed
@@ -1,10 +1,55 @@
 from __future__ import annotations
 
+import heapq
+import itertools
 import threading
-from dataclasses import dataclass, field
-from typing import Dict, List
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Protocol, Tuple
 
-from .models import Difficulty, LeaderboardEntry, PlayerScore
+from .metrics import SCOREBOARD_LOCK_WAIT_SECONDS
+from .models import Difficulty, LeaderboardEntry, LeaderboardWindow, PlayerScore
+
+if TYPE_CHECKING:
+    from .journal import ScoreJournal
+
+BASE_POINTS = 10
+STREAK_THRESHOLD = 3
+STREAK_BONUS = 5
+
+# (점수, 정답률) 순으로 비교
+RankKey = Tuple[int, float]
+
+SECONDS_PER_DAY = 86400
+# 난이도별 누적 집계의 기간 값
+ALL_TIME = -1
+RETENTION_DAYS = 7
+WINDOW_DAYS = {LeaderboardWindow.DAY: 1, LeaderboardWindow.WEEK: 7}
+
+# (UTC 기준 일 번호 또는 ALL_TIME, 난이도)
+BucketKey = Tuple[int, Difficulty]
+Buckets = Dict[BucketKey, Dict[str, "ScoreRecord"]]
+# (기간, 난이도) 리더보드. 전체 기간/전체 난이도는 `ScoreBoard.version`이 맡는다.
+View = Tuple[LeaderboardWindow, Optional[Difficulty]]
+VIEWS: Tuple[View, ...] = tuple(
+    (window, level)
+    for window in LeaderboardWindow
+    for level in (None, *Difficulty)
+    if window is not LeaderboardWindow.ALL or level is not None
+)
+
+
+def day_number(timestamp: float) -> int:
+    return int(timestamp // SECONDS_PER_DAY)
+
+
+def difficulty_bonus(difficulty: Difficulty) -> int:
+    if difficulty is Difficulty.MAKE:
+        return 0
+    if difficulty is Difficulty.MAKE_MODEL:
+        return 5
+    return 10
 
 
 @dataclass
@@ -31,13 +76,128 @@ class ScoreRecord:
         return self.total_correct / self.total_attempts
 
 
+def apply_attempt(record: ScoreRecord, difficulty: Difficulty, correct: bool) -> int:
+    """시도 하나를 반영하고 이번에 얻은 점수를 반환."""
+    record.total_attempts += 1
+    if not correct:
+        record.streak = 0
+        return 0
+    record.total_correct += 1
+    record.streak += 1
+    points = BASE_POINTS + difficulty_bonus(difficulty)
+    if record.streak >= STREAK_THRESHOLD:
+        points += STREAK_BONUS
+    record.points += points
+    return points
+
+
+class ScoreBackend(Protocol):
+    """리더보드 저장소 (메모리, SQLite)."""
+
+    def register_attempt(self, player: str, difficulty: Difficulty, correct: bool) -> ScoreRecord: ...
+
+    def reset(self) -> int: ...
+
+    def top_entries(
+        self,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
+        difficulty: Optional[Difficulty] = None,
+    ) -> List[LeaderboardEntry]: ...
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+
+def _expire_buckets(buckets: Buckets, today: int) -> None:
+    """보존 기간이 지난 일별 집계를 버린다."""
+    oldest = today - RETENTION_DAYS + 1
+    for key in [key for key in buckets if key[0] != ALL_TIME and key[0] < oldest]:
+        del buckets[key]
+
+
 class ScoreBoard:
-    """메모리 기반 리더보드."""
+    """메모리 기반 리더보드.
+
+    플레이어는 해시로 여러 잠금에 나뉘어 서로 다른 플레이어의 기록이 한 잠금에서
+    줄 서지 않는다. 상위 목록은 `max_entries`의 두 배까지 후보를 유지하며, 후보 밖 플레이어의
+    점수 상한(`_top_floor`)을 잠금 없이 먼저 비교해 후보에 들 수 있을 때만 `_top_lock`을
+    잡는다. 상한이 상위권을 넘볼 때만 전체를 다시 훑는다. `version`은 상위 목록이 바뀔 수
+    있는 변경마다 증가한다.
+
+    기간/난이도별 리더보드를 위해 (UTC 일, 난이도)와 (전체 기간, 난이도) 단위로
+    플레이어별 집계를 함께 누적한다. 집계는 잠금 구역마다 따로 두어 플레이어 잠금만으로
+    갱신하고, 기간 리더보드는 읽을 때 구역들의 해당 기간 집계 몇 개를 합쳐 만든다.
+    `RETENTION_DAYS`보다 오래된 일별 집계는 버린다. 기간/난이도별 버전은 마지막으로 계산한
+    결과의 N번째 점수를 기억해 두고, 시도한 플레이어가 그 결과에 있거나 들 수 있을 때만 올린다.
 
-    def __init__(self, max_entries: int = 10) -> None:
+    journal이 주어지면 시작할 때 저널에서 점수를 복원하고, 이후의 모든 변경을
+    저널에 이벤트로 남긴다. 디스크 쓰기는 저널의 백그라운드 스레드가 맡는다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10,
+        journal: Optional["ScoreJournal"] = None,
+        lock_stripes: int = 16,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
         self._records: Dict[str, ScoreRecord] = {}
-        self._lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(lock_stripes)]
         self._max_entries = max_entries
+        self._top_capacity = max_entries * 2
+        self._top: Dict[str, RankKey] = {}
+        # 후보에 없는 플레이어 점수의 상한. None이면 모든 플레이어가 후보에 있다.
+        self._top_floor: Optional[RankKey] = None
+        self._top_lock = threading.Lock()
+        # 후보를 다시 뽑는 동안 홀수. 잠금 없이 상한을 비교할 때 재구성과 겹쳤는지 확인한다.
+        self._top_epoch = 0
+        self._version = 0
+        self._clock = clock
+        # 잠금 구역마다의 집계. 한 플레이어의 집계는 항상 그 플레이어의 구역에 있다.
+        self._buckets: List[Buckets] = [{} for _ in range(lock_stripes)]
+        self._bucket_versions = itertools.count(1)
+        self._view_versions: Dict[View, int] = {}
+        # 기간/난이도별로 마지막에 계산한 (버전, 일, N번째 키 또는 None, 표시된 플레이어)
+        self._view_cutoffs: Dict[View, Tuple[int, int, Optional[RankKey], FrozenSet[str]]] = {}
+        self._view_lock = threading.Lock()
+        self._journal = journal
+        if journal is not None:
+            self._records, buckets, events = journal.load()
+            for key, bucket in buckets.items():
+                for player, entry in bucket.items():
+                    self._buckets[self._stripe_of(player)].setdefault(key, {})[player] = entry
+            for player, difficulty, correct, day in events:
+                if difficulty is None:
+                    self._records.clear()
+                    for stripe_buckets in self._buckets:
+                        stripe_buckets.clear()
+                else:
+                    record = self._records.setdefault(player, ScoreRecord(player=player))
+                    points = apply_attempt(record, difficulty, correct)
+                    self._add_to_buckets(player, difficulty, correct, points, day)
+            for stripe_buckets in self._buckets:
+                _expire_buckets(stripe_buckets, day_number(clock()))
+            with self._top_lock:
+                self._rebuild_top()
+            journal.attach(self._capture)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def version_of(
+        self,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
+        difficulty: Optional[Difficulty] = None,
+    ) -> Hashable:
+        """`top_entries(window, difficulty)`의 결과가 바뀌면 달라지는 값."""
+        if window is LeaderboardWindow.ALL and difficulty is None:
+            return self._version
+        version = self._view_versions.get((window, difficulty), 0)
+        if window is LeaderboardWindow.ALL:
+            return version
+        return version, day_number(self._clock())
 
     def register_attempt(
         self,
@@ -45,47 +205,218 @@ class ScoreBoard:
         difficulty: Difficulty,
         correct: bool,
     ) -> ScoreRecord:
-        with self._lock:
+        day = day_number(self._clock())
+        event = None
+        if self._journal is not None:
+            # 점수를 바꾸기 전에 인코딩해, 기록할 수 없는 이름이면 아무것도 바꾸지 않는다.
+            event = self._journal.encode(player, difficulty, correct, day)
+        lock = self._stripes[self._stripe_of(player)]
+        started = time.perf_counter()
+        with lock:
+            SCOREBOARD_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
             record = self._records.setdefault(player, ScoreRecord(player=player))
-            record.total_attempts += 1
-            if correct:
-                record.total_correct += 1
-                record.streak += 1
-                points = 10 + self._difficulty_bonus(difficulty)
-                if record.streak >= 3:
-                    points += 5
-                record.points += points
-            else:
-                record.streak = 0
+            points = apply_attempt(record, difficulty, correct)
+            self._add_to_buckets(player, difficulty, correct, points, day)
+            if event is not None:
+                self._journal.append_encoded(event)
+            self._update_top(player, (record.points, record.accuracy))
             return record
 
     def reset(self) -> int:
-        with self._lock:
+        with self._all_stripes():
             cleared = len(self._records)
             self._records.clear()
+            for stripe_buckets in self._buckets:
+                stripe_buckets.clear()
+            self._view_versions = {view: next(self._bucket_versions) for view in VIEWS}
+            if self._journal is not None:
+                self._journal.append_reset()
+            with self._top_lock:
+                self._top.clear()
+                self._top_floor = None
+                self._version += 1
             return cleared
 
-    def top_entries(self) -> List[LeaderboardEntry]:
-        with self._lock:
-            sorted_records = sorted(
-                self._records.values(),
-                key=lambda record: (record.points, record.accuracy),
-                reverse=True,
-            )
-            return [
-                LeaderboardEntry(
-                    player=record.player,
-                    points=record.points,
-                    accuracy=round(record.accuracy, 3),
-                )
-                for record in sorted_records[: self._max_entries]
-            ]
-
-    @staticmethod
-    def _difficulty_bonus(difficulty: Difficulty) -> int:
-        if difficulty is Difficulty.MAKE:
-            return 0
-        if difficulty is Difficulty.MAKE_MODEL:
-            return 5
-        return 10
+    def top_entries(
+        self,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
+        difficulty: Optional[Difficulty] = None,
+    ) -> List[LeaderboardEntry]:
+        if window is not LeaderboardWindow.ALL or difficulty is not None:
+            return self._top_bucketed(window, difficulty)
+
+        limit = self._max_entries
+        with self._top_lock:
+            ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+            if self._top_floor is not None and (len(ranked) < limit or ranked[limit - 1][1] < self._top_floor):
+                # 후보 밖의 플레이어가 상위권에 들 수 있다.
+                self._rebuild_top()
+                ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return [
+            LeaderboardEntry(player=player, points=points, accuracy=round(accuracy, 3))
+            for player, (points, accuracy) in ranked[:limit]
+        ]
+
+    def start(self) -> None:
+        if self._journal is not None:
+            self._journal.start()
+
+    def stop(self) -> None:
+        if self._journal is not None:
+            self._journal.stop()
+
+    def _bucket_keys(self, window: LeaderboardWindow, difficulty: Optional[Difficulty], today: int) -> List[BucketKey]:
+        if window is LeaderboardWindow.ALL:
+            periods: Iterable[int] = (ALL_TIME,)
+        else:
+            periods = range(today - WINDOW_DAYS[window] + 1, today + 1)
+        difficulties = list(Difficulty) if difficulty is None else [difficulty]
+        return [(period, level) for period in periods for level in difficulties]
+
+    def _top_bucketed(self, window: LeaderboardWindow, difficulty: Optional[Difficulty]) -> List[LeaderboardEntry]:
+        view = (window, difficulty)
+        # 버전을 먼저 읽어야 기억해 둔 N번째 점수가 그 버전보다 오래되지 않는다.
+        version = self._view_versions.get(view, 0)
+        today = day_number(self._clock())
+        merged: Dict[str, List[int]] = {}
+        keys = self._bucket_keys(window, difficulty, today)
+        for stripe_buckets, key in itertools.product(self._buckets, keys):
+            bucket = stripe_buckets.get(key)
+            if bucket is None:
+                continue
+            for player, entry in tuple(bucket.items()):
+                totals = merged.get(player)
+                if totals is None:
+                    merged[player] = [entry.points, entry.total_correct, entry.total_attempts]
+                else:
+                    totals[0] += entry.points
+                    totals[1] += entry.total_correct
+                    totals[2] += entry.total_attempts
+        ranked = heapq.nlargest(
+            self._max_entries,
+            merged.items(),
+            key=lambda item: (item[1][0], item[1][1] / item[1][2]),
+        )
+        cutoff = None
+        if len(ranked) == self._max_entries:
+            points, total_correct, attempts = ranked[-1][1]
+            cutoff = (points, total_correct / attempts)
+        with self._view_lock:
+            published = self._view_cutoffs.get(view)
+            if published is None or published[0] <= version:
+                self._view_cutoffs[view] = (version, today, cutoff, frozenset(player for player, _ in ranked))
+        return [
+            LeaderboardEntry(player=player, points=points, accuracy=round(total_correct / attempts, 3))
+            for player, (points, total_correct, attempts) in ranked
+        ]
+
+    def _stripe_of(self, player: str) -> int:
+        return hash(player) % len(self._stripes)
+
+    def _add_to_buckets(self, player: str, difficulty: Difficulty, correct: bool, points: int, day: int) -> None:
+        """플레이어 잠금을 잡은 상태에서 호출한다. 플레이어 구역의 집계만 바꾼다."""
+        stripe_buckets = self._buckets[self._stripe_of(player)]
+        for key in ((day, difficulty), (ALL_TIME, difficulty)):
+            bucket = stripe_buckets.get(key)
+            if bucket is None:
+                bucket = stripe_buckets[key] = {}
+                _expire_buckets(stripe_buckets, day)
+            entry = bucket.get(player)
+            if entry is None:
+                entry = bucket[player] = ScoreRecord(player=player)
+            entry.points += points
+            entry.total_correct += int(correct)
+            entry.total_attempts += 1
+        self._touch_views(stripe_buckets, player, difficulty, day)
+
+    def _touch_views(self, stripe_buckets: Buckets, player: str, difficulty: Difficulty, day: int) -> None:
+        """이 시도로 결과가 바뀔 수 있는 기간/난이도 리더보드의 버전만 올린다."""
+        for view in VIEWS:
+            window, level = view
+            if level is not None and level is not difficulty:
+                continue
+            version = self._view_versions.get(view, 0)
+            published = self._view_cutoffs.get(view)
+            if published is not None and published[0] == version and published[1] == day:
+                _, _, cutoff, shown = published
+                if (
+                    cutoff is not None
+                    and player not in shown
+                    and self._merged_key(stripe_buckets, player, window, level, day) < cutoff
+                ):
+                    continue
+            # count의 next는 원자적이라 여러 구역이 동시에 올려도 값이 겹치지 않는다.
+            self._view_versions[view] = next(self._bucket_versions)
+
+    def _merged_key(
+        self,
+        stripe_buckets: Buckets,
+        player: str,
+        window: LeaderboardWindow,
+        difficulty: Optional[Difficulty],
+        today: int,
+    ) -> RankKey:
+        points = total_correct = attempts = 0
+        for key in self._bucket_keys(window, difficulty, today):
+            entry = stripe_buckets.get(key, {}).get(player)
+            if entry is not None:
+                points += entry.points
+                total_correct += entry.total_correct
+                attempts += entry.total_attempts
+        return points, total_correct / attempts if attempts else 0.0
+
+    def _update_top(self, player: str, key: RankKey) -> None:
+        epoch = self._top_epoch
+        floor = self._top_floor
+        if (
+            epoch % 2 == 0
+            and floor is not None
+            and key <= floor
+            and player not in self._top
+            and epoch == self._top_epoch
+        ):
+            # 후보에 들 수 없으므로 잠금을 잡지 않는다. 재구성과 겹쳤으면 잠금을 잡고 다시 본다.
+            return
+        with self._top_lock:
+            if player not in self._top and self._top_floor is not None and key <= self._top_floor:
+                return
+            self._top[player] = key
+            if len(self._top) > self._top_capacity:
+                evicted = min(self._top, key=self._top.__getitem__)
+                evicted_key = self._top.pop(evicted)
+                if self._top_floor is None or evicted_key > self._top_floor:
+                    self._top_floor = evicted_key
+            self._version += 1
+
+    def _rebuild_top(self) -> None:
+        """모든 기록에서 후보를 다시 뽑는다. `_top_lock`을 잡은 상태에서 호출한다."""
+        self._top_epoch += 1
+        try:
+            keyed = [(record.points, record.accuracy, record.player) for record in tuple(self._records.values())]
+            best = heapq.nlargest(self._top_capacity + 1, keyed)
+            self._top = {player: (points, accuracy) for points, accuracy, player in best[: self._top_capacity]}
+            self._top_floor = best[-1][:2] if len(best) > self._top_capacity else None
+            self._version += 1
+        finally:
+            self._top_epoch += 1
+
+    @contextmanager
+    def _all_stripes(self) -> Iterator[None]:
+        with ExitStack() as stack:
+            for lock in self._stripes:
+                stack.enter_context(lock)
+            yield
 
+    def _capture(self) -> Tuple[Dict[str, ScoreRecord], Buckets, bytes]:
+        """스냅샷용 점수와 집계 사본, 그 상태에 반영된 미기록 이벤트를 함께 가져온다."""
+        with self._all_stripes():
+            records = {player: replace(record) for player, record in self._records.items()}
+            buckets: Buckets = {}
+            for stripe_buckets in self._buckets:
+                _expire_buckets(stripe_buckets, day_number(self._clock()))
+                for key, bucket in stripe_buckets.items():
+                    merged = buckets.setdefault(key, {})
+                    for player, entry in bucket.items():
+                        merged[player] = replace(entry)
+            pending = self._journal.take_pending() if self._journal is not None else b""
+        return records, buckets, pending
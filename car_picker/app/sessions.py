@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RowBitset:
+    """데이터셋 행 번호 집합을 행마다 1비트로 저장.
+
+    행 번호는 한 프로세스 안에서 데이터셋 버전이 바뀌어도 유지되므로(`apply_delta`)
+    세션이 이어지는 동안 그대로 쓸 수 있다. 범위를 넘는 행을 추가하면 자동으로 늘어난다.
+    같은 세션으로 동시에 들어온 요청이 비트를 잃지 않도록 `add`/`try_add`는 잠금 안에서
+    수정한다. 조회는 잠그지 않는다.
+    """
+
+    __slots__ = ("_bits", "_count", "_lock")
+
+    def __init__(self, capacity: int = 0) -> None:
+        self._bits = bytearray((capacity + 7) >> 3)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, row: int) -> bool:
+        index = row >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (row & 7)))
+
+    def add(self, row: int) -> None:
+        self.try_add(row)
+
+    def try_add(self, row: int) -> bool:
+        """행이 없었으면 추가하고 True. 이미 있으면 False (다른 요청이 먼저 차지했다)."""
+        index = row >> 3
+        mask = 1 << (row & 7)
+        with self._lock:
+            bits = self._bits
+            if index >= len(bits):
+                bits.extend(bytes(index + 1 - len(bits)))
+            if bits[index] & mask:
+                return False
+            bits[index] |= mask
+            self._count += 1
+            return True
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+@dataclass
+class PlaySession:
+    sid: str
+    seen: RowBitset
+    last_access: float
+    # 마지막으로 저장소 메모리 합계에 반영한 비트셋 크기
+    counted_bytes: int = 0
+
+
+@dataclass
+class SessionStats:
+    created: int = 0
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evicted: int = 0
+    bytes_used: int = 0
+
+
+class SessionStore:
+    """플레이 세션별로 이미 출제한 행을 보관.
+
+    세션은 마지막 사용 순서의 OrderedDict에 있어 만료 정리와 가장 오래 쓰지 않은 세션
+    제거가 앞쪽에서 O(1)이다. 세션 수(`limit`)와 비트셋 바이트 합계(`max_bytes`)를
+    넘으면 오래된 세션부터 제거한다. 요청 중에 늘어난 비트셋 크기는 그 세션을 다음에
+    조회할 때와 주기적인 정리 때 합계에 반영된다.
+    """
+
+    def __init__(
+        self,
+        limit: int = 10000,
+        ttl_seconds: int = 1800,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval_seconds: float = 60.0,
+    ) -> None:
+        self._limit = limit
+        self.ttl_seconds = ttl_seconds
+        self._max_bytes = max_bytes
+        self._sweep_interval_seconds = sweep_interval_seconds
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, PlaySession]" = OrderedDict()
+        self._stats = SessionStats()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def create(self, capacity: int = 0) -> PlaySession:
+        """새 세션. `capacity`는 비트셋을 미리 잡아 둘 행 수(보통 데이터셋 열 길이)."""
+        session = PlaySession(sid=uuid.uuid4().hex, seen=RowBitset(capacity), last_access=time.time())
+        with self._lock:
+            self._sessions[session.sid] = session
+            self._stats.created += 1
+            self._account(session)
+            self._evict(keep=session.sid)
+        return session
+
+    def get(self, sid: str) -> Optional[PlaySession]:
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                self._stats.misses += 1
+                return None
+            if now - session.last_access > self.ttl_seconds:
+                self._remove(sid)
+                self._stats.expired += 1
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(sid)
+            self._stats.hits += 1
+            self._account(session)
+            self._evict(keep=sid)
+        return session
+
+    def delete(self, sid: str) -> bool:
+        with self._lock:
+            return self._remove(sid) is not None
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """만료된 세션을 앞쪽부터 제거하고 메모리 합계를 다시 계산. 제거한 개수를 반환."""
+        deadline = (time.time() if now is None else now) - self.ttl_seconds
+        removed = 0
+        with self._lock:
+            while self._sessions:
+                oldest = next(iter(self._sessions.values()))
+                if oldest.last_access >= deadline:
+                    break
+                self._remove(oldest.sid)
+                removed += 1
+            self._stats.expired += removed
+            for session in self._sessions.values():
+                self._account(session)
+            self._evict()
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            values = asdict(self._stats)
+            values["size"] = len(self._sessions)
+        values["limit"] = self._limit
+        values["max_bytes"] = self._max_bytes
+        return values
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def start(self) -> None:
+        if self._thread is not None or self._sweep_interval_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _account(self, session: PlaySession) -> None:
+        size = session.seen.nbytes
+        self._stats.bytes_used += size - session.counted_bytes
+        session.counted_bytes = size
+
+    def _remove(self, sid: str) -> Optional[PlaySession]:
+        session = self._sessions.pop(sid, None)
+        if session is not None:
+            self._stats.bytes_used -= session.counted_bytes
+        return session
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        while self._sessions and (len(self._sessions) > self._limit or self._stats.bytes_used > self._max_bytes):
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                # 방금 쓴 세션 하나만 남았으면 한도를 넘더라도 유지한다.
+                break
+            self._remove(oldest)
+            self._stats.evicted += 1
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._sweep_interval_seconds):
+            try:
+                self.sweep()
+            except Exception:  # 백그라운드 스레드가 죽지 않도록 기록만 한다.
+                LOGGER.exception("세션 만료 정리 실패")
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import List, Literal, Optional
 
 from pydantic import BaseSettings, Field, validator
 
@@ -14,11 +14,43 @@ class AppSettings(BaseSettings):
     """애플리케이션 전역 설정."""
 
     data_dir: Path = Field(default=Path(__file__).resolve().parent.parent / "data")
+    extra_data_dirs: List[Path] = []
+    scan_workers: Optional[int] = None
     static_url_prefix: str = "/static"
     cars_mount_name: str = "cars"
     timeout_seconds: int = 20
     leaderboard_size: int = 10
     question_store_limit: int = 512
+    question_store_ttl_seconds: int = 600
+    question_store_sweep_seconds: float = 30.0
+    question_mode: Literal["store", "token"] = "store"
+    question_token_secret: Optional[str] = None
+    question_token_replay_cache_size: int = 65536
+    storage_backend: Literal["memory", "sqlite"] = "memory"
+    leaderboard_journal_dir: Optional[Path] = None
+    leaderboard_flush_seconds: float = 1.0
+    leaderboard_snapshot_every: int = 10000
+    sqlite_path: Path = Field(default=Path(__file__).resolve().parent.parent / "cache" / "car_picker.sqlite3")
+    index_snapshot_path: Optional[Path] = None
+    dataset_refresh_interval_seconds: float = 0.0
+    dataset_startup_wait_seconds: float = 0.0
+    session_limit: int = 10000
+    session_ttl_seconds: int = 1800
+    session_max_bytes: int = 64 * 1024 * 1024
+    session_sweep_seconds: float = 60.0
+    sampling_policy: Literal["uniform", "make", "model", "weights"] = "uniform"
+    sampling_weights_path: Optional[Path] = None
+    question_pool_low_watermark: int = 8
+    question_pool_high_watermark: int = 32
+    image_cache_bytes: int = 64 * 1024 * 1024
+    thumbnail_widths: List[int] = [320, 640, 1024]
+    thumbnail_webp: bool = False
+    thumbnail_cache_dir: Path = Field(default=Path(__file__).resolve().parent.parent / "cache" / "thumbnails")
+    thumbnail_workers: Optional[int] = None
+    metrics_enabled: bool = True
+    profile_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    profile_trigger_header: Optional[str] = None
+    profile_output_dir: Path = Field(default=Path(__file__).resolve().parent.parent / "cache" / "profiles")
     environment: Literal["development", "production", "test"] = "development"
 
     class Config:
@@ -34,6 +66,58 @@ class AppSettings(BaseSettings):
             raise ValueError(f"data_dir는 디렉터리여야 합니다: {value}")
         return value
 
+    @validator("extra_data_dirs", each_item=True)
+    def _validate_extra_data_dirs(cls, value: Path) -> Path:
+        if not value.is_dir():
+            raise ValueError(f"extra_data_dirs의 디렉터리를 찾을 수 없습니다: {value}")
+        return value
+
+    @validator("index_snapshot_path")
+    def _validate_index_snapshot_path(cls, value: Optional[Path], values: dict) -> Optional[Path]:
+        roots = [values.get("data_dir"), *values.get("extra_data_dirs", [])]
+        if value is not None:
+            parents = value.resolve().parents
+            if any(root is not None and root.resolve() in parents for root in roots):
+                # 스냅샷을 쓰면 데이터 디렉터리의 mtime이 바뀌어 매번 오래된 것으로 판정된다.
+                raise ValueError("index_snapshot_path는 데이터 디렉터리 바깥에 있어야 합니다.")
+        return value
+
+    @validator("question_token_secret", always=True)
+    def _validate_question_token_secret(cls, value: Optional[str], values: dict) -> Optional[str]:
+        # 모든 워커가 같은 키로 검증해야 하므로 토큰 모드에서는 명시적인 비밀 값이 필요하다.
+        if values.get("question_mode") == "token" and not value:
+            raise ValueError("question_mode=token 에는 question_token_secret 설정이 필요합니다.")
+        return value
+
+    @validator("sampling_weights_path", always=True)
+    def _validate_sampling_weights_path(cls, value: Optional[Path], values: dict) -> Optional[Path]:
+        if values.get("sampling_policy") == "weights":
+            if value is None:
+                raise ValueError("sampling_policy=weights 에는 sampling_weights_path 설정이 필요합니다.")
+            if not value.is_file():
+                raise ValueError(f"가중치 파일을 찾을 수 없습니다: {value}")
+        return value
+
+    @validator("question_pool_high_watermark")
+    def _validate_question_pool_watermarks(cls, value: int, values: dict) -> int:
+        # high가 0이면 문제 풀을 사용하지 않는다.
+        low = values.get("question_pool_low_watermark")
+        if value < 0:
+            raise ValueError("question_pool_high_watermark는 0 이상이어야 합니다.")
+        if value > 0 and low is not None and not 0 <= low < value:
+            raise ValueError("question_pool 워터마크는 0 <= low < high 이어야 합니다.")
+        return value
+
+    @validator("thumbnail_widths")
+    def _validate_thumbnail_widths(cls, value: List[int]) -> List[int]:
+        if not value or any(width <= 0 for width in value):
+            raise ValueError("thumbnail_widths는 양수 폭 목록이어야 합니다.")
+        return sorted(set(value))
+
+    def data_roots(self) -> List[Path]:
+        """이미지를 찾는 모든 루트 디렉터리 (data_dir가 첫 번째)."""
+        return [self.data_dir, *self.extra_data_dirs]
+
 
 @lru_cache()
 def get_settings() -> AppSettings:
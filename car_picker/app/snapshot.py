@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .scan import DataRoots, ScanResult
+from .storage import CATEGORY_SPECS, DIGEST_SIZE, NUMERIC_SPECS, IndexColumns, Vocabulary
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"CPIX"
+SNAPSHOT_VERSION = 7
+
+# magic, version, byte order, 디렉터리 mtime(ns), 파일 수, 루트 구성 crc32, 행 수, payload crc32
+_HEADER = struct.Struct("<4sHBqIIII")
+_SECTION_COUNT = 12 + len(NUMERIC_SPECS) + 2 * len(CATEGORY_SPECS)
+_SECTION_LENGTH = struct.Struct("<Q")
+_VOCAB_SEPARATOR = "\0"
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+
+@dataclass(frozen=True)
+class DirectoryFingerprint:
+    """스냅샷 유효성 판단에 사용하는 디렉터리 상태."""
+
+    mtime_ns: int
+    file_count: int
+    roots_key: int = 0
+
+
+def directory_fingerprint(roots: DataRoots, scan: ScanResult) -> DirectoryFingerprint:
+    """스캔한 디렉터리 중 가장 최근 mtime, 이미지 파일 수, 루트 구성으로 fingerprint를 계산."""
+    return DirectoryFingerprint(
+        mtime_ns=scan.latest_mtime_ns,
+        file_count=len(scan.paths),
+        roots_key=roots.key(),
+    )
+
+
+def write_snapshot(
+    snapshot_path: Path,
+    fingerprint: DirectoryFingerprint,
+    columns: IndexColumns,
+) -> None:
+    """열 저장소를 바이너리 스냅샷으로 저장 (임시 파일 후 교체)."""
+    sections = (
+        _join_vocabulary(columns.makes.values),
+        _join_vocabulary(columns.models.values),
+        columns.id_blob,
+        columns.id_offsets.tobytes(),
+        columns.make_codes.tobytes(),
+        columns.model_codes.tobytes(),
+        columns.years.tobytes(),
+        _join_vocabulary(columns.dirs.values),
+        columns.dir_codes.tobytes(),
+        *(columns.numeric[name].tobytes() for name in NUMERIC_SPECS),
+        *(_join_vocabulary(columns.categories[name].values) for name in CATEGORY_SPECS),
+        *(columns.category_codes[name].tobytes() for name in CATEGORY_SPECS),
+        columns.digests.ljust(len(columns) * DIGEST_SIZE, b"\0"),
+        columns.file_sizes.tobytes(),
+        columns.file_mtimes.tobytes(),
+    )
+    payload = b"".join(_SECTION_LENGTH.pack(len(section)) + section for section in sections)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        _BYTE_ORDER,
+        fingerprint.mtime_ns,
+        fingerprint.file_count,
+        fingerprint.roots_key,
+        len(columns),
+        zlib.crc32(payload),
+    )
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(header)
+        handle.write(payload)
+    os.replace(tmp_path, snapshot_path)
+    LOGGER.info("인덱스 스냅샷 저장: %s (%d개 항목)", snapshot_path, len(columns))
+
+
+def read_snapshot(
+    snapshot_path: Path,
+    fingerprint: DirectoryFingerprint,
+) -> Optional[IndexColumns]:
+    """스냅샷을 한 번에 읽어 열 저장소를 복원. 오래되었거나 손상되었으면 None."""
+    loaded = load_snapshot(snapshot_path)
+    if loaded is None:
+        return None
+    stored, columns = loaded
+    if stored != fingerprint:
+        LOGGER.info("스냅샷이 오래되었습니다: %s", snapshot_path)
+        return None
+    return columns
+
+
+def load_snapshot(snapshot_path: Path) -> Optional[Tuple[DirectoryFingerprint, IndexColumns]]:
+    """저장된 fingerprint와 열 저장소를 반환. 손상되었으면 None.
+
+    오래된 스냅샷도 반환하므로 호출하는 쪽에서 바뀌지 않은 파일의 해시를 재사용할 수 있다.
+    """
+    try:
+        data = snapshot_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        LOGGER.warning("스냅샷을 읽을 수 없습니다: %s (%s)", snapshot_path, exc)
+        return None
+
+    if len(data) < _HEADER.size:
+        LOGGER.warning("스냅샷 헤더가 손상되었습니다: %s", snapshot_path)
+        return None
+
+    magic, version, byte_order, mtime_ns, file_count, roots_key, row_count, checksum = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or byte_order != _BYTE_ORDER:
+        LOGGER.info("스냅샷 형식 불일치, 무시: %s", snapshot_path)
+        return None
+
+    payload = memoryview(data)[_HEADER.size :]
+    if zlib.crc32(payload) != checksum:
+        LOGGER.warning("스냅샷 체크섬 불일치: %s", snapshot_path)
+        return None
+
+    sections = []
+    offset = 0
+    while offset < len(payload):
+        (length,) = _SECTION_LENGTH.unpack_from(payload, offset)
+        offset += _SECTION_LENGTH.size
+        sections.append(payload[offset : offset + length])
+        offset += length
+    if len(sections) != _SECTION_COUNT:
+        LOGGER.warning("스냅샷 구역 수 불일치: %s", snapshot_path)
+        return None
+
+    makes, models, id_blob, id_offsets, make_codes, model_codes, years, dirs, dir_codes = sections[:9]
+    spec_sections = iter(sections[9:])
+    numeric = {name: _array_from("I", next(spec_sections)) for name in NUMERIC_SPECS}
+    categories = {name: Vocabulary(_split_vocabulary(next(spec_sections))) for name in CATEGORY_SPECS}
+    category_codes = {name: _array_from("I", next(spec_sections)) for name in CATEGORY_SPECS}
+    digests = bytes(next(spec_sections))
+    file_sizes = _array_from("Q", next(spec_sections))
+    file_mtimes = _array_from("q", next(spec_sections))
+    columns = IndexColumns(
+        makes=Vocabulary(_split_vocabulary(makes)),
+        models=Vocabulary(_split_vocabulary(models)),
+        make_codes=_array_from("I", make_codes),
+        model_codes=_array_from("I", model_codes),
+        years=_array_from("H", years),
+        id_blob=bytes(id_blob),
+        id_offsets=_array_from("I", id_offsets),
+        dirs=Vocabulary(_split_vocabulary(dirs)),
+        dir_codes=_array_from("I", dir_codes),
+        numeric=numeric,
+        categories=categories,
+        category_codes=category_codes,
+        digests=digests,
+        file_sizes=file_sizes,
+        file_mtimes=file_mtimes,
+    )
+    if (
+        len(columns) != row_count
+        or len(columns.id_offsets) != row_count + 1
+        or len(columns.dir_codes) != row_count
+        or len(digests) != row_count * DIGEST_SIZE
+        or len(file_sizes) != row_count
+        or len(file_mtimes) != row_count
+        or any(len(values) != row_count for values in (*numeric.values(), *category_codes.values()))
+    ):
+        LOGGER.warning("스냅샷 항목 수 불일치: %s", snapshot_path)
+        return None
+    return DirectoryFingerprint(mtime_ns, file_count, roots_key), columns
+
+
+def _join_vocabulary(values: List[str]) -> bytes:
+    # 값마다 종결 문자를 붙여 빈 문자열 값(최상위 디렉터리)도 구분한다.
+    return "".join(value + _VOCAB_SEPARATOR for value in values).encode("utf-8")
+
+
+def _split_vocabulary(section: memoryview) -> List[str]:
+    return str(section, "utf-8").split(_VOCAB_SEPARATOR)[:-1]
+
+
+def _array_from(typecode: str, section: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(section)
+    return values
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """배포 전에 인덱스 스냅샷을 미리 생성하는 CLI."""
+    from .indexer import CarDataset
+    from .settings import get_settings
+
+    parser = argparse.ArgumentParser(description="Rebuild the Car Picker index snapshot.")
+    parser.add_argument("--data-dir", type=Path, action="append", default=None, help="repeat for several roots")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    if args.data_dir is None or args.output is None:
+        settings = get_settings()
+        data_dirs = args.data_dir or settings.data_roots()
+        output = args.output or settings.index_snapshot_path
+    else:
+        data_dirs, output = args.data_dir, args.output
+    if output is None:
+        parser.error("--output 또는 CAR_PICKER_INDEX_SNAPSHOT_PATH 설정이 필요합니다.")
+
+    logging.basicConfig(level=logging.INFO)
+    CarDataset(data_dirs, snapshot_path=output, rebuild_snapshot=True)
+
+
+if __name__ == "__main__":
+    main()
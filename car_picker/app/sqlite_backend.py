@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .models import Difficulty, LeaderboardEntry, LeaderboardWindow, QuizOption
+from .score import (
+    ALL_TIME,
+    BASE_POINTS,
+    RETENTION_DAYS,
+    STREAK_BONUS,
+    STREAK_THRESHOLD,
+    WINDOW_DAYS,
+    ScoreRecord,
+    day_number,
+    difficulty_bonus,
+)
+from .store import StoredQuestion
+
+LOGGER = logging.getLogger(__name__)
+
+# 같은 호스트의 모든 워커가 하나의 파일을 공유한다. RETURNING 구문은 SQLite 3.35 이상이 필요하다.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    qid TEXT PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    make TEXT NOT NULL,
+    model TEXT,
+    year TEXT,
+    label TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_created_at ON questions (created_at);
+CREATE TABLE IF NOT EXISTS scores (
+    player TEXT PRIMARY KEY,
+    points INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    total_correct INTEGER NOT NULL,
+    total_attempts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_points ON scores (points DESC);
+CREATE TABLE IF NOT EXISTS score_buckets (
+    period INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    player TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    total_correct INTEGER NOT NULL,
+    total_attempts INTEGER NOT NULL,
+    PRIMARY KEY (period, difficulty, player)
+);
+"""
+
+_INSERT_QUESTION = (
+    "INSERT INTO questions (qid, difficulty, make, model, year, label, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_TAKE_QUESTION = (
+    "DELETE FROM questions WHERE qid = ? "
+    "RETURNING difficulty, make, model, year, label, created_at"
+)
+_DELETE_EXPIRED = "DELETE FROM questions WHERE created_at < ?"
+_TRIM_QUESTIONS = (
+    "DELETE FROM questions WHERE qid IN ("
+    "SELECT qid FROM questions ORDER BY created_at DESC LIMIT -1 OFFSET ?)"
+)
+_COUNT_QUESTIONS = "SELECT COUNT(*) FROM questions"
+
+# UPDATE의 SET 식은 모두 변경 전 값을 기준으로 계산된다.
+_REGISTER_ATTEMPT = f"""
+INSERT INTO scores (player, points, streak, total_correct, total_attempts)
+VALUES (:player, :correct * :points, :correct, :correct, 1)
+ON CONFLICT (player) DO UPDATE SET
+    total_attempts = total_attempts + 1,
+    total_correct = total_correct + :correct,
+    streak = CASE WHEN :correct THEN streak + 1 ELSE 0 END,
+    points = points + CASE
+        WHEN NOT :correct THEN 0
+        WHEN streak + 1 >= {STREAK_THRESHOLD} THEN :points + {STREAK_BONUS}
+        ELSE :points
+    END
+RETURNING points, streak, total_correct, total_attempts
+"""
+_ADD_TO_BUCKET = """
+INSERT INTO score_buckets (period, difficulty, player, points, total_correct, total_attempts)
+VALUES (?, ?, ?, ?, ?, 1)
+ON CONFLICT (period, difficulty, player) DO UPDATE SET
+    points = points + excluded.points,
+    total_correct = total_correct + excluded.total_correct,
+    total_attempts = total_attempts + 1
+"""
+_EXPIRE_BUCKETS = "DELETE FROM score_buckets WHERE period != ? AND period < ?"
+_TOP_ENTRIES = (
+    "SELECT player, points, total_correct, total_attempts FROM scores "
+    "ORDER BY points DESC, CAST(total_correct AS REAL) / total_attempts DESC LIMIT ?"
+)
+
+
+class SQLiteDatabase:
+    """WAL 모드 SQLite 파일에 대한 스레드별 연결 관리."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self.connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # sqlite3 모듈이 같은 SQL 문자열의 prepared statement를 연결 단위로 캐시한다.
+            connection = sqlite3.connect(
+                str(self.path),
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=64,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """`BEGIN IMMEDIATE` … `COMMIT`으로 묶는다. 블록에서 예외가 나면 ROLLBACK.
+
+        연결이 autocommit 모드(`isolation_level=None`)라서 `with connection:`만으로는
+        트랜잭션이 시작되지 않는다.
+        """
+        connection = self.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+
+class SQLiteQuestionStore:
+    """여러 워커가 공유하는 SQLite 기반 문제 저장소 (`QuestionStore`와 같은 인터페이스).
+
+    문제 수 상한은 발급 때마다 세지 않고 주기적인 정리 작업에서 맞춘다.
+    """
+
+    def __init__(
+        self,
+        database: SQLiteDatabase,
+        limit: int = 512,
+        ttl_seconds: int = 600,
+        sweep_interval_seconds: float = 30.0,
+    ) -> None:
+        self._database = database
+        self._limit = limit
+        self._ttl_seconds = ttl_seconds
+        self._sweep_interval_seconds = sweep_interval_seconds
+        self._counts_lock = threading.Lock()
+        self._counts = {"issued": 0, "hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def issue(self, difficulty: Difficulty, correct: QuizOption) -> StoredQuestion:
+        return self.issue_many([(difficulty, correct)])[0]
+
+    def issue_many(
+        self,
+        questions: Sequence[tuple[Difficulty, QuizOption]],
+    ) -> List[StoredQuestion]:
+        """여러 문제를 한 트랜잭션으로 등록."""
+        now = time.time()
+        issued = [
+            StoredQuestion(qid=uuid.uuid4().hex, difficulty=difficulty, correct=correct, created_at=now)
+            for difficulty, correct in questions
+        ]
+        rows = [
+            (
+                stored.qid,
+                stored.difficulty.value,
+                stored.correct.make,
+                stored.correct.model,
+                stored.correct.year,
+                stored.correct.label,
+                stored.created_at,
+            )
+            for stored in issued
+        ]
+        with self._database.transaction() as connection:
+            connection.executemany(_INSERT_QUESTION, rows)
+        self._count("issued", len(issued))
+        return issued
+
+    def resolve(self, qid: str) -> Optional[StoredQuestion]:
+        with self._database.transaction() as connection:
+            row = connection.execute(_TAKE_QUESTION, (qid,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+
+        difficulty, make, model, year, label, created_at = row
+        if (time.time() - created_at) > self._ttl_seconds:
+            self._count("expired")
+            return None
+        self._count("hits")
+        correct = QuizOption.construct(make=make, model=model, year=year, label=label)
+        return StoredQuestion(qid=qid, difficulty=Difficulty(difficulty), correct=correct, created_at=created_at)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """만료된 문제를 지우고 상한을 넘는 오래된 문제를 정리."""
+        deadline = (time.time() if now is None else now) - self._ttl_seconds
+        with self._database.transaction() as connection:
+            expired = connection.execute(_DELETE_EXPIRED, (deadline,)).rowcount
+            evicted = connection.execute(_TRIM_QUESTIONS, (self._limit,)).rowcount
+        self._count("expired", expired)
+        self._count("evicted", evicted)
+        return expired
+
+    def stats(self) -> Dict[str, int]:
+        with self._counts_lock:
+            values = dict(self._counts)
+        values["size"] = len(self)
+        values["limit"] = self._limit
+        return values
+
+    def __len__(self) -> int:
+        return self._database.connection().execute(_COUNT_QUESTIONS).fetchone()[0]
+
+    def start(self) -> None:
+        if self._thread is not None or self._sweep_interval_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="sqlite-question-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._counts_lock:
+            self._counts[name] += amount
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._sweep_interval_seconds):
+            try:
+                self.sweep()
+            except Exception:  # 백그라운드 스레드가 죽지 않도록 기록만 한다.
+                LOGGER.exception("문제 만료 정리 실패")
+
+
+class SQLiteScoreBoard:
+    """여러 워커가 공유하는 SQLite 기반 리더보드 (`ScoreBoard`와 같은 인터페이스)."""
+
+    def __init__(self, database: SQLiteDatabase, max_entries: int = 10) -> None:
+        self._database = database
+        self._max_entries = max_entries
+        self._expired_before: Optional[int] = None
+
+    def register_attempt(
+        self,
+        player: str,
+        difficulty: Difficulty,
+        correct: bool,
+    ) -> ScoreRecord:
+        base_points = BASE_POINTS + difficulty_bonus(difficulty)
+        params = {"player": player, "correct": int(correct), "points": base_points}
+        day = day_number(time.time())
+        oldest = day - RETENTION_DAYS + 1
+        with self._database.transaction() as connection:
+            points, streak, total_correct, total_attempts = connection.execute(
+                _REGISTER_ATTEMPT, params
+            ).fetchone()
+            awarded = 0
+            if correct:
+                awarded = base_points + (STREAK_BONUS if streak >= STREAK_THRESHOLD else 0)
+            connection.executemany(
+                _ADD_TO_BUCKET,
+                [
+                    (period, difficulty.value, player, awarded, int(correct))
+                    for period in (day, ALL_TIME)
+                ],
+            )
+            expire = self._expired_before != oldest
+            if expire:
+                connection.execute(_EXPIRE_BUCKETS, (ALL_TIME, oldest))
+        # 커밋된 뒤에만 기록해야 롤백된 만료 정리를 건너뛰지 않는다.
+        if expire:
+            self._expired_before = oldest
+        return ScoreRecord(
+            player=player,
+            points=points,
+            streak=streak,
+            total_correct=total_correct,
+            total_attempts=total_attempts,
+        )
+
+    def reset(self) -> int:
+        with self._database.transaction() as connection:
+            connection.execute("DELETE FROM score_buckets")
+            return connection.execute("DELETE FROM scores").rowcount
+
+    def start(self) -> None:
+        """매 기록이 바로 커밋되므로 백그라운드 작업이 없다."""
+
+    def stop(self) -> None:
+        """매 기록이 바로 커밋되므로 백그라운드 작업이 없다."""
+
+    def top_entries(
+        self,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
+        difficulty: Optional[Difficulty] = None,
+    ) -> List[LeaderboardEntry]:
+        connection = self._database.connection()
+        if window is LeaderboardWindow.ALL and difficulty is None:
+            rows = connection.execute(_TOP_ENTRIES, (self._max_entries,)).fetchall()
+        else:
+            rows = connection.execute(*self._bucketed_query(window, difficulty)).fetchall()
+        return [
+            LeaderboardEntry(
+                player=player,
+                points=points,
+                accuracy=round(total_correct / total_attempts if total_attempts else 0.0, 3),
+            )
+            for player, points, total_correct, total_attempts in rows
+        ]
+
+    def _bucketed_query(
+        self,
+        window: LeaderboardWindow,
+        difficulty: Optional[Difficulty],
+    ) -> tuple[str, list]:
+        if window is LeaderboardWindow.ALL:
+            conditions, params = ["period = ?"], [ALL_TIME]
+        else:
+            today = day_number(time.time())
+            conditions, params = ["period BETWEEN ? AND ?"], [today - WINDOW_DAYS[window] + 1, today]
+        if difficulty is not None:
+            conditions.append("difficulty = ?")
+            params.append(difficulty.value)
+        query = (
+            "SELECT player, SUM(points) AS points, SUM(total_correct) AS correct, SUM(total_attempts) AS attempts "
+            f"FROM score_buckets WHERE {' AND '.join(conditions)} GROUP BY player "
+            "ORDER BY points DESC, CAST(correct AS REAL) / attempts DESC LIMIT ?"
+        )
+        params.append(self._max_entries)
+        return query, params
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 파일명의 사양 필드. 숫자 필드는 파일명에 적힌 정수 그대로(배기량은 0.1L 단위)
+# 저장하며 0은 값 없음, 범주 필드의 ""도 값 없음이다.
+NUMERIC_SPECS = (
+    "msrp",
+    "wheel_size",
+    "horsepower",
+    "displacement",
+    "cylinders",
+    "width",
+    "height",
+    "length",
+    "mpg",
+    "seats",
+    "doors",
+)
+CATEGORY_SPECS = ("drivetrain", "body")
+
+# (숫자 사양 값들, 범주 사양 값들)
+Specs = Tuple[Tuple[int, ...], Tuple[str, ...]]
+EMPTY_SPECS: Specs = ((0,) * len(NUMERIC_SPECS), ("",) * len(CATEGORY_SPECS))
+
+# (id, make, model, year, 디렉터리, 사양)
+Row = Tuple[str, str, str, str, str, Specs]
+
+# 원본 내용 해시(blake2b) 바이트 수. 모두 0이면 해시 없음.
+DIGEST_SIZE = 16
+
+
+@dataclass
+class FileDigests:
+    """파일마다의 내용 해시와 해시할 때 본 (크기, mtime_ns). 행 순서대로 이어 붙인다."""
+
+    digests: bytes = b""
+    sizes: array = field(default_factory=lambda: array("Q"))
+    mtimes: array = field(default_factory=lambda: array("q"))
+    # 실제로 읽어 해시한 파일 수. 나머지는 이전 해시를 재사용했다.
+    hashed: int = 0
+
+
+class Vocabulary:
+    """문자열을 정수 코드로 인터닝하는 사전."""
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        """값의 코드를 반환하고, 처음 보는 값이면 새 코드를 할당."""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def copy(self) -> "Vocabulary":
+        clone = Vocabulary.__new__(Vocabulary)
+        clone.values = self.values[:]
+        clone._codes = dict(self._codes)
+        return clone
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class IndexColumns:
+    """행 단위 데이터를 열 배열로 보관하는 압축 저장소.
+
+    제조사/모델은 `Vocabulary` 코드로, 연식은 정수로, id는 하나의 UTF-8 버퍼와
+    오프셋 배열로 저장한다. 파일이 있는 디렉터리(루트 기준 상대 경로, `/`로 끝남)도
+    `Vocabulary` 코드로 보관한다. 숫자 사양은 필드마다 `I` 배열, 범주 사양은
+    필드마다 `Vocabulary` 코드 배열이다. 원본 내용 해시는 행마다 `DIGEST_SIZE`
+    바이트씩 이어 붙인 버퍼이며, 버퍼가 짧거나 0으로 채워진 행은 해시가 없다. 해시할 때
+    본 파일 크기와 mtime도 함께 보관해 다음 적재 때 바뀌지 않은 파일의 해시를 재사용한다.
+    행 번호는 한 번 할당되면 바뀌지 않는다.
+    """
+
+    def __init__(
+        self,
+        makes: Optional[Vocabulary] = None,
+        models: Optional[Vocabulary] = None,
+        make_codes: Optional[array] = None,
+        model_codes: Optional[array] = None,
+        years: Optional[array] = None,
+        id_blob: bytes = b"",
+        id_offsets: Optional[array] = None,
+        dirs: Optional[Vocabulary] = None,
+        dir_codes: Optional[array] = None,
+        numeric: Optional[Dict[str, array]] = None,
+        categories: Optional[Dict[str, Vocabulary]] = None,
+        category_codes: Optional[Dict[str, array]] = None,
+        digests: bytes = b"",
+        file_sizes: Optional[array] = None,
+        file_mtimes: Optional[array] = None,
+    ) -> None:
+        self.makes = makes if makes is not None else Vocabulary()
+        self.models = models if models is not None else Vocabulary()
+        self.make_codes = make_codes if make_codes is not None else array("I")
+        self.model_codes = model_codes if model_codes is not None else array("I")
+        self.years = years if years is not None else array("H")
+        self.id_blob = id_blob
+        self.id_offsets = id_offsets if id_offsets is not None else array("I", [0])
+        self.dirs = dirs if dirs is not None else Vocabulary()
+        self.dir_codes = dir_codes if dir_codes is not None else array("I")
+        self.numeric = numeric if numeric is not None else {name: array("I") for name in NUMERIC_SPECS}
+        self.categories = (
+            categories if categories is not None else {name: Vocabulary() for name in CATEGORY_SPECS}
+        )
+        self.category_codes = (
+            category_codes if category_codes is not None else {name: array("I") for name in CATEGORY_SPECS}
+        )
+        self.digests = digests
+        self.file_sizes = file_sizes if file_sizes is not None else array("Q")
+        self.file_mtimes = file_mtimes if file_mtimes is not None else array("q")
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Row]) -> "IndexColumns":
+        """(id, make, model, year, 디렉터리, 사양) 튜플 목록으로 열 저장소를 생성."""
+        columns = cls()
+        blob = bytearray()
+        columns._extend(rows, blob)
+        columns.id_blob = bytes(blob)
+        return columns
+
+    def appended(self, rows: Iterable[Row], files: Optional[FileDigests] = None) -> "IndexColumns":
+        """기존 열을 복사한 뒤 행을 덧붙인 새 저장소를 반환. `files`는 덧붙인 행의 해시."""
+        columns = IndexColumns(
+            makes=self.makes.copy(),
+            models=self.models.copy(),
+            make_codes=array("I", self.make_codes),
+            model_codes=array("I", self.model_codes),
+            years=array("H", self.years),
+            id_offsets=array("I", self.id_offsets),
+            dirs=self.dirs.copy(),
+            dir_codes=array("I", self.dir_codes),
+            numeric={name: array("I", values) for name, values in self.numeric.items()},
+            categories={name: vocabulary.copy() for name, vocabulary in self.categories.items()},
+            category_codes={name: array("I", codes) for name, codes in self.category_codes.items()},
+        )
+        blob = bytearray(self.id_blob)
+        columns._extend(rows, blob)
+        columns.id_blob = bytes(blob)
+        if files is not None:
+            columns.set_files(self.files_of(range(len(self))))
+            columns.digests += files.digests
+            columns.file_sizes.extend(files.sizes)
+            columns.file_mtimes.extend(files.mtimes)
+        else:
+            columns.digests, columns.file_sizes, columns.file_mtimes = (
+                self.digests,
+                self.file_sizes,
+                self.file_mtimes,
+            )
+        return columns
+
+    def compacted(self, rows: Iterable[int]) -> "IndexColumns":
+        """지정한 행만 남긴 저장소를 반환 (행 번호는 새로 매겨진다)."""
+        rows = list(rows)
+        columns = IndexColumns.from_rows(
+            (
+                self.id_at(row),
+                self.make_at(row),
+                self.model_at(row),
+                self.year_at(row),
+                self.dir_at(row),
+                self.specs_at(row),
+            )
+            for row in rows
+        )
+        if self.digests:
+            columns.set_files(self.files_of(rows))
+        return columns
+
+    def set_files(self, files: FileDigests) -> None:
+        self.digests = files.digests
+        self.file_sizes = array("Q", files.sizes)
+        self.file_mtimes = array("q", files.mtimes)
+
+    def files_of(self, rows: Iterable[int]) -> FileDigests:
+        """지정한 행의 해시와 파일 상태 (계산하지 않은 행은 0)."""
+        files = FileDigests()
+        digests = bytearray()
+        sizes, mtimes = self.file_sizes, self.file_mtimes
+        for row in rows:
+            digests += self.digest_bytes_at(row)
+            files.sizes.append(sizes[row] if row < len(sizes) else 0)
+            files.mtimes.append(mtimes[row] if row < len(mtimes) else 0)
+        files.digests = bytes(digests)
+        return files
+
+    def _extend(self, rows: Iterable[Row], blob: bytearray) -> None:
+        make_code, model_code, dir_code = self.makes.code, self.models.code, self.dirs.code
+        numeric = [self.numeric[name] for name in NUMERIC_SPECS]
+        categories = [(self.categories[name].code, self.category_codes[name]) for name in CATEGORY_SPECS]
+        for entry_id, make, model, year, directory, (numbers, labels) in rows:
+            for values, number in zip(numeric, numbers):
+                values.append(number)
+            for (code, codes), label in zip(categories, labels):
+                codes.append(code(label))
+            self.dir_codes.append(dir_code(directory))
+            self.make_codes.append(make_code(make))
+            self.model_codes.append(model_code(model))
+            self.years.append(int(year))
+            blob += entry_id.encode("utf-8")
+            self.id_offsets.append(len(blob))
+
+    def __len__(self) -> int:
+        return len(self.make_codes)
+
+    def id_at(self, row: int) -> str:
+        offsets = self.id_offsets
+        return self.id_blob[offsets[row] : offsets[row + 1]].decode("utf-8")
+
+    def make_at(self, row: int) -> str:
+        return self.makes.values[self.make_codes[row]]
+
+    def model_at(self, row: int) -> str:
+        return self.models.values[self.model_codes[row]]
+
+    def year_at(self, row: int) -> str:
+        return f"{self.years[row]:04d}"
+
+    def dir_at(self, row: int) -> str:
+        return self.dirs.values[self.dir_codes[row]]
+
+    def spec_at(self, row: int, name: str) -> int:
+        return self.numeric[name][row]
+
+    def category_at(self, row: int, name: str) -> str:
+        return self.categories[name].values[self.category_codes[name][row]]
+
+    def digest_bytes_at(self, row: int) -> bytes:
+        start = row * DIGEST_SIZE
+        return self.digests[start : start + DIGEST_SIZE].ljust(DIGEST_SIZE, b"\0")
+
+    def file_state_at(self, row: int) -> Optional[Tuple[int, int, bytes]]:
+        """(크기, mtime_ns, 해시). 해시가 없으면 None."""
+        digest = self.digest_bytes_at(row)
+        if not any(digest) or row >= len(self.file_sizes):
+            return None
+        return self.file_sizes[row], self.file_mtimes[row], digest
+
+    def digest_at(self, row: int) -> Optional[str]:
+        """원본 내용 해시(hex). 계산하지 않았거나 파일을 읽지 못했으면 None."""
+        start = row * DIGEST_SIZE
+        value = self.digests[start : start + DIGEST_SIZE]
+        if len(value) != DIGEST_SIZE or not any(value):
+            return None
+        return value.hex()
+
+    def specs_at(self, row: int) -> Specs:
+        return (
+            tuple(self.numeric[name][row] for name in NUMERIC_SPECS),
+            tuple(self.category_at(row, name) for name in CATEGORY_SPECS),
+        )
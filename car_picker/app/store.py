@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import logging
+import threading
 import time
 import uuid
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from threading import Lock
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Protocol, Sequence
 
 from .models import Difficulty, QuizOption
 
+LOGGER = logging.getLogger(__name__)
+
 
 @dataclass
 class StoredQuestion:
@@ -17,14 +22,52 @@ class StoredQuestion:
     created_at: float
 
 
+@dataclass
+class StoreStats:
+    issued: int = 0
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evicted: int = 0
+
+
+class QuestionBackend(Protocol):
+    """발급한 문제를 채점할 때까지 보관하는 저장소 (메모리, SQLite, 서명 토큰)."""
+
+    def issue(self, difficulty: Difficulty, correct: QuizOption) -> StoredQuestion: ...
+
+    def issue_many(self, questions: Sequence[tuple[Difficulty, QuizOption]]) -> List[StoredQuestion]: ...
+
+    def resolve(self, qid: str) -> Optional[StoredQuestion]: ...
+
+    def stats(self) -> Dict[str, int]: ...
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+
 class QuestionStore:
-    """최근 출제된 문제 정보를 유지하여 서버 채점에 활용."""
+    """최근 출제된 문제 정보를 유지하여 서버 채점에 활용.
 
-    def __init__(self, limit: int = 512, ttl_seconds: int = 600) -> None:
+    발급 순서를 유지하는 OrderedDict를 사용하므로 가장 오래된 문제 제거와
+    만료 정리가 모두 앞쪽에서 O(1)로 이루어진다.
+    """
+
+    def __init__(
+        self,
+        limit: int = 512,
+        ttl_seconds: int = 600,
+        sweep_interval_seconds: float = 30.0,
+    ) -> None:
         self._limit = limit
         self._ttl_seconds = ttl_seconds
+        self._sweep_interval_seconds = sweep_interval_seconds
         self._lock = Lock()
-        self._store: Dict[str, StoredQuestion] = {}
+        self._store: "OrderedDict[str, StoredQuestion]" = OrderedDict()
+        self._stats = StoreStats()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
 
     def issue(
         self,
@@ -39,25 +82,82 @@ class QuestionStore:
             created_at=time.time(),
         )
         with self._lock:
-            if len(self._store) >= self._limit:
-                self._evict_oldest()
-            self._store[qid] = stored
+            self._insert(stored)
         return stored
 
+    def issue_many(
+        self,
+        questions: Sequence[tuple[Difficulty, QuizOption]],
+    ) -> List[StoredQuestion]:
+        """여러 문제를 한 번의 잠금으로 등록."""
+        now = time.time()
+        issued = [
+            StoredQuestion(qid=uuid.uuid4().hex, difficulty=difficulty, correct=correct, created_at=now)
+            for difficulty, correct in questions
+        ]
+        with self._lock:
+            for stored in issued:
+                self._insert(stored)
+        return issued
+
     def resolve(self, qid: str) -> Optional[StoredQuestion]:
         with self._lock:
             stored = self._store.pop(qid, None)
-        if stored and (time.time() - stored.created_at) > self._ttl_seconds:
-            return None
+            if stored is None:
+                self._stats.misses += 1
+                return None
+            if (time.time() - stored.created_at) > self._ttl_seconds:
+                self._stats.expired += 1
+                return None
+            self._stats.hits += 1
         return stored
 
-    def _evict_oldest(self) -> None:
-        oldest_key = None
-        oldest_time = float("inf")
-        for key, value in self._store.items():
-            if value.created_at < oldest_time:
-                oldest_time = value.created_at
-                oldest_key = key
-        if oldest_key is not None:
-            self._store.pop(oldest_key, None)
+    def sweep(self, now: Optional[float] = None) -> int:
+        """만료된 문제를 앞쪽부터 제거하고 제거한 개수를 반환."""
+        deadline = (time.time() if now is None else now) - self._ttl_seconds
+        removed = 0
+        with self._lock:
+            while self._store:
+                oldest = next(iter(self._store.values()))
+                if oldest.created_at >= deadline:
+                    break
+                self._store.popitem(last=False)
+                removed += 1
+            self._stats.expired += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            values = asdict(self._stats)
+            values["size"] = len(self._store)
+        values["limit"] = self._limit
+        return values
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def start(self) -> None:
+        if self._thread is not None or self._sweep_interval_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="question-store-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _insert(self, stored: StoredQuestion) -> None:
+        while len(self._store) >= self._limit:
+            self._store.popitem(last=False)
+            self._stats.evicted += 1
+        self._store[stored.qid] = stored
+        self._stats.issued += 1
 
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._sweep_interval_seconds):
+            try:
+                self.sweep()
+            except Exception:  # 백그라운드 스레드가 죽지 않도록 기록만 한다.
+                LOGGER.exception("문제 만료 정리 실패")
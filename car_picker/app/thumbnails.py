@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from .images import content_digest
+from .scan import DataRoots
+
+LOGGER = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {"jpeg": "jpg", "webp": "webp"}
+_MEDIA_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+def cache_path(cache_dir: Path, digest: str, width: int, image_format: str) -> Path:
+    return cache_dir / digest[:2] / f"{digest}-{width}.{FORMAT_EXTENSIONS[image_format]}"
+
+
+def render_thumbnail(source: Path, target: Path, width: int, image_format: str) -> Path:
+    """원본을 지정한 폭으로 축소해 저장 (프로세스 풀에서 실행).
+
+    이미지로 인식할 수 없거나 픽셀 수가 Pillow의 상한을 넘으면 ValueError.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    if target.exists():
+        return target
+    try:
+        image = Image.open(source)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        raise ValueError(f"썸네일을 만들 수 없는 이미지입니다: {source} ({exc})") from None
+    with image:
+        image.draft("RGB", (width, width * 4))
+        image = image.convert("RGB")
+        image.thumbnail((width, image.height), Image.LANCZOS)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        if image_format == "webp":
+            image.save(tmp_path, "WEBP", quality=80, method=4)
+        else:
+            image.save(tmp_path, "JPEG", quality=85, optimize=True, progressive=True)
+    os.replace(tmp_path, target)
+    return target
+
+
+def _pregenerate_one(
+    source: Path,
+    digest: Optional[str],
+    cache_dir: Path,
+    widths: Sequence[int],
+    formats: Sequence[str],
+) -> int:
+    if digest is None:
+        digest = content_digest(source)
+    created = 0
+    for width in widths:
+        for image_format in formats:
+            target = cache_path(cache_dir, digest, width, image_format)
+            if target.exists():
+                continue
+            try:
+                render_thumbnail(source, target, width, image_format)
+                created += 1
+            except (OSError, ValueError) as exc:
+                LOGGER.warning("썸네일 생성 실패: %s (%s)", source, exc)
+                return created
+    return created
+
+
+class ThumbnailService:
+    """고정 폭 파생 이미지를 디스크에 캐시하고 프로세스 풀에서 생성."""
+
+    def __init__(
+        self,
+        source_root: Union[Path, Sequence[Path], DataRoots],
+        cache_dir: Path,
+        widths: Sequence[int],
+        webp: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.roots = DataRoots.of(source_root)
+        self.cache_dir = cache_dir
+        self.widths = sorted(set(widths))
+        self.image_format = "webp" if webp else "jpeg"
+        self._max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    @property
+    def media_type(self) -> str:
+        return _MEDIA_TYPES[self.image_format]
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._executor
+
+    def discard_executor(self, executor: Executor) -> None:
+        """작업 프로세스가 죽어 쓸 수 없게 된 풀을 버린다. 다음 요청이 새 풀을 만든다."""
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def source_path(self, relative_path: str) -> Optional[Path]:
+        return self.roots.source_path(relative_path)
+
+    def target_for(self, digest: str, width: int) -> Path:
+        return cache_path(self.cache_dir, digest, width, self.image_format)
+
+    def srcset(self, url_prefix: str, digest: str, relative_path: str) -> str:
+        """원본 해시가 들어간 폭별 URL 목록 (srcset 형식)."""
+        return ", ".join(
+            f"{url_prefix}/{width}/{digest}/{relative_path} {width}w" for width in self.widths
+        )
+
+    def pregenerate(self, items: Iterable[Tuple[str, Optional[str]]], chunksize: int = 64) -> int:
+        """(상대 경로, 내용 해시) 목록의 모든 폭 파생 이미지를 미리 생성하고 새로 만든 개수를 반환.
+
+        해시가 None이면 작업 프로세스에서 원본을 읽어 계산한다.
+        """
+        sources: List[Path] = []
+        digests: List[Optional[str]] = []
+        for relative_path, digest in items:
+            source = self.roots.locate(relative_path)
+            if source is not None:
+                sources.append(source)
+                digests.append(digest)
+        count = len(sources)
+        created = 0
+        results = self.executor.map(
+            _pregenerate_one,
+            sources,
+            digests,
+            [self.cache_dir] * count,
+            [self.widths] * count,
+            [[self.image_format]] * count,
+            chunksize=chunksize,
+        )
+        for index, made in enumerate(results, start=1):
+            created += made
+            if index % 10000 == 0:
+                LOGGER.info("썸네일 %d/%d 처리", index, count)
+        return created
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """배포 전에 모든 이미지의 썸네일을 미리 생성하는 CLI."""
+    from .indexer import CarDataset
+    from .settings import get_settings
+
+    parser = argparse.ArgumentParser(description="Pre-generate Car Picker thumbnails.")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    dataset = CarDataset(
+        settings.data_roots(),
+        snapshot_path=settings.index_snapshot_path,
+        scan_workers=settings.scan_workers,
+    )
+    service = ThumbnailService(
+        dataset.roots,
+        settings.thumbnail_cache_dir,
+        settings.thumbnail_widths,
+        webp=settings.thumbnail_webp,
+        max_workers=args.workers or settings.thumbnail_workers,
+    )
+    try:
+        created = service.pregenerate((entry.relative_path, entry.digest) for entry in dataset.entries)
+    finally:
+        service.shutdown()
+    LOGGER.info("썸네일 %d개 생성", created)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import heapq
+import hmac
+import os
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .distractors import format_label
+from .models import Difficulty, QuizOption
+from .store import StoredQuestion
+
+TOKEN_VERSION = 1
+
+# version, 난이도 코드, 발급 시각(초), nonce
+_HEADER = struct.Struct("<BBI8s")
+_MAC_SIZE = 16
+_FIELD_SEPARATOR = "\x1f"
+_DIFFICULTY_CODES = {difficulty: code for code, difficulty in enumerate(Difficulty)}
+_DIFFICULTIES = list(Difficulty)
+
+
+class SignedQuestionTokens:
+    """서명된 토큰을 문제 id로 사용하는 무상태 문제 저장소.
+
+    `QuestionStore`와 같은 인터페이스를 제공한다. 정답과 발급 시각을 토큰에 담고
+    HMAC으로 서명하므로 어느 워커에서든 공유 메모리 없이 채점할 수 있다.
+    같은 토큰의 재사용은 크기가 제한된 nonce 캐시로 막는다. nonce는 만료 시각 힙으로
+    만료된 것부터 지우며, 만료 전 nonce로 캐시가 가득 차면 재사용을 허용하지 않도록
+    새 토큰을 거절한다.
+    """
+
+    def __init__(
+        self,
+        secret: bytes,
+        ttl_seconds: int = 600,
+        replay_cache_size: int = 65536,
+    ) -> None:
+        self._secret = secret
+        self._ttl_seconds = ttl_seconds
+        self._replay_cache_size = replay_cache_size
+        self._redeemed: Set[bytes] = set()
+        # (만료 시각, nonce) 최소 힙
+        self._expiry: List[Tuple[int, bytes]] = []
+        self._lock = threading.Lock()
+        self._counts = {"issued": 0, "hits": 0, "misses": 0, "expired": 0, "replayed": 0, "rejected": 0}
+
+    def issue(self, difficulty: Difficulty, correct: QuizOption) -> StoredQuestion:
+        now = time.time()
+        with self._lock:
+            self._counts["issued"] += 1
+        return StoredQuestion(
+            qid=self._encode(difficulty, correct, int(now)),
+            difficulty=difficulty,
+            correct=correct,
+            created_at=now,
+        )
+
+    def issue_many(
+        self,
+        questions: Sequence[tuple[Difficulty, QuizOption]],
+    ) -> List[StoredQuestion]:
+        return [self.issue(difficulty, correct) for difficulty, correct in questions]
+
+    def resolve(self, qid: str) -> Optional[StoredQuestion]:
+        decoded = self._decode(qid)
+        if decoded is None:
+            self._count("misses")
+            return None
+
+        difficulty, correct, issued_at, nonce = decoded
+        now = time.time()
+        if now - issued_at > self._ttl_seconds:
+            self._count("expired")
+            return None
+
+        with self._lock:
+            self._prune(int(now))
+            if nonce in self._redeemed:
+                self._counts["replayed"] += 1
+                return None
+            if len(self._redeemed) >= self._replay_cache_size:
+                # 만료 전 nonce를 지우면 그 토큰을 다시 쓸 수 있으므로 새 토큰을 받지 않는다.
+                self._counts["rejected"] += 1
+                return None
+            self._redeemed.add(nonce)
+            heapq.heappush(self._expiry, (issued_at + self._ttl_seconds, nonce))
+            self._counts["hits"] += 1
+
+        return StoredQuestion(qid=qid, difficulty=difficulty, correct=correct, created_at=float(issued_at))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            values = dict(self._counts)
+            values["size"] = len(self._redeemed)
+        values["limit"] = self._replay_cache_size
+        return values
+
+    def __len__(self) -> int:
+        return len(self._redeemed)
+
+    def start(self) -> None:
+        """무상태 저장소라 백그라운드 작업이 없다."""
+
+    def stop(self) -> None:
+        """무상태 저장소라 백그라운드 작업이 없다."""
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def _prune(self, now: int) -> None:
+        expiry, redeemed = self._expiry, self._redeemed
+        while expiry and expiry[0][0] < now:
+            redeemed.discard(heapq.heappop(expiry)[1])
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()[:_MAC_SIZE]
+
+    def _encode(self, difficulty: Difficulty, correct: QuizOption, issued_at: int) -> str:
+        header = _HEADER.pack(TOKEN_VERSION, _DIFFICULTY_CODES[difficulty], issued_at, os.urandom(8))
+        fields = _FIELD_SEPARATOR.join((correct.make, correct.model or "", correct.year or ""))
+        payload = header + fields.encode("utf-8")
+        token = base64.urlsafe_b64encode(payload + self._sign(payload))
+        return token.rstrip(b"=").decode("ascii")
+
+    def _decode(self, qid: str) -> Optional[tuple[Difficulty, QuizOption, int, bytes]]:
+        try:
+            raw = base64.urlsafe_b64decode(qid + "=" * (-len(qid) % 4))
+        except (binascii.Error, ValueError):
+            return None
+        if len(raw) < _HEADER.size + _MAC_SIZE:
+            return None
+
+        payload, mac = raw[:-_MAC_SIZE], raw[-_MAC_SIZE:]
+        if not hmac.compare_digest(mac, self._sign(payload)):
+            return None
+        version, difficulty_code, issued_at, nonce = _HEADER.unpack_from(payload)
+        if version != TOKEN_VERSION or difficulty_code >= len(_DIFFICULTIES):
+            return None
+
+        try:
+            make, model, year = payload[_HEADER.size :].decode("utf-8").split(_FIELD_SEPARATOR)
+        except ValueError:
+            return None
+        difficulty = _DIFFICULTIES[difficulty_code]
+        correct = QuizOption.construct(
+            make=make,
+            model=model or None,
+            year=year or None,
+            label=format_label(make, model, year, difficulty),
+        )
+        return difficulty, correct, issued_at, nonce
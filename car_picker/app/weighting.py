@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import random
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .indexer import CarDataset
+
+UNIFORM = "uniform"
+MAKE = "make"
+MODEL = "model"
+WEIGHTS = "weights"
+POLICIES = (UNIFORM, MAKE, MODEL, WEIGHTS)
+
+# (제조사 코드, 모델 코드)
+StratumKey = Tuple[int, int]
+
+
+class AliasTable:
+    """Walker 별칭 표 (Vose 구성). 구성은 O(n), 한 번 뽑는 데는 난수 하나로 O(1)."""
+
+    __slots__ = ("_probability", "_alias")
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0 or any(weight < 0 for weight in weights):
+            raise ValueError("가중치는 0 이상이고 합이 0보다 커야 합니다.")
+        scaled = [weight * count / total for weight in weights]
+        self._probability = array("d", bytes(8 * count))
+        self._alias = array("I", range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probability[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # 남은 칸은 부동소수 오차를 빼면 모두 1이다.
+        for index in large + small:
+            self._probability[index] = 1.0
+
+    def draw(self) -> int:
+        position = random.random() * len(self._alias)
+        index = int(position)
+        return index if position - index < self._probability[index] else self._alias[index]
+
+    def __len__(self) -> int:
+        return len(self._alias)
+
+
+@dataclass(frozen=True)
+class SamplingPolicy:
+    """정답 항목을 고르는 정책.
+
+    - uniform: 이미지마다 같은 확률 (기본값)
+    - make: 제조사마다 같은 확률, 제조사 안에서는 모델마다 같은 확률
+    - model: (제조사, 모델)마다 같은 확률
+    - weights: make 정책에 설정 파일의 제조사/모델 가중치를 곱한다 (기본 1)
+
+    고른 (제조사, 모델) 안에서는 이미지를 균등하게 고른다.
+    """
+
+    kind: str = UNIFORM
+    make_weights: Tuple[Tuple[str, float], ...] = ()
+    model_weights: Tuple[Tuple[str, str, float], ...] = ()
+
+    def __bool__(self) -> bool:
+        return self.kind != UNIFORM
+
+    @classmethod
+    def load(cls, kind: str, weights_path: Optional[Path] = None) -> "SamplingPolicy":
+        """설정 값으로 정책을 만든다. weights 정책은 JSON 가중치 파일을 읽는다.
+
+        파일 형식: `{"makes": {"Audi": 2.0}, "models": {"BMW": {"X5": 0.5}}}`
+        """
+        if kind not in POLICIES:
+            raise ValueError(f"지원하지 않는 추출 정책: {kind}")
+        if kind != WEIGHTS:
+            return cls(kind)
+        if weights_path is None:
+            raise ValueError("weights 정책에는 가중치 파일이 필요합니다.")
+        data = json.loads(Path(weights_path).read_text(encoding="utf-8"))
+        makes = data.get("makes", {})
+        models = data.get("models", {})
+        if not isinstance(makes, dict) or not isinstance(models, dict):
+            raise ValueError("가중치 파일의 makes/models는 객체여야 합니다.")
+        make_weights = tuple(sorted((make, _weight(value)) for make, value in makes.items()))
+        model_weights = []
+        for make, per_model in models.items():
+            if not isinstance(per_model, dict):
+                raise ValueError(f"models.{make}는 모델별 가중치 객체여야 합니다.")
+            model_weights.extend((make, model, _weight(value)) for model, value in per_model.items())
+        return cls(kind, make_weights, tuple(sorted(model_weights)))
+
+
+def _weight(value: object) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"가중치는 0 이상의 숫자여야 합니다: {value!r}")
+    return float(value)
+
+
+class StratifiedSampler:
+    """(제조사, 모델) 층을 별칭 표로 O(1)에 고른 뒤 그 층의 행을 균등하게 고른다.
+
+    별칭 표는 층 목록과 가중치에만 의존한다. 새 데이터셋 버전의 층 구성이 이전과
+    같으면(이미지만 추가/삭제된 경우) 이전 표를 그대로 쓰고 행 목록만 새 버전 것을 본다.
+    """
+
+    def __init__(
+        self,
+        keys: List[StratumKey],
+        table: Optional[AliasTable],
+        active: List[StratumKey],
+        postings: Mapping[StratumKey, array],
+    ) -> None:
+        self.keys = keys
+        self.table = table
+        # 가중치가 0보다 큰 층
+        self.active = active
+        self._postings = postings
+
+    def updated(self, dataset: "CarDataset", policy: SamplingPolicy, strata_changed: bool) -> "StratifiedSampler":
+        """새 데이터셋 버전의 추출기. 층이 생기거나 없어지지 않았으면 별칭 표를 그대로 쓴다."""
+        if strata_changed:
+            return StratifiedSampler.build(dataset, policy)
+        return StratifiedSampler(self.keys, self.table, self.active, dataset.pair_postings())
+
+    @classmethod
+    def build(cls, dataset: "CarDataset", policy: SamplingPolicy) -> "StratifiedSampler":
+        postings = dataset.pair_postings()
+        keys = list(postings)
+        columns = dataset.columns
+        models_per_make: Dict[int, int] = {}
+        for make_code, _ in keys:
+            models_per_make[make_code] = models_per_make.get(make_code, 0) + 1
+        make_weights = dict(policy.make_weights)
+        model_weights = {(make, model): weight for make, model, weight in policy.model_weights}
+        weights = []
+        for make_code, model_code in keys:
+            if policy.kind == MODEL:
+                weights.append(1.0)
+                continue
+            weight = 1.0 / models_per_make[make_code]
+            if policy.kind == WEIGHTS:
+                make, model = columns.makes[make_code], columns.models[model_code]
+                weight *= make_weights.get(make, 1.0) * model_weights.get((make, model), 1.0)
+            weights.append(weight)
+        active = [key for key, weight in zip(keys, weights) if weight > 0]
+        # 뽑을 층이 없어도 데이터셋 갱신은 실패하지 않게 하고, 추출할 때 오류를 낸다.
+        table = AliasTable(weights) if active else None
+        return cls(keys, table, active, postings)
+
+    def draw(self) -> int:
+        if self.table is None:
+            raise ValueError("사용 가능한 항목이 없습니다.")
+        return random.choice(self._postings[self.keys[self.table.draw()]])
+
+    def rows(self) -> Iterator[int]:
+        """가중치가 0보다 큰 층의 모든 행."""
+        for key in self.active:
+            yield from self._postings[key]
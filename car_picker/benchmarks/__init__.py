@@ -0,0 +1 @@
+"""Car Picker 성능 측정 스크립트 모음."""
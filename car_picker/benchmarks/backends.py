@@ -0,0 +1,70 @@
+"""메모리/SQLite 저장소 백엔드의 호출당 지연 비교.
+
+실행: python -m car_picker.benchmarks.backends --operations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from car_picker.app.models import Difficulty, QuizOption
+from car_picker.app.score import ScoreBoard
+from car_picker.app.sqlite_backend import SQLiteDatabase, SQLiteQuestionStore, SQLiteScoreBoard
+from car_picker.app.store import QuestionStore
+
+from .stats import latencies
+
+OPTION = QuizOption(make="Audi", model="A5", year="2013", label="Audi A5 (2013)")
+
+
+def _run_backend(store, scoreboard, operations: int, batch_size: int, players: int) -> Dict[str, Dict[str, float]]:
+    issued = []
+    results = {
+        "issue": latencies(lambda _: issued.append(store.issue(Difficulty.MAKE, OPTION)), operations),
+        "resolve": latencies(lambda index: store.resolve(issued[index].qid), operations),
+        "issue_many": latencies(
+            lambda _: store.issue_many([(Difficulty.MAKE, OPTION)] * batch_size), max(operations // batch_size, 1)
+        ),
+        "register_attempt": latencies(
+            lambda index: scoreboard.register_attempt(f"player-{index % players}", Difficulty.MAKE, index % 3 != 0),
+            operations,
+        ),
+        "top_entries": latencies(lambda _: scoreboard.top_entries(), max(operations // 100, 1)),
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare storage backend latency.")
+    parser.add_argument("--operations", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--players", type=int, default=1_000)
+    args = parser.parse_args()
+
+    limit = args.operations * 2
+    results = {"operations": args.operations, "batch_size": args.batch_size, "players": args.players}
+    results["memory"] = _run_backend(
+        QuestionStore(limit=limit, sweep_interval_seconds=0),
+        ScoreBoard(),
+        args.operations,
+        args.batch_size,
+        args.players,
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        database = SQLiteDatabase(Path(directory) / "bench.sqlite3")
+        results["sqlite"] = _run_backend(
+            SQLiteQuestionStore(database, limit=limit, sweep_interval_seconds=0),
+            SQLiteScoreBoard(database),
+            args.operations,
+            args.batch_size,
+            args.players,
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""CarDataset 메모리 사용량 비교.
+
+실행: python -m car_picker.benchmarks.memory --entries 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from car_picker.app.indexer import CarDataset, parse_filename
+from car_picker.app.models import CarEntry
+
+from .synthetic import synthetic_names
+
+
+def _build_legacy(names: List[str]) -> Dict[str, object]:
+    """압축 저장소 도입 이전의 객체 기반 표현."""
+    entries: List[CarEntry] = []
+    by_make = defaultdict(list)
+    by_model = defaultdict(list)
+    make_model_map = defaultdict(list)
+    for name in names:
+        entry = parse_filename(Path(name))
+        if entry is None:
+            continue
+        entries.append(entry)
+        by_make[entry.make].append(entry)
+        by_model[entry.model].append(entry)
+        make_model_map[(entry.make, entry.model)].append(entry)
+    return {"entries": entries, "by_make": by_make, "by_model": by_model, "make_model_map": make_model_map}
+
+
+def _measure(build: Callable[[], object]) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"retained_bytes": retained, "peak_bytes": peak, "build_seconds": round(elapsed, 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare CarDataset memory usage.")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    names = list(synthetic_names(args.entries))
+    results = {"entries": args.entries}
+    results["compact"] = _measure(lambda: CarDataset.from_names(Path("."), names))
+    if not args.skip_legacy:
+        results["legacy"] = _measure(lambda: _build_legacy(names))
+        results["retained_ratio"] = round(
+            results["legacy"]["retained_bytes"] / max(results["compact"]["retained_bytes"], 1), 2
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
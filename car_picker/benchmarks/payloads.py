@@ -0,0 +1,86 @@
+"""문제 응답 직렬화 비용 비교 (response_model 검증 경로 vs 미리 인코딩된 조각).
+
+실행: python -m car_picker.benchmarks.payloads --iterations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_response_field
+
+from car_picker.app.indexer import CarDataset
+from car_picker.app.models import Difficulty, QuestionPayload
+from car_picker.app.payloads import encode_question
+from car_picker.app.sampler import build_question
+
+from .synthetic import synthetic_names
+
+IMAGE_URL = "/api/images/0123456789abcdef0123456789abcdef/car.jpg"
+PROMPT = "Guess the vehicle information."
+
+
+def _per_call_us(operation: Callable[[], object], iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        operation()
+    return round((time.process_time() - started) / iterations * 1e6, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare question payload serialization paths.")
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    dataset = CarDataset.from_names(Path("."), list(synthetic_names(args.entries)))
+    pools = dataset.distractor_pools
+    difficulty = Difficulty.MAKE_MODEL_YEAR
+    entry, correct, options = build_question(dataset, difficulty)
+    response_field = create_response_field(name="response", type_=QuestionPayload)
+
+    def validated() -> bytes:
+        # FastAPI가 response_model로 하던 일: 모델 생성, 응답 필드 검증, jsonable_encoder, JSON 렌더링
+        payload = QuestionPayload(
+            qid="0" * 32,
+            difficulty=difficulty,
+            imageUrl=IMAGE_URL,
+            imageSrcset="",
+            prompt=PROMPT,
+            correct=correct,
+            options=options,
+            timeout=20,
+        )
+        value, _ = response_field.validate(payload, {}, loc=("response",))
+        return JSONResponse(jsonable_encoder(value, by_alias=True)).body
+
+    def pre_encoded() -> bytes:
+        return encode_question(
+            qid="0" * 32,
+            difficulty=difficulty,
+            image_url=IMAGE_URL,
+            image_srcset="",
+            prompt=PROMPT,
+            correct=pools.encoded(correct, difficulty),
+            options=[pools.encoded(option, difficulty) for option in options],
+            timeout=20,
+        )
+
+    assert json.loads(validated()) == json.loads(pre_encoded())
+    results: Dict[str, object] = {"entries": args.entries, "iterations": args.iterations}
+    results["validated_cpu_us"] = _per_call_us(validated, args.iterations)
+    results["pre_encoded_cpu_us"] = _per_call_us(pre_encoded, args.iterations)
+    results["speedup"] = round(results["validated_cpu_us"] / max(results["pre_encoded_cpu_us"], 0.01), 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import statistics
+import time
+from typing import Callable, Dict, List, Sequence
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """초 단위 표본의 평균/p50/p99 (마이크로초)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "mean_us": 0.0, "p50_us": 0.0, "p99_us": 0.0}
+    return {
+        "count": len(ordered),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 2),
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 2),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6, 2),
+    }
+
+
+def latencies(operation: Callable[[int], object], count: int) -> Dict[str, float]:
+    """operation(index)를 count번 호출한 지연 요약."""
+    samples: List[float] = []
+    for index in range(count):
+        started = time.perf_counter()
+        operation(index)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
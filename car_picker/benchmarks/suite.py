@@ -0,0 +1,273 @@
+"""합성 데이터셋으로 시작 시간, 메모리, 핫 경로 지연과 동시 API 처리량을 측정.
+
+실행: python -m car_picker.benchmarks.suite --entries 100000 --skew 1.1 --players 200 --output bench.json
+비교: python -m car_picker.benchmarks.suite --entries 100000 --compare bench.json
+
+크기마다 별도 프로세스로 실행해야 RSS 값을 서로 비교할 수 있다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from car_picker.app.indexer import CarDataset, EntryFilter
+from car_picker.app.models import Difficulty, DistractorMode
+from car_picker.app.neighbors import model_vectors, nearest_neighbors
+from car_picker.app.sampler import build_question, pick_row
+from car_picker.app.scan import DataRoots, scan_roots
+from car_picker.app.score import ScoreBoard
+from car_picker.app.sessions import RowBitset
+from car_picker.app.store import QuestionStore
+from car_picker.app.weighting import SamplingPolicy
+
+from .stats import latencies, summarize
+from .synthetic import synthetic_names, write_synthetic_dir
+
+
+def _rss_bytes() -> Dict[str, int]:
+    values = {"peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+    try:
+        with open("/proc/self/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    values["rss_bytes"] = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return values
+
+
+def measure_startup(data_dir: Path, snapshot_path: Path) -> Dict[str, object]:
+    """디렉터리 스캔, 스냅샷 기록, 스냅샷 적재 시간과 적재 후 RSS."""
+    roots = DataRoots([data_dir])
+    listing: Dict[str, float] = {}
+    for workers in (1, os.cpu_count() or 1):
+        started = time.perf_counter()
+        scan_roots(roots, workers=workers)
+        listing[f"workers_{workers}"] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    scanned = CarDataset(data_dir)
+    scan_seconds = time.perf_counter() - started
+    del scanned
+
+    CarDataset(data_dir, snapshot_path=snapshot_path, rebuild_snapshot=True)
+    started = time.perf_counter()
+    dataset = CarDataset(data_dir, snapshot_path=snapshot_path)
+    snapshot_seconds = time.perf_counter() - started
+
+    results: Dict[str, object] = {
+        "rows": len(dataset),
+        "list_seconds": listing,
+        "scan_seconds": round(scan_seconds, 4),
+        "snapshot_load_seconds": round(snapshot_seconds, 4),
+    }
+    results.update(_rss_bytes())
+    return results
+
+
+def measure_hot_paths(dataset: CarDataset, iterations: int) -> Dict[str, object]:
+    """핫 경로 함수의 호출당 지연."""
+    rng = random.Random(1)
+    ids = [dataset.id_of(row) for row in rng.sample(list(dataset.rows), min(len(dataset), 200))]
+    results: Dict[str, object] = {
+        "pick_row": latencies(lambda _: pick_row(dataset, set()), iterations),
+        "pick_row_excluding_200": latencies(lambda _: pick_row(dataset, set(ids)), iterations),
+    }
+    seen = RowBitset(len(dataset.columns))
+    for row in rng.sample(list(dataset.rows), len(dataset) // 2):
+        seen.add(row)
+    results["pick_row_session_half_seen"] = latencies(lambda _: pick_row(dataset, set(), seen=seen), iterations)
+    for kind in ("make", "model"):
+        sampler = dataset.stratified_sampler(SamplingPolicy.load(kind))
+        results[f"pick_row_policy_{kind}"] = latencies(
+            lambda _, sampler=sampler: pick_row(dataset, set(), sampler=sampler), iterations
+        )
+    for difficulty in Difficulty:
+        results[f"build_question_{difficulty.value}"] = latencies(
+            lambda _, difficulty=difficulty: build_question(dataset, difficulty), iterations
+        )
+    entry_filter = EntryFilter(body="SUV", drivetrain="AWD", year_from=2015)
+    results["filtered_rows_uncached"] = latencies(lambda _: dataset._intersect(entry_filter), min(iterations, 200))
+    results["build_question_filtered"] = latencies(
+        lambda _: build_question(dataset, Difficulty.MAKE, entry_filter=entry_filter), iterations
+    )
+    for difficulty in (Difficulty.MAKE_MODEL, Difficulty.MAKE_MODEL_YEAR):
+        results[f"build_question_hard_{difficulty.value}"] = latencies(
+            lambda _, difficulty=difficulty: build_question(dataset, difficulty, mode=DistractorMode.HARD), iterations
+        )
+    _, vectors, _ = model_vectors(dataset)
+    started = time.perf_counter()
+    nearest_neighbors(vectors)
+    results["nearest_neighbors_seconds"] = round(time.perf_counter() - started, 4)
+
+    store = QuestionStore(limit=iterations, sweep_interval_seconds=0)
+    option = dataset.distractor_pools.option_for(dataset.entry_at(dataset.rows[0]), Difficulty.MAKE)
+    issued: List[str] = []
+    results["store_issue"] = latencies(lambda _: issued.append(store.issue(Difficulty.MAKE, option).qid), iterations)
+    results["store_resolve"] = latencies(lambda index: store.resolve(issued[index]), iterations)
+
+    board = ScoreBoard()
+    results["scoreboard_register_attempt"] = latencies(
+        lambda index: board.register_attempt(f"player-{index % 1000}", Difficulty.MAKE, index % 3 != 0),
+        iterations,
+    )
+    results["scoreboard_top_entries"] = latencies(lambda _: board.top_entries(), iterations)
+    return results
+
+
+async def _play(client, player: str, rounds: int, difficulty: str, samples: Dict[str, List[float]]) -> None:
+    for _ in range(rounds):
+        started = time.perf_counter()
+        response = await client.get("/api/question", params={"difficulty": difficulty})
+        samples["question"].append(time.perf_counter() - started)
+        if response.status_code != 200:
+            samples["errors"].append(1.0)
+            continue
+        question = response.json()
+        answer = random.choice(question["options"])
+        payload = {"qid": question["qid"], "difficulty": difficulty, "answer": answer, "player": player}
+        started = time.perf_counter()
+        response = await client.post("/api/answer", json=payload)
+        samples["answer"].append(time.perf_counter() - started)
+        if response.status_code != 200:
+            samples["errors"].append(1.0)
+
+
+async def _drive_api(players: int, rounds: int, difficulty: str) -> Dict[str, object]:
+    import httpx
+
+    from car_picker.app.main import create_app
+
+    app = create_app()
+    samples: Dict[str, List[float]] = {"question": [], "answer": [], "errors": []}
+    started = time.perf_counter()
+    await app.router.startup()
+    startup_seconds = time.perf_counter() - started
+    app.state.dataset_loader.wait()
+    ready_seconds = time.perf_counter() - started
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(_play(client, f"player-{index}", rounds, difficulty, samples) for index in range(players))
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        await app.router.shutdown()
+
+    completed = len(samples["answer"])
+    return {
+        "players": players,
+        "rounds": rounds,
+        "difficulty": difficulty,
+        "startup_seconds": round(startup_seconds, 4),
+        "ready_seconds": round(ready_seconds, 4),
+        "seconds": round(elapsed, 3),
+        "rounds_per_second": round(completed / elapsed, 1) if elapsed else 0.0,
+        "errors": len(samples["errors"]),
+        "question": summarize(samples["question"]),
+        "answer": summarize(samples["answer"]),
+    }
+
+
+def measure_api(data_dir: Path, cache_dir: Path, players: int, rounds: int, difficulty: str) -> Dict[str, object]:
+    """프로세스 안에서 여러 플레이어의 문제/채점 루프를 동시에 실행."""
+    from car_picker.app.settings import get_settings
+
+    os.environ["CAR_PICKER_DATA_DIR"] = str(data_dir)
+    os.environ["CAR_PICKER_THUMBNAIL_CACHE_DIR"] = str(cache_dir / "thumbnails")
+    os.environ.setdefault("CAR_PICKER_QUESTION_STORE_LIMIT", str(max(players * 4, 512)))
+    get_settings.cache_clear()
+    return asyncio.run(_drive_api(players, rounds, difficulty))
+
+
+def _flatten(values: Dict[str, object], prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for key, value in values.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object]) -> Dict[str, float]:
+    """두 결과에 모두 있는 수치 항목의 비율 (현재 / 기준)."""
+    now, before = _flatten(current), _flatten(baseline)
+    return {
+        name: round(now[name] / before[name], 3)
+        for name in sorted(now.keys() & before.keys())
+        if before[name] and not name.startswith(("config.", "environment."))
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the Car Picker benchmark suite.")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--makes", type=int, default=60)
+    parser.add_argument("--models-per-make", type=int, default=25)
+    parser.add_argument("--skew", type=float, default=0.0, help="Zipf exponent for make/model popularity")
+    parser.add_argument("--subdirs", type=int, default=0, help="spread files over this many dated subdirectories")
+    parser.add_argument("--iterations", type=int, default=5_000)
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--difficulty", choices=[difficulty.value for difficulty in Difficulty], default="make_model_year")
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    results: Dict[str, object] = {
+        "config": {
+            "entries": args.entries,
+            "makes": args.makes,
+            "models_per_make": args.models_per_make,
+            "skew": args.skew,
+            "subdirs": args.subdirs,
+            "iterations": args.iterations,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": int(time.time()),
+        },
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        data_dir = root / "data"
+        started = time.perf_counter()
+        names = synthetic_names(args.entries, args.makes, args.models_per_make, skew=args.skew)
+        write_synthetic_dir(data_dir, names, subdirs=args.subdirs)
+        results["config"]["generate_seconds"] = round(time.perf_counter() - started, 3)
+
+        results["startup"] = measure_startup(data_dir, root / "index.snapshot")
+        dataset = CarDataset(data_dir, snapshot_path=root / "index.snapshot")
+        results["hot_paths"] = measure_hot_paths(dataset, args.iterations)
+        del dataset
+        if not args.skip_api:
+            results["api"] = measure_api(data_dir, root, args.players, args.rounds, args.difficulty)
+
+    if args.compare is not None:
+        results["ratio_to_baseline"] = compare(results, json.loads(args.compare.read_text(encoding="utf-8")))
+
+    output = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import itertools
+import random
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+BODY_STYLES = ("Sedan", "SUV", "Coupe", "Hatchback", "Pickup", "Convertible", "Wagon", "Van")
+DRIVETRAINS = ("FWD", "AWD", "RWD", "4WD")
+
+def _zipf_cum_weights(count: int, skew: float) -> List[float]:
+    return list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def synthetic_names(
+    count: int,
+    make_count: int = 60,
+    models_per_make: int = 25,
+    seed: int = 0,
+    skew: float = 0.0,
+) -> Iterator[str]:
+    """스크레이퍼 규칙을 따르는 가짜 파일명을 생성.
+
+    skew가 0보다 크면 제조사와 모델을 지수 skew의 Zipf 분포로 뽑아 일부 제조사/모델에
+    이미지가 몰린 데이터셋을 만든다. 0이면 균등 분포다.
+    """
+    rng = random.Random(seed)
+    makes: List[str] = [f"Make{index:03d}" for index in range(make_count)]
+    models: List[List[str]] = [
+        [f"M{make_index:03d}x{model_index:03d}" for model_index in range(models_per_make)]
+        for make_index in range(make_count)
+    ]
+    make_weights: Optional[List[float]] = None
+    model_weights: Optional[List[float]] = None
+    if skew > 0:
+        make_weights = _zipf_cum_weights(make_count, skew)
+        model_weights = _zipf_cum_weights(models_per_make, skew)
+    make_indices = range(make_count)
+    for index in range(count):
+        if make_weights is None or model_weights is None:
+            make_index = rng.randrange(make_count)
+            model = rng.choice(models[make_index])
+        else:
+            make_index = rng.choices(make_indices, cum_weights=make_weights)[0]
+            model = rng.choices(models[make_index], cum_weights=model_weights)[0]
+        year = rng.randrange(1995, 2025)
+        body = BODY_STYLES[index % len(BODY_STYLES)]
+        drive = DRIVETRAINS[index // len(BODY_STYLES) % len(DRIVETRAINS)]
+        yield (
+            f"{makes[make_index]}_{model}_{year}_40_18_200_20_4_70_55_180_30_{drive}_5_4_{body}_"
+            f"{index:08x}.jpg"
+        )
+
+
+def write_synthetic_dir(directory: Path, names: Iterable[str], subdirs: int = 0) -> int:
+    """파일명마다 빈 이미지 파일을 만들어 실제 디렉터리 스캔을 측정할 수 있게 한다.
+
+    subdirs가 양수면 스크레이퍼처럼 날짜별 하위 디렉터리 여러 개에 나눠 쓴다.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    targets = [directory]
+    if subdirs > 0:
+        targets = [directory / f"2024-{index // 28 + 1:02d}-{index % 28 + 1:02d}" for index in range(subdirs)]
+        for target in targets:
+            target.mkdir(exist_ok=True)
+    written = 0
+    for name in names:
+        (targets[written % len(targets)] / name).touch()
+        written += 1
+    return written
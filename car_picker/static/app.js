@@ -1,6 +1,8 @@
 const API_BASE = "/api";
 const SETTINGS_KEY = "car-picker-settings";
 const PLAYER_KEY = "car-picker-player";
+const PREFETCH_BATCH_SIZE = 5;
+const PREFETCH_LOW_WATER = 2;
 
 const defaultSettings = {
   difficulty: "make_model_year",
@@ -33,6 +35,10 @@ const state = {
   hasAnswered: false,
   stats: { correct: 0, attempts: 0, streak: 0 },
   playerName: loadPlayerName(),
+  prefetchQueue: [],
+  prefetchKey: null,
+  prefetchPromise: null,
+  sessionId: null,
 };
 
 const elements = {};
@@ -134,14 +140,8 @@ async function loadQuestion() {
   setFeedback(textMap.feedback.loading, null);
   elements.options.innerHTML = "";
 
-  const params = new URLSearchParams({
-    difficulty: state.settings.difficulty,
-    timer: String(state.settings.timer),
-  });
   try {
-    const response = await fetch(`${API_BASE}/question?${params.toString()}`, { cache: "no-store" });
-    if (!response.ok) throw new Error(`Failed to fetch question (${response.status})`);
-    const question = await response.json();
+    const question = await nextQueuedQuestion();
     state.question = question;
     renderQuestion(question);
     renderOptions(question.options);
@@ -154,12 +154,98 @@ async function loadQuestion() {
     console.error(error);
     setFeedback("Unable to load a question. Refresh and try again.", "timeout");
   }
+  ensurePrefetch();
+}
+
+function currentPrefetchKey() {
+  return `${state.settings.difficulty}|${state.settings.timer}`;
+}
+
+function resetPrefetch() {
+  state.prefetchQueue = [];
+  state.prefetchKey = currentPrefetchKey();
+  state.prefetchPromise = null;
+}
+
+function ensurePrefetch() {
+  if (state.prefetchKey !== currentPrefetchKey()) {
+    resetPrefetch();
+  }
+  if (state.prefetchPromise || state.prefetchQueue.length >= PREFETCH_LOW_WATER) {
+    return state.prefetchPromise;
+  }
+  const key = state.prefetchKey;
+  const promise = fetchQuestionBatch()
+    .then((questions) => {
+      if (state.prefetchKey !== key) return;
+      state.prefetchQueue.push(...questions);
+      questions.forEach(preloadImage);
+    })
+    .finally(() => {
+      if (state.prefetchPromise === promise) {
+        state.prefetchPromise = null;
+      }
+    });
+  state.prefetchPromise = promise;
+  return promise;
+}
+
+async function nextQueuedQuestion() {
+  if (state.prefetchKey !== currentPrefetchKey()) {
+    resetPrefetch();
+  }
+  while (!state.prefetchQueue.length) {
+    await ensurePrefetch();
+    if (!state.prefetchQueue.length && !state.prefetchPromise) {
+      throw new Error("No questions available");
+    }
+  }
+  return state.prefetchQueue.shift();
+}
+
+async function ensureSession() {
+  if (state.sessionId) return state.sessionId;
+  const response = await fetch(`${API_BASE}/sessions`, { method: "POST" });
+  if (!response.ok) throw new Error(`Failed to start a session (${response.status})`);
+  const data = await response.json();
+  state.sessionId = data.sessionId;
+  return state.sessionId;
+}
+
+async function fetchQuestionBatch(retried = false) {
+  const params = new URLSearchParams({
+    difficulty: state.settings.difficulty,
+    timer: String(state.settings.timer),
+    count: String(PREFETCH_BATCH_SIZE),
+    session: await ensureSession(),
+  });
+  const url = `${API_BASE}/questions?${params.toString()}`;
+  let response = await fetch(url, { cache: "no-store" });
+  while (response.status === 503) {
+    const retryAfter = Number(response.headers.get("Retry-After")) || 2;
+    await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+    response = await fetch(url, { cache: "no-store" });
+  }
+  if ((response.status === 404 || response.status === 400) && !retried) {
+    state.sessionId = null;
+    return fetchQuestionBatch(true);
+  }
+  if (!response.ok) throw new Error(`Failed to fetch questions (${response.status})`);
+  const data = await response.json();
+  return data.questions || [];
+}
+
+function preloadImage(question) {
+  const image = new Image();
+  image.sizes = elements.image.sizes;
+  image.srcset = question.imageSrcset || "";
+  image.src = question.imageUrl;
 }
 
 function renderQuestion(question) {
   const promptText = textMap.prompt[question.difficulty] || "Identify the car shown.";
-  const cacheBuster = `ts=${Date.now()}`;
-  elements.image.src = `${question.imageUrl}?${cacheBuster}`;
+  elements.image.srcset = question.imageSrcset || "";
+  elements.image.src = question.imageUrl;
   elements.image.alt = "Automobile quiz image";
   elements.prompt.textContent = promptText;
 }
@@ -326,7 +412,7 @@ function renderServerScore(score) {
 
 async function refreshLeaderboard() {
   try {
-    const response = await fetch(`${API_BASE}/leaderboard`, { cache: "no-store" });
+    const response = await fetch(`${API_BASE}/leaderboard`, { cache: "no-cache" });
     if (!response.ok) throw new Error("Leaderboard request failed");
     const data = await response.json();
     renderLeaderboard(data.entries || []);
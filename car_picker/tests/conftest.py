@@ -41,8 +41,15 @@ def sample_data_dir(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
 
 
 @pytest.fixture(autouse=True)
-def configure_settings(monkeypatch: pytest.MonkeyPatch, sample_data_dir: Path) -> Iterator[None]:
+def configure_settings(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_data_dir: Path,
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[None]:
     monkeypatch.setenv("CAR_PICKER_DATA_DIR", str(sample_data_dir))
+    monkeypatch.setenv("CAR_PICKER_THUMBNAIL_CACHE_DIR", str(tmp_path_factory.mktemp("thumbnails")))
+    # 대부분의 테스트는 시작 직후 문제를 요청하므로 적재가 끝날 때까지 기다린다.
+    monkeypatch.setenv("CAR_PICKER_DATASET_STARTUP_WAIT_SECONDS", "10")
     app_settings.get_settings.cache_clear()
     yield
     app_settings.get_settings.cache_clear()
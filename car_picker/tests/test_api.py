@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import json
+
 from fastapi.testclient import TestClient
 
+from car_picker.app.images import content_digest
+from car_picker.app.models import Difficulty
+
 
 def test_question_and_answer_flow(fastapi_app):
     client = TestClient(fastapi_app)
@@ -20,6 +25,8 @@ def test_question_and_answer_flow(fastapi_app):
             "player": "테스터",
             "timeout": False,
         }
+        too_long = client.post("/api/answer", json={**answer_payload, "player": "가" * 65})
+        assert too_long.status_code == 422
         answer_response = client.post("/api/answer", json=answer_payload)
         assert answer_response.status_code == 200
         answer_data = answer_response.json()
@@ -30,3 +37,128 @@ def test_question_and_answer_flow(fastapi_app):
         assert leaderboard_response.status_code == 200
         leaderboard = leaderboard_response.json()
         assert leaderboard["entries"]
+
+
+def test_question_batch_has_unique_images(fastapi_app):
+    client = TestClient(fastapi_app)
+    with client:
+        response = client.get("/api/questions", params={"difficulty": "make", "count": 5})
+        assert response.status_code == 200
+        questions = response.json()["questions"]
+        assert len(questions) == 5
+        assert len({question["imageUrl"] for question in questions}) == 5
+        assert len({question["qid"] for question in questions}) == 5
+
+        answer_payload = {
+            "qid": questions[-1]["qid"],
+            "difficulty": "make",
+            "answer": questions[-1]["correct"],
+        }
+        assert client.post("/api/answer", json=answer_payload).json()["correct"] is True
+
+
+def test_leaderboard_etag_changes_only_with_board(fastapi_app):
+    client = TestClient(fastapi_app)
+    with client:
+        first = client.get("/api/leaderboard")
+        etag = first.headers["etag"]
+        assert client.get("/api/leaderboard", headers={"If-None-Match": etag}).status_code == 304
+
+        fastapi_app.state.scoreboard.register_attempt("tester", Difficulty.MAKE, True)
+        updated = client.get("/api/leaderboard", headers={"If-None-Match": etag})
+        assert updated.status_code == 200
+        assert updated.headers["etag"] != etag
+        assert updated.json()["entries"][0]["player"] == "tester"
+
+
+def test_leaderboard_window_and_difficulty_params(fastapi_app):
+    client = TestClient(fastapi_app)
+    with client:
+        fastapi_app.state.scoreboard.register_attempt("easy", Difficulty.MAKE, True)
+        fastapi_app.state.scoreboard.register_attempt("hard", Difficulty.MAKE_MODEL_YEAR, True)
+
+        weekly = client.get("/api/leaderboard", params={"window": "week", "difficulty": "make"}).json()
+        assert [entry["player"] for entry in weekly["entries"]] == ["easy"]
+        assert client.get("/api/leaderboard", params={"window": "month"}).status_code == 422
+        assert client.get("/api/leaderboard", params={"difficulty": "expert"}).status_code == 400
+
+
+def test_images_are_served_from_every_root(monkeypatch, sample_data_dir, tmp_path):
+    extra = tmp_path / "scraped"
+    (extra / "2024-02-01").mkdir(parents=True)
+    (extra / "2024-02-01" / "Tesla_Model3_2022_40_18_Sedan_TSA.jpg").write_bytes(b"\xff\xd8\xff\xd9")
+    monkeypatch.setenv("CAR_PICKER_EXTRA_DATA_DIRS", f'["{extra}"]')
+    from car_picker.app.main import create_app
+
+    app = create_app()
+    with TestClient(app) as client:
+        relative_paths = {entry.relative_path for entry in app.state.dataset.entries}
+        nested = "scraped/2024-02-01/Tesla_Model3_2022_40_18_Sedan_TSA.jpg"
+        assert nested in relative_paths
+        assert f"{sample_data_dir.name}/Kia_Morning_2017_40_18_200_20_4_70_55_180_30_FWD_5_4_Sedan_KIA.jpg" in relative_paths
+
+        assert client.get(f"/static/cars/{nested}").content == b"\xff\xd8\xff\xd9"
+        digest = next(entry.digest for entry in app.state.dataset.entries if entry.relative_path == nested)
+        assert digest == content_digest(extra / "2024-02-01" / "Tesla_Model3_2022_40_18_Sedan_TSA.jpg")
+        response = client.get(f"/api/images/{digest}/{nested}")
+        assert response.status_code == 200
+        assert response.content == b"\xff\xd8\xff\xd9"
+
+
+def test_question_filters(fastapi_app):
+    with TestClient(fastapi_app) as client:
+        for _ in range(5):
+            response = client.get("/api/question", params={"body": "sedan", "drive": "FWD", "year_from": 2019})
+            assert response.status_code == 200
+            assert int(response.json()["correct"]["year"]) >= 2019
+
+        batch = client.get("/api/questions", params={"year_from": 2020, "count": 5})
+        assert [question["correct"]["year"] for question in batch.json()["questions"]] in (
+            ["2020", "2021"],
+            ["2021", "2020"],
+        )
+        assert client.get("/api/question", params={"body": "SUV"}).status_code == 400
+
+
+def test_hard_distractor_mode(fastapi_app):
+    with TestClient(fastapi_app) as client:
+        response = client.get("/api/question", params={"difficulty": "make_model", "distractors": "hard"})
+        assert response.status_code == 200
+        assert len(response.json()["options"]) == 10
+
+        batch = client.get("/api/questions", params={"distractors": "hard", "count": 3})
+        assert len(batch.json()["questions"]) == 3
+        assert client.get("/api/question", params={"distractors": "easy"}).status_code == 400
+
+
+def test_sampling_policy_from_settings(monkeypatch, tmp_path):
+    weights = tmp_path / "weights.json"
+    makes = {make: 0 for make in ("Audi", "BMW", "Hyundai", "Kia", "Ford", "Toyota", "Honda", "Nissan", "Lexus")}
+    weights.write_text(json.dumps({"makes": makes}), encoding="utf-8")
+    monkeypatch.setenv("CAR_PICKER_SAMPLING_POLICY", "weights")
+    monkeypatch.setenv("CAR_PICKER_SAMPLING_WEIGHTS_PATH", str(weights))
+    from car_picker.app.main import create_app
+
+    with TestClient(create_app()) as client:
+        for _ in range(5):
+            response = client.get("/api/question", params={"difficulty": "make"})
+            assert response.json()["correct"]["make"] == "Mercedes-Benz"
+        # 가중치가 있는 항목이 하나뿐이라 나머지는 만들지 않는다.
+        batch = client.get("/api/questions", params={"difficulty": "make", "count": 3})
+        assert [question["correct"]["make"] for question in batch.json()["questions"]] == ["Mercedes-Benz"]
+
+
+def test_session_never_repeats_entries(fastapi_app):
+    with TestClient(fastapi_app) as client:
+        created = client.post("/api/sessions")
+        assert created.status_code == 201
+        session = created.json()["sessionId"]
+
+        images = [client.get("/api/question", params={"session": session}).json()["imageUrl"]]
+        batch = client.get("/api/questions", params={"session": session, "count": 20}).json()["questions"]
+        images += [question["imageUrl"] for question in batch]
+        assert len(images) == len(set(images)) == 13
+        assert client.get("/api/question", params={"session": session}).status_code == 400
+
+        assert client.delete(f"/api/sessions/{session}").status_code == 204
+        assert client.get("/api/question", params={"session": session}).status_code == 404
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from car_picker.app.images import HotBytesCache
+
+
+def test_hot_bytes_cache_evicts_least_recently_used():
+    cache = HotBytesCache(max_bytes=80)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"y" * 10)
+    assert cache.get("a") is not None
+    for index in range(7):
+        cache.put(f"c{index}", b"z" * 10)
+
+    assert cache.size <= 80
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    cache.put("huge", b"h" * 11)
+    assert cache.get("huge") is None
+
+
+def test_content_addressed_image_is_immutable(fastapi_app):
+    with TestClient(fastapi_app) as client:
+        question = client.get("/api/question", params={"difficulty": "make"}).json()
+        assert question["imageUrl"].startswith("/api/images/")
+
+        response = client.get(question["imageUrl"])
+        assert response.status_code == 200
+        assert response.content == b"\xff\xd8\xff"
+        assert "immutable" in response.headers["cache-control"]
+        etag = response.headers["etag"]
+
+        revalidated = client.get(question["imageUrl"], headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+
+        wrong_digest = question["imageUrl"].replace("/api/images/", "/api/images/0", 1)
+        assert client.get(wrong_digest).status_code == 404
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 import pytest
 
-from car_picker.app.indexer import CarDataset, parse_filename
+from car_picker.app import images
+from car_picker.app.indexer import CarDataset, EntryFilter, parse_filename
 
 
 def test_parse_filename_valid(tmp_path: Path):
@@ -32,3 +34,151 @@ def test_dataset_loads_entries(sample_data_dir: Path):
     assert len(dataset.entries) == len(list(sample_data_dir.glob("*.jpg")))
     assert dataset.by_make["Audi"]
     assert dataset.by_make["BMW"]
+
+
+def test_dataset_snapshot_roundtrip(sample_data_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    snapshot_path = tmp_path / "index.bin"
+    original = CarDataset(sample_data_dir, snapshot_path=snapshot_path)
+    assert snapshot_path.exists()
+
+    def _fail(stem: str, display_name: str):
+        raise AssertionError("스냅샷이 유효하면 파싱하지 않아야 합니다.")
+
+    monkeypatch.setattr("car_picker.app.indexer._parse_stem", _fail)
+    restored = CarDataset(sample_data_dir, snapshot_path=snapshot_path)
+    assert [entry.dict() for entry in restored.entries] == [entry.dict() for entry in original.entries]
+    assert all(entry.digest for entry in restored.entries)
+    assert set(restored.by_make) == set(original.by_make)
+
+
+def test_dataset_snapshot_stale_triggers_rescan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    data_dir = tmp_path / "cars"
+    data_dir.mkdir()
+    (data_dir / "Audi_A5_2013_40_Sedan_AAA.jpg").write_bytes(b"\xff\xd8\xff")
+    snapshot_path = tmp_path / "index.bin"
+    assert len(CarDataset(data_dir, snapshot_path=snapshot_path).entries) == 1
+
+    hashed = []
+    original_hash = images._hash_file
+    monkeypatch.setattr(images, "_hash_file", lambda path: hashed.append(path.name) or original_hash(path))
+    (data_dir / "BMW_X5_2016_40_SUV_BBB.jpg").write_bytes(b"\xff\xd8\xff")
+    dataset = CarDataset(data_dir, snapshot_path=snapshot_path)
+    assert {entry.make for entry in dataset.entries} == {"Audi", "BMW"}
+    assert hashed == ["BMW_X5_2016_40_SUV_BBB.jpg"]
+    assert all(entry.digest for entry in dataset.entries)
+
+
+def test_dataset_rehashes_file_overwritten_in_place(tmp_path: Path):
+    data_dir = tmp_path / "cars"
+    data_dir.mkdir()
+    image = data_dir / "Audi_A5_2013_40_Sedan_AAA.jpg"
+    image.write_bytes(b"\xff\xd8\xff")
+    snapshot_path = tmp_path / "index.bin"
+    before = CarDataset(data_dir, snapshot_path=snapshot_path).entries[0].digest
+
+    stat = data_dir.stat()
+    image.write_bytes(b"\xff\xd8\xff\xe0")
+    os.utime(data_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    after = CarDataset(data_dir, snapshot_path=snapshot_path).entries[0].digest
+    assert after != before
+    assert after == images.content_digest(image)
+
+
+def test_dataset_from_names_interns_vocabulary(tmp_path: Path):
+    names = [
+        "Audi_A5_2013_40_Sedan_AAA.jpg",
+        "Audi_A5_2014_40_Sedan_AAB.jpg",
+        "BMW_X5_2016_40_SUV_BBB.jpg",
+        "broken.jpg",
+    ]
+    dataset = CarDataset.from_names(tmp_path, names)
+
+    assert len(dataset) == 3
+    assert dataset.unique_makes == ["Audi", "BMW"]
+    assert len(dataset.columns.makes) == 2
+    assert list(dataset.rows_by_make_model("Audi", "A5")) == [0, 1]
+    entry = dataset.get_entries_by_make("BMW")[0]
+    assert entry == parse_filename(tmp_path / "BMW_X5_2016_40_SUV_BBB.jpg")
+    assert dataset.resolve_path(entry) == tmp_path / "BMW_X5_2016_40_SUV_BBB.jpg"
+
+
+def _touch(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\xff\xd8\xff")
+
+
+def test_dataset_merges_nested_roots(tmp_path: Path):
+    first, second = tmp_path / "volA", tmp_path / "volB"
+    _touch(first / "2024-01-05" / "Audi_A5_2013_40_Sedan_AAA.jpg")
+    _touch(first / "2024-01-06" / "deep" / "BMW_X5_2016_40_SUV_BBB.jpg")
+    _touch(second / "Kia_Morning_2017_40_Hatch_KIA.jpg")
+    _touch(second / ".cache" / "Ford_Focus_2015_40_Sedan_FOA.jpg")
+
+    snapshot_path = tmp_path / "index.bin"
+    dataset = CarDataset([first, second], snapshot_path=snapshot_path, scan_workers=2)
+    paths = sorted(entry.relative_path for entry in dataset.entries)
+    assert paths == [
+        "volA/2024-01-05/Audi_A5_2013_40_Sedan_AAA.jpg",
+        "volA/2024-01-06/deep/BMW_X5_2016_40_SUV_BBB.jpg",
+        "volB/Kia_Morning_2017_40_Hatch_KIA.jpg",
+    ]
+    assert dataset.roots.source_path(paths[1]) == (first / "2024-01-06" / "deep" / "BMW_X5_2016_40_SUV_BBB.jpg").resolve()
+    assert dataset.roots.source_path("volA/../volB/Kia_Morning_2017_40_Hatch_KIA.jpg") is None
+
+    restored = CarDataset([first, second], snapshot_path=snapshot_path)
+    assert [entry.dict() for entry in restored.entries] == [entry.dict() for entry in dataset.entries]
+
+    # 하위 디렉터리에 파일이 추가되면 루트의 mtime은 그대로여도 스냅샷이 오래된 것으로 판정된다.
+    _touch(first / "2024-01-05" / "Hyundai_Sonata_2018_40_Sedan_HYA.jpg")
+    assert len(CarDataset([first, second], snapshot_path=snapshot_path)) == 4
+
+
+def test_spec_fields_are_parsed_into_columns(tmp_path: Path):
+    dataset = CarDataset.from_names(
+        tmp_path,
+        [
+            "Audi_A5_2013_40_18_200_20_4_70_55_180_30_AWD_5_2_Coupe_AAA.jpg",
+            "Audi_Q5_2016_45_19_250_nan_4_75_65_183_24_nan_5_4_SUV_AAB.jpg",
+            "BMW_X5_2016_40_SUV_BBB.jpg",
+            "Ferrari_SF90_2021_507300_20_986_40_8_79_47_185_17_AWD_2_2_Coupe_FFF.jpg",
+            "Ferrari_SF90_2022_99999999999_20_986_40_8_79_47_185_17_AWD_2_2_Coupe_FFG.jpg",
+        ],
+    )
+    first, second, short, pricey, overflow = dataset.rows
+    assert dataset.spec_of(first, "horsepower") == 200
+    assert dataset.spec_of(first, "displacement") == 20
+    assert dataset.spec_of(first, "doors") == 2
+    assert dataset.category_of(first, "drivetrain") == "AWD"
+    assert dataset.category_of(first, "body") == "Coupe"
+    assert dataset.spec_of(second, "displacement") == 0
+    assert dataset.category_of(second, "drivetrain") == ""
+    assert dataset.category_of(short, "body") == ""
+    # 16비트를 넘는 값도 그대로 보관하고, 열 범위를 넘는 값만 값 없음으로 둔다.
+    assert dataset.spec_of(pricey, "msrp") == 507300
+    assert dataset.spec_of(overflow, "msrp") == 0
+    assert dataset.spec_of(overflow, "horsepower") == 986
+    assert dataset.category_counts("body") == {"Coupe": 3, "SUV": 1}
+
+
+def test_filtered_rows_intersect_indexes(tmp_path: Path):
+    names = [
+        "Audi_A4_2013_40_18_200_20_4_70_55_180_30_AWD_5_4_Sedan_A01.jpg",
+        "Audi_A4_2017_40_18_200_20_4_70_55_180_30_AWD_5_4_Sedan_A02.jpg",
+        "Audi_A4_2018_40_18_200_20_4_70_55_180_30_FWD_5_4_Sedan_A03.jpg",
+        "Audi_Q5_2019_45_19_250_20_4_75_65_183_24_AWD_5_4_SUV_A04.jpg",
+        "BMW_X5_2016_40_SUV_BBB.jpg",
+    ]
+    dataset = CarDataset.from_names(tmp_path, names)
+
+    def ids(entry_filter):
+        return [dataset.id_of(row)[-3:] for row in dataset.filtered_rows(entry_filter)]
+
+    assert ids(EntryFilter(body="sedan", drivetrain="AWD")) == ["A01", "A02"]
+    assert ids(EntryFilter(body="Sedan", drivetrain="AWD", year_from=2015)) == ["A02"]
+    assert ids(EntryFilter(year_from=2018)) == ["A03", "A04"]
+    assert ids(EntryFilter(body="Wagon")) == []
+    assert dataset.filtered_rows(EntryFilter()) is dataset.rows
+
+    # 행이 바뀐 새 버전은 자기 인덱스로 다시 계산한다.
+    removed = dataset.apply_delta([], {"Audi_A4_2017_40_18_200_20_4_70_55_180_30_AWD_5_4_Sedan_A02.jpg"})
+    assert [removed.id_of(row)[-3:] for row in removed.filtered_rows(EntryFilter(drivetrain="awd"))] == ["A01", "A04"]
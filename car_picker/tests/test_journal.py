@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+
+from car_picker.app.journal import ScoreJournal
+from car_picker.app.models import Difficulty, LeaderboardWindow
+from car_picker.app.score import ScoreBoard
+
+
+def _play(board: ScoreBoard) -> None:
+    board.register_attempt("alice", Difficulty.MAKE, True)
+    board.register_attempt("alice", Difficulty.MAKE_MODEL, True)
+    board.register_attempt("bob", Difficulty.MAKE_MODEL_YEAR, False)
+
+
+def test_scores_survive_restart_from_journal_tail(tmp_path):
+    journal = ScoreJournal(tmp_path, flush_interval_seconds=60)
+    board = ScoreBoard(journal=journal)
+    _play(board)
+    journal.flush()
+
+    restored = ScoreBoard(journal=ScoreJournal(tmp_path))
+    assert restored.top_entries() == board.top_entries()
+    assert restored.top_entries(difficulty=Difficulty.MAKE) == board.top_entries(difficulty=Difficulty.MAKE)
+    assert restored.register_attempt("alice", Difficulty.MAKE, True).streak == 3
+
+
+def test_compaction_replaces_old_segments_with_snapshot(tmp_path):
+    journal = ScoreJournal(tmp_path, flush_interval_seconds=60)
+    board = ScoreBoard(journal=journal)
+    _play(board)
+    journal.compact()
+    board.register_attempt("carol", Difficulty.MAKE, True)
+    board.reset()
+    board.register_attempt("dave", Difficulty.MAKE, True)
+    journal.flush()
+
+    assert [path.name for path in sorted(tmp_path.glob("journal-*.log"))] == [journal.segment_path(2).name]
+    restored = ScoreBoard(journal=ScoreJournal(tmp_path))
+    assert [entry.player for entry in restored.top_entries()] == ["dave"]
+    assert [entry.player for entry in restored.top_entries(LeaderboardWindow.DAY)] == ["dave"]
+
+
+def test_truncated_tail_is_ignored(tmp_path):
+    journal = ScoreJournal(tmp_path, flush_interval_seconds=60)
+    board = ScoreBoard(journal=journal)
+    _play(board)
+    journal.stop()
+    with open(journal.segment_path(2), "ab") as handle:
+        handle.write(b"\x00\x05\x00ev")
+
+    restored = ScoreBoard(journal=ScoreJournal(tmp_path))
+    assert restored.top_entries() == board.top_entries()
+
+
+def test_unencodable_player_leaves_scores_untouched(tmp_path):
+    board = ScoreBoard(journal=ScoreJournal(tmp_path, flush_interval_seconds=60))
+    with pytest.raises(ValueError, match="플레이어 이름"):
+        board.register_attempt("가" * 30000, Difficulty.MAKE, True)
+    assert board.top_entries() == []
+    assert board.top_entries(LeaderboardWindow.DAY) == []
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+
+from fastapi.testclient import TestClient
+
+from car_picker.app import main as app_main
+from car_picker.app.indexer import CarDataset
+from car_picker.app.loader import DatasetLoader
+from car_picker.app.main import create_app
+from car_picker.app.models import Difficulty, QuizOption
+
+
+def test_question_routes_return_503_until_dataset_ready(monkeypatch):
+    monkeypatch.setenv("CAR_PICKER_DATASET_STARTUP_WAIT_SECONDS", "0")
+    release = threading.Event()
+
+    def slow_dataset(*args, **kwargs):
+        kwargs["progress"]("parsing", 0, 13)
+        release.wait(5)
+        return CarDataset(*args, **kwargs)
+
+    monkeypatch.setattr(app_main, "CarDataset", slow_dataset)
+    app = create_app()
+    with TestClient(app) as client:
+        assert client.get("/healthz").status_code == 200
+        not_ready = client.get("/readyz")
+        assert not_ready.status_code == 503
+        assert not_ready.json()["state"] == "loading"
+        assert not_ready.json()["phase"] == "parsing"
+
+        response = client.get("/api/question", params={"difficulty": "make"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "2"
+        # 리더보드와 채점은 데이터셋 없이도 응답한다.
+        assert client.get("/api/leaderboard").status_code == 200
+        option = QuizOption(make="Audi", label="Audi")
+        issued = app.state.question_store.issue(Difficulty.MAKE, option)
+        answer = client.post(
+            "/api/answer",
+            json={"qid": issued.qid, "difficulty": "make", "answer": option.dict(), "player": "early"},
+        )
+        assert answer.status_code == 200
+        assert answer.json()["correct"] is True
+        assert answer.json()["correctAnswer"]["label"] == "Audi"
+
+        release.set()
+        assert app.state.dataset_loader.wait(5)
+        ready = client.get("/readyz")
+        assert ready.status_code == 200
+        assert ready.json()["total"] == 13
+        assert client.get("/api/question", params={"difficulty": "make"}).status_code == 200
+
+
+def test_loader_reports_failure(sample_data_dir):
+    def broken(progress):
+        raise OSError("disk gone")
+
+    loader = DatasetLoader(broken, on_ready=lambda dataset: None)
+    loader.start()
+    assert loader.wait(5) is False
+    progress = loader.progress()
+    assert progress["state"] == "failed"
+    assert progress["error"] == "disk gone"
+
+
+def test_stopped_loader_does_not_publish_dataset(sample_data_dir):
+    release = threading.Event()
+    published = []
+
+    def build(progress):
+        release.wait(5)
+        return CarDataset(sample_data_dir)
+
+    loader = DatasetLoader(build, on_ready=published.append)
+    loader.start()
+    loader.stop(timeout=0)
+    release.set()
+    loader.wait(5)
+    assert published == []
+    assert not loader.ready
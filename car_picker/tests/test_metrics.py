@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from car_picker.app.metrics import MetricsRegistry
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    requests = registry.counter("demo_requests", "Demo requests.", ("status",))
+    latency.observe(0.05, ("/a",))
+    latency.observe(0.5, ("/a",))
+    requests.inc(("200",))
+    requests.inc(("200",))
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{route="/a"} 2' in text
+    assert 'demo_requests_total{status="200"} 2' in text
+
+
+def test_metrics_endpoint_reports_routes_and_hot_paths(fastapi_app):
+    with TestClient(fastapi_app) as client:
+        question = client.get("/api/question", params={"difficulty": "make"}).json()
+        client.post("/api/answer", json={"qid": "missing", "difficulty": "make", "answer": question["correct"]})
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert 'car_picker_http_requests_total{method="GET",route="/api/question",status="200"}' in text
+        assert 'car_picker_http_requests_total{method="POST",route="/api/answer",status="404"}' in text
+        assert 'car_picker_question_store{stat="misses"}' in text
+        assert "car_picker_build_question_seconds_bucket" in text
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+
+from car_picker.app.models import AnswerResponse, Difficulty, PlayerScore, QuestionPayload, QuizOption
+from car_picker.app.payloads import encode_answer, encode_option, encode_question
+
+CORRECT = QuizOption(make="Hyundai", model="Sonata", year="2018", label="Hyundai Sonata 2018")
+OTHER = QuizOption(make="Kia", label="Kia \"모닝\"")
+
+
+def test_encoded_question_matches_pydantic_serialization():
+    body = encode_question(
+        qid="abc",
+        difficulty=Difficulty.MAKE_MODEL_YEAR,
+        image_url="/api/images/d/x.jpg",
+        image_srcset="/api/thumbnails/320/d/x.jpg 320w",
+        prompt="Guess the vehicle information.",
+        correct=encode_option(CORRECT),
+        options=[encode_option(CORRECT), encode_option(OTHER)],
+        timeout=20,
+    )
+    expected = QuestionPayload(
+        qid="abc",
+        difficulty=Difficulty.MAKE_MODEL_YEAR,
+        imageUrl="/api/images/d/x.jpg",
+        imageSrcset="/api/thumbnails/320/d/x.jpg 320w",
+        prompt="Guess the vehicle information.",
+        correct=CORRECT,
+        options=[CORRECT, OTHER],
+        timeout=20,
+    )
+    assert json.loads(body) == json.loads(expected.json(by_alias=True))
+
+
+def test_encoded_answer_matches_pydantic_serialization():
+    score = PlayerScore(player="테스터", points=10, streak=1, total_correct=1, total_attempts=1)
+    for player_score in (score, None):
+        body = encode_answer(True, encode_option(OTHER), "Correct.", player_score)
+        expected = AnswerResponse(correct=True, correctAnswer=OTHER, message="Correct.", score=player_score)
+        assert json.loads(body) == json.loads(expected.json(by_alias=True))
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from car_picker.app.indexer import CarDataset
+from car_picker.app.models import Difficulty
+from car_picker.app.prefetch import QuestionPrefetcher
+
+
+def test_prefetcher_fills_and_honors_exclusions(sample_data_dir):
+    dataset = CarDataset(sample_data_dir)
+    prefetcher = QuestionPrefetcher(lambda: dataset, low_watermark=2, high_watermark=6)
+    prefetcher.fill()
+    assert prefetcher.size(Difficulty.MAKE) == 6
+
+    all_ids = {entry.id for entry in dataset.entries}
+    assert prefetcher.pop(dataset, Difficulty.MAKE, all_ids) is None
+
+    pooled = prefetcher.pop(dataset, Difficulty.MAKE, set())
+    assert pooled is not None
+    assert len(pooled.options) == 10
+    assert prefetcher.size(Difficulty.MAKE) == 5
+
+
+def test_prefetcher_discards_questions_from_old_dataset(sample_data_dir):
+    dataset = CarDataset(sample_data_dir)
+    prefetcher = QuestionPrefetcher(lambda: dataset, low_watermark=1, high_watermark=3)
+    prefetcher.fill()
+
+    updated = dataset.apply_delta([], set())
+    assert prefetcher.pop(updated, Difficulty.MAKE_MODEL, set()) is None
+    assert prefetcher.size(Difficulty.MAKE_MODEL) == 0
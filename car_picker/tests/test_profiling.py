@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+
+from fastapi.testclient import TestClient
+
+from car_picker.app.main import create_app
+
+
+def test_trigger_header_profiles_only_marked_requests(monkeypatch, tmp_path):
+    monkeypatch.setenv("CAR_PICKER_PROFILE_TRIGGER_HEADER", "X-Profile")
+    monkeypatch.setenv("CAR_PICKER_PROFILE_OUTPUT_DIR", str(tmp_path))
+    app = create_app()
+    with TestClient(app) as client:
+        client.get("/api/leaderboard")
+        assert client.get("/api/question", params={"difficulty": "make"}, headers={"X-Profile": "1"}).status_code == 200
+        client.get("/api/question", params={"difficulty": "make"}, headers={"X-Profile": "1"})
+
+    assert [path.name for path in tmp_path.iterdir()] == ["GET_api_question.pstats"]
+    stats = pstats.Stats(str(tmp_path / "GET_api_question.pstats"))
+    profiled = {function for (_, _, function) in stats.stats}
+    assert "get_question" in profiled
+
+
+def test_busy_or_failing_profiler_skips_profiling(monkeypatch, tmp_path):
+    monkeypatch.setenv("CAR_PICKER_PROFILE_TRIGGER_HEADER", "X-Profile")
+    monkeypatch.setenv("CAR_PICKER_PROFILE_OUTPUT_DIR", str(tmp_path))
+    app = create_app()
+    with TestClient(app) as client:
+        profiler = app.state.profiler
+        # 다른 요청이 기록 중이면 기다리지 않고 프로파일 없이 처리한다.
+        with profiler._active:
+            response = client.get("/api/question", params={"difficulty": "make"}, headers={"X-Profile": "1"})
+            assert response.status_code == 200
+
+        def _busy(self):
+            raise ValueError("Another profiling tool is already active")
+
+        monkeypatch.setattr(cProfile.Profile, "enable", _busy)
+        response = client.get("/api/question", params={"difficulty": "make"}, headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        assert not profiler._active.locked()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiler_not_installed_by_default(fastapi_app):
+    assert not hasattr(fastapi_app.state, "profiler")
+    assert all(type(middleware.cls).__name__ != "ProfilingMiddleware" for middleware in fastapi_app.user_middleware)
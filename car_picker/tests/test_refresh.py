@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+from car_picker.app.images import content_digest
+from car_picker.app.indexer import CarDataset
+from car_picker.app import refresh
+from car_picker.app.refresh import DatasetRefresher
+
+
+def _touch(directory: Path, name: str) -> None:
+    (directory / name).write_bytes(b"\xff\xd8\xff")
+
+
+def test_refresh_applies_delta_and_keeps_old_version(tmp_path: Path):
+    _touch(tmp_path, "Audi_A5_2013_40_Sedan_AAA.jpg")
+    _touch(tmp_path, "Audi_A4_2014_40_Sedan_AAB.jpg")
+    dataset = CarDataset(tmp_path)
+    swapped = []
+    refresher = DatasetRefresher(dataset, on_swap=swapped.append)
+
+    _touch(tmp_path, "BMW_X5_2016_40_SUV_BBB.jpg")
+    (tmp_path / "Audi_A4_2014_40_Sedan_AAB.jpg").unlink()
+    assert refresher.refresh_now() is True
+
+    updated = swapped[-1]
+    assert updated is refresher.current
+    assert updated.version == dataset.version + 1
+    assert sorted(entry.id for entry in updated.entries) == [
+        "Audi_A5_2013_40_Sedan_AAA",
+        "BMW_X5_2016_40_SUV_BBB",
+    ]
+    assert updated.get_entries_by_make_model("Audi", "A4") == []
+    assert [entry.model for entry in updated.get_entries_by_make("Audi")] == ["A5"]
+    bmw = updated.get_entries_by_make("BMW")[0]
+    assert bmw.digest == content_digest(tmp_path / "BMW_X5_2016_40_SUV_BBB.jpg")
+
+    assert len(dataset.entries) == 2
+    assert len(dataset.get_entries_by_make("Audi")) == 2
+    assert dataset.get_entries_by_make("BMW") == []
+
+
+def test_refresh_without_changes_keeps_version(tmp_path: Path):
+    _touch(tmp_path, "Audi_A5_2013_40_Sedan_AAA.jpg")
+    dataset = CarDataset(tmp_path)
+    refresher = DatasetRefresher(dataset, on_swap=lambda updated: None)
+
+    assert refresher.refresh_now() is False
+    assert refresher.current is dataset
+
+
+def test_refresh_starts_from_initial_scan_and_ignores_unparseable_files(tmp_path: Path, monkeypatch):
+    _touch(tmp_path, "Audi_A5_2013_40_Sedan_AAA.jpg")
+    _touch(tmp_path, "broken.jpg")
+    dataset = CarDataset(tmp_path)
+    refresher = DatasetRefresher(dataset, on_swap=lambda updated: None)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("바뀐 디렉터리가 없으면 다시 스캔하지 않아야 합니다.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("car_picker.app.refresh.scan_roots", _fail)
+        assert refresher.refresh_now() is False
+
+    _touch(tmp_path, "notes_2.jpg")
+    (tmp_path / "broken.jpg").unlink()
+    assert refresher.refresh_now() is False
+    assert refresher.current is dataset
+
+
+def test_refresh_detects_changes_in_nested_directories(tmp_path: Path):
+    nested = tmp_path / "2024" / "01"
+    nested.mkdir(parents=True)
+    _touch(nested, "Audi_A5_2013_40_Sedan_AAA.jpg")
+    dataset = CarDataset(tmp_path)
+    refresher = DatasetRefresher(dataset, on_swap=lambda updated: None)
+    assert refresher.refresh_now() is False
+
+    _touch(nested, "BMW_X5_2016_40_SUV_BBB.jpg")
+    (nested / "Audi_A5_2013_40_Sedan_AAA.jpg").unlink()
+    assert refresher.refresh_now() is True
+    assert [entry.relative_path for entry in refresher.current.entries] == ["2024/01/BMW_X5_2016_40_SUV_BBB.jpg"]
+    assert refresher.refresh_now() is False
+
+
+def test_refresh_lists_only_changed_directories(tmp_path: Path, monkeypatch):
+    first, second = tmp_path / "first", tmp_path / "second"
+    for root in (first / "2024-01", first / "2024-02", second / "old"):
+        root.mkdir(parents=True)
+    _touch(first / "2024-01", "Audi_A5_2013_40_Sedan_AAA.jpg")
+    _touch(first / "2024-02", "Audi_A4_2014_40_Sedan_AAB.jpg")
+    _touch(second / "old", "Kia_Rio_2017_40_Sedan_KKK.jpg")
+    dataset = CarDataset([first, second])
+    refresher = DatasetRefresher(dataset, on_swap=lambda updated: None)
+
+    listed = []
+    list_directory = refresh.list_directory
+
+    def _recording(directory, prefix):
+        listed.append(Path(directory).relative_to(tmp_path).as_posix())
+        return list_directory(directory, prefix)
+
+    monkeypatch.setattr(refresh, "list_directory", _recording)
+    monkeypatch.setattr(refresh, "scan_roots", None)
+
+    _touch(first / "2024-02", "BMW_X5_2016_40_SUV_BBB.jpg")
+    assert refresher.refresh_now() is True
+    assert listed == ["first/2024-02"]
+
+    (second / "new" / "deep").mkdir(parents=True)
+    _touch(second / "new" / "deep", "BMW_X3_2018_40_SUV_BBC.jpg")
+    shutil.rmtree(second / "old")
+    listed.clear()
+    assert refresher.refresh_now() is True
+    assert listed == ["second"]
+    assert sorted(entry.relative_path for entry in refresher.current.entries) == [
+        "first/2024-01/Audi_A5_2013_40_Sedan_AAA.jpg",
+        "first/2024-02/Audi_A4_2014_40_Sedan_AAB.jpg",
+        "first/2024-02/BMW_X5_2016_40_SUV_BBB.jpg",
+        "second/new/deep/BMW_X3_2018_40_SUV_BBC.jpg",
+    ]
+
+    _touch(second / "new" / "deep", "BMW_X1_2019_40_SUV_BBD.jpg")
+    listed.clear()
+    assert refresher.refresh_now() is True
+    assert listed == ["second/new/deep"]
+    assert refresher.refresh_now() is False
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from car_picker.app.indexer import CarDataset
-from car_picker.app.models import Difficulty
-from car_picker.app.sampler import build_question
+import pytest
+
+from car_picker.app.distractors import DistractorPools
+from car_picker.app.indexer import CarDataset, parse_relative_path
+from car_picker.app.models import Difficulty, DistractorMode
+from car_picker.app.sampler import _generate_options, build_question, pick_row
 
 
 def test_build_question_make(sample_data_dir):
@@ -21,3 +24,129 @@ def test_build_question_make_model_year(sample_data_dir):
 
     assert len(options) == 10
     assert any(option.label == correct.label for option in options)
+
+
+def test_pick_row_respects_exclusions(sample_data_dir):
+    dataset = CarDataset(sample_data_dir)
+    ids = [dataset.id_of(row) for row in dataset.rows]
+    keep = ids[3]
+
+    for _ in range(20):
+        row = pick_row(dataset, set(ids) - {keep})
+        assert dataset.id_of(row) == keep
+
+
+def test_build_question_all_excluded(sample_data_dir):
+    dataset = CarDataset(sample_data_dir)
+    exclude_ids = {entry.id for entry in dataset.entries}
+
+    with pytest.raises(ValueError):
+        build_question(dataset, Difficulty.MAKE, exclude_ids)
+
+
+def test_build_question_fails_fast_when_pool_too_small(tmp_path, monkeypatch):
+    dataset = CarDataset.from_names(
+        tmp_path,
+        ["Audi_A5_2013_40_Sedan_AAA.jpg", "BMW_X5_2016_40_SUV_BBB.jpg"],
+    )
+    monkeypatch.setattr("car_picker.app.sampler.sample_into", None)
+
+    with pytest.raises(ValueError, match="충분한 보기"):
+        build_question(dataset, Difficulty.MAKE)
+
+
+def test_make_model_year_prefers_same_model_variants(sample_data_dir):
+    dataset = CarDataset(sample_data_dir)
+    entry = next(entry for entry in dataset.entries if entry.model == "A5")
+    pools = dataset.distractor_pools
+
+    first_tier = next(pools.tiers(entry, Difficulty.MAKE_MODEL_YEAR))
+    assert sorted(option.label for option in first_tier) == ["Audi A5 2013", "Audi A5 2014"]
+
+
+def _spec_name(make: str, model: str, year: int, horsepower: int, length: int, body: str, suffix: str) -> str:
+    return f"{make}_{model}_{year}_45_19_{horsepower}_20_4_75_65_{length}_24_AWD_5_4_{body}_{suffix}.jpg"
+
+
+@pytest.fixture
+def look_alike_dataset(tmp_path):
+    names = [
+        _spec_name("Audi", "Q5", 2017, 260, 183, "SUV", "Q01"),
+        _spec_name("BMW", "X3", 2012, 250, 185, "SUV", "X01"),
+        _spec_name("BMW", "X3", 2016, 250, 185, "SUV", "X02"),
+        _spec_name("BMW", "X3", 2020, 250, 185, "SUV", "X03"),
+        _spec_name("Mercedes-Benz", "GLC", 2018, 255, 184, "SUV", "G01"),
+    ]
+    names += [
+        _spec_name(f"Make{index:02d}", "Truck", 2015, 120 + index * 40, 200 + index * 5, "Pickup", f"T{index:02d}")
+        for index in range(30)
+    ]
+    return CarDataset.from_names(tmp_path, names)
+
+
+def test_hard_mode_uses_nearest_models(look_alike_dataset):
+    dataset = look_alike_dataset
+    pools = dataset.distractor_pools
+    entry = next(entry for entry in dataset.entries if entry.model == "Q5")
+
+    similar = pools.similar(entry, Difficulty.MAKE_MODEL)
+    assert {option.label for option in similar[:2]} == {"BMW X3", "Mercedes-Benz GLC"}
+    assert [option.label for option in pools.similar(entry, Difficulty.MAKE)][:2] in (
+        ["BMW", "Mercedes-Benz"],
+        ["Mercedes-Benz", "BMW"],
+    )
+    # 이웃 모델마다 정답 연식(2017)과 가장 가까운 연식을 고른다.
+    years = {option.label for option in pools.similar(entry, Difficulty.MAKE_MODEL_YEAR)[:2]}
+    assert years == {"BMW X3 2016", "Mercedes-Benz GLC 2018"}
+
+    similar_labels = {option.label for option in similar}
+    correct = pools.option_for(entry, Difficulty.MAKE_MODEL)
+    for _ in range(20):
+        options = _generate_options(dataset, entry, Difficulty.MAKE_MODEL, DistractorMode.HARD)
+        labels = {option.label for option in options}
+        assert len(labels) == 10
+        assert correct.label in labels
+        assert labels - {correct.label} <= similar_labels
+
+
+def test_neighbor_table_reused_when_specs_unchanged(look_alike_dataset):
+    dataset = look_alike_dataset
+    added = parse_relative_path(_spec_name("BMW", "X3", 2021, 250, 185, "SUV", "X04"))
+    updated = dataset.apply_delta([added], set())
+    assert updated.distractor_pools._neighbors is dataset.distractor_pools._neighbors
+
+    added = parse_relative_path(_spec_name("Kia", "Sorento", 2021, 240, 188, "SUV", "K01"))
+    updated = updated.apply_delta([added], set())
+    assert updated.distractor_pools._neighbors is not dataset.distractor_pools._neighbors
+    entry = next(entry for entry in updated.entries if entry.model == "Sorento")
+    assert updated.distractor_pools.similar(entry, Difficulty.MAKE_MODEL)[0].label in ("BMW X3", "Mercedes-Benz GLC", "Audi Q5")
+
+
+def _pool_labels(pools: DistractorPools):
+    by_make = {
+        difficulty: {make: sorted(option.label for option in options) for make, options in groups.items()}
+        for difficulty, groups in pools._by_make.items()
+    }
+    by_model = {key: [option.label for option in options] for key, options in pools._by_make_model.items()}
+    return {difficulty: sorted(pools._options[difficulty]) for difficulty in Difficulty}, by_make, by_model
+
+
+def test_updated_pools_match_full_build(look_alike_dataset):
+    dataset = look_alike_dataset
+    added = [
+        parse_relative_path(_spec_name("BMW", "X3", 2024, 250, 185, "SUV", "X05")),
+        parse_relative_path(_spec_name("Kia", "Sorento", 2021, 240, 188, "SUV", "K01")),
+    ]
+    removed = {
+        _spec_name("Audi", "Q5", 2017, 260, 183, "SUV", "Q01"),
+        _spec_name("BMW", "X3", 2012, 250, 185, "SUV", "X01"),
+    }
+    updated = dataset.apply_delta(added, removed)
+
+    assert _pool_labels(updated.distractor_pools) == _pool_labels(DistractorPools.build(updated))
+    assert _pool_labels(dataset.distractor_pools) == _pool_labels(DistractorPools.build(dataset))
+    neighbors = updated.distractor_pools._neighbors
+    assert ("Audi", "Q5") not in neighbors
+    assert all(("Audi", "Q5") not in near for near in neighbors.values())
+    assert neighbors[("Kia", "Sorento")][0] in {("BMW", "X3"), ("Mercedes-Benz", "GLC")}
+    assert ("Kia", "Sorento") in neighbors[("BMW", "X3")][:2]
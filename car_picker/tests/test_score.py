@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import random
+import threading
+
+from car_picker.app.models import Difficulty, LeaderboardWindow
+from car_picker.app.score import SECONDS_PER_DAY, ScoreBoard
+
+
+def _full_sort(board: ScoreBoard, limit: int):
+    records = sorted(board._records.values(), key=lambda record: (record.points, record.accuracy), reverse=True)
+    return [(record.player, record.points) for record in records[:limit]]
+
+
+def test_incremental_top_matches_full_sort():
+    rng = random.Random(7)
+    board = ScoreBoard(max_entries=3, lock_stripes=4)
+    difficulties = list(Difficulty)
+    for step in range(2000):
+        board.register_attempt(f"p{rng.randrange(40)}", rng.choice(difficulties), rng.random() < 0.6)
+        if step % 50 == 0:
+            top = [(entry.player, entry.points) for entry in board.top_entries()]
+            assert [points for _, points in top] == [points for _, points in _full_sort(board, 3)]
+
+
+def test_version_skips_players_outside_candidates():
+    board = ScoreBoard(max_entries=1)
+    board.register_attempt("a", Difficulty.MAKE_MODEL_YEAR, True)
+    board.register_attempt("b", Difficulty.MAKE_MODEL_YEAR, True)
+    board.register_attempt("c", Difficulty.MAKE_MODEL_YEAR, True)
+    version = board.version
+
+    board.register_attempt("d", Difficulty.MAKE, False)
+    assert board.version == version
+    board.reset()
+    assert board.version > version
+    assert board.top_entries() == []
+
+
+def test_attempt_outside_candidates_skips_top_lock():
+    board = ScoreBoard(max_entries=1)
+    for player in "abc":
+        board.register_attempt(player, Difficulty.MAKE_MODEL_YEAR, True)
+
+    with board._top_lock:
+        worker = threading.Thread(target=board.register_attempt, args=("d", Difficulty.MAKE, False))
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+
+
+def test_windowed_and_per_difficulty_boards_drop_expired_days():
+    now = [10 * SECONDS_PER_DAY]
+    board = ScoreBoard(max_entries=5, lock_stripes=1, clock=lambda: now[0])
+    board.register_attempt("old", Difficulty.MAKE_MODEL_YEAR, True)
+    now[0] += 3 * SECONDS_PER_DAY
+    board.register_attempt("recent", Difficulty.MAKE, True)
+    board.register_attempt("recent", Difficulty.MAKE, False)
+
+    assert [entry.player for entry in board.top_entries(LeaderboardWindow.DAY)] == ["recent"]
+    assert [entry.player for entry in board.top_entries(LeaderboardWindow.WEEK)] == ["old", "recent"]
+    assert board.top_entries(LeaderboardWindow.WEEK)[1].accuracy == 0.5
+    assert [entry.player for entry in board.top_entries(difficulty=Difficulty.MAKE)] == ["recent"]
+
+    now[0] += 5 * SECONDS_PER_DAY
+    board.register_attempt("new", Difficulty.MAKE, True)
+    assert [entry.player for entry in board.top_entries(LeaderboardWindow.WEEK)] == ["new", "recent"]
+    assert all(key[0] != 10 for key in board._buckets[0])
+    assert [entry.player for entry in board.top_entries()] == ["old", "new", "recent"]
+
+
+def test_view_version_changes_only_when_its_top_can_change():
+    board = ScoreBoard(max_entries=1)
+    board.register_attempt("a", Difficulty.MAKE, True)
+    board.register_attempt("a", Difficulty.MAKE, True)
+    view = (LeaderboardWindow.DAY, Difficulty.MAKE)
+    assert [entry.player for entry in board.top_entries(*view)] == ["a"]
+    version = board.version_of(*view)
+
+    board.register_attempt("b", Difficulty.MAKE, True)
+    board.register_attempt("c", Difficulty.MAKE_MODEL, True)
+    assert board.version_of(*view) == version
+
+    board.register_attempt("b", Difficulty.MAKE, True)
+    assert board.version_of(*view) != version
+    leader = board.top_entries(*view)[0].player
+    version = board.version_of(*view)
+    board.register_attempt(leader, Difficulty.MAKE, False)
+    assert board.version_of(*view) != version
+
+
+def test_unchanged_view_version_means_unchanged_top():
+    rng = random.Random(11)
+    board = ScoreBoard(max_entries=3, lock_stripes=4)
+    views = [(window, level) for window in LeaderboardWindow for level in (None, *Difficulty)]
+    cached = {}
+    for _ in range(3000):
+        board.register_attempt(f"p{rng.randrange(30)}", rng.choice(list(Difficulty)), rng.random() < 0.6)
+        view = rng.choice(views)
+        version = board.version_of(*view)
+        entries = board.top_entries(*view)
+        if view in cached and cached[view][0] == version:
+            assert cached[view][1] == entries
+        cached[view] = (version, entries)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+
+from car_picker.app.indexer import CarDataset
+from car_picker.app.models import Difficulty
+from car_picker.app.sampler import build_questions, pick_row
+from car_picker.app.sessions import RowBitset, SessionStore
+
+
+def test_row_bitset_grows_and_counts():
+    seen = RowBitset(capacity=10)
+    assert seen.nbytes == 2
+    seen.add(3)
+    seen.add(3)
+    seen.add(100)
+
+    assert 3 in seen and 100 in seen
+    assert 4 not in seen and 1000 not in seen
+    assert len(seen) == 2
+    assert seen.nbytes == 13
+
+
+def test_row_bitset_add_is_serialized():
+    seen = RowBitset(capacity=8)
+    seen._lock.acquire()
+    adder = threading.Thread(target=seen.add, args=(3,))
+    adder.start()
+    adder.join(timeout=0.05)
+    # 다른 요청이 비트셋을 고치는 동안에는 기다린다.
+    assert adder.is_alive() and 3 not in seen
+    seen._lock.release()
+    adder.join()
+    assert 3 in seen and len(seen) == 1
+
+
+def test_try_add_claims_a_row_once():
+    seen = RowBitset(capacity=8)
+    assert seen.try_add(5) is True
+    assert seen.try_add(5) is False
+    assert len(seen) == 1
+
+
+def test_pick_row_skips_rows_claimed_by_another_request(sample_data_dir):
+    class RacingBitset(RowBitset):
+        # 조회 직후 다른 요청이 행을 차지한 상황처럼, 조회는 항상 비어 있다고 답한다.
+        def __contains__(self, row: int) -> bool:
+            return False
+
+    dataset = CarDataset(sample_data_dir)
+    rows = list(dataset.rows)
+    for _ in range(5):
+        seen = RacingBitset(len(dataset.columns))
+        for row in rows[1:]:
+            seen.add(row)
+        assert pick_row(dataset, set(), seen=seen) == rows[0]
+        assert len(seen) == len(rows)
+
+
+def test_session_store_expires_and_bounds_memory():
+    store = SessionStore(limit=3, ttl_seconds=60, max_bytes=250, sweep_interval_seconds=0)
+    old = store.create(capacity=800)
+    fresh = store.create(capacity=800)
+    fresh.last_access = old.last_access + 120
+
+    assert store.sweep(now=old.last_access + 90) == 1
+    assert store.get(old.sid) is None
+    assert store.get(fresh.sid) is fresh
+
+    # 비트셋이 늘어나 바이트 한도를 넘으면 가장 오래 쓰지 않은 세션부터 제거한다.
+    other = store.create(capacity=800)
+    fresh.seen.add(1599)
+    assert store.get(fresh.sid) is fresh
+    assert store.get(other.sid) is None
+    stats = store.stats()
+    assert stats["evicted"] == 1
+    assert stats["bytes_used"] == 200
+
+
+def test_build_questions_skip_seen_rows(sample_data_dir):
+    dataset = CarDataset(sample_data_dir)
+    seen = RowBitset(len(dataset.columns))
+
+    first = build_questions(dataset, Difficulty.MAKE, 8, seen=seen)
+    second = build_questions(dataset, Difficulty.MAKE, 8, seen=seen)
+
+    ids = [entry.id for entry, _, _ in first + second]
+    assert len(ids) == len(dataset) == len(set(ids))
+    assert len(seen) == len(dataset)
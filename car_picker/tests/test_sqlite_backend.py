@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import sqlite3
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from car_picker.app.main import create_app
+from car_picker.app.models import Difficulty, LeaderboardWindow, QuizOption
+from car_picker.app.score import ScoreBoard
+from car_picker.app.sqlite_backend import SQLiteDatabase, SQLiteQuestionStore, SQLiteScoreBoard
+
+OPTION = QuizOption(make="Audi", model="A5", year="2013", label="Audi A5 (2013)")
+
+
+def test_sqlite_store_resolves_once_across_connections(tmp_path):
+    database = SQLiteDatabase(tmp_path / "shared.sqlite3")
+    store = SQLiteQuestionStore(database, sweep_interval_seconds=0)
+    issued = store.issue_many([(Difficulty.MAKE_MODEL_YEAR, OPTION), (Difficulty.MAKE, OPTION)])
+
+    # 다른 워커 프로세스를 흉내 내어 별도 연결로 채점한다.
+    other = SQLiteQuestionStore(SQLiteDatabase(tmp_path / "shared.sqlite3"), sweep_interval_seconds=0)
+    resolved = other.resolve(issued[0].qid)
+    assert resolved is not None
+    assert resolved.difficulty is Difficulty.MAKE_MODEL_YEAR
+    assert resolved.correct.label == OPTION.label
+    assert store.resolve(issued[0].qid) is None
+    assert len(store) == 1
+
+
+def test_sqlite_issue_many_rolls_back_on_failure(tmp_path, monkeypatch):
+    store = SQLiteQuestionStore(SQLiteDatabase(tmp_path / "db.sqlite3"), sweep_interval_seconds=0)
+    # 세 번째 문제의 qid가 첫 번째와 겹쳐 배치 중간에 INSERT가 실패한다.
+    ids = iter([uuid.UUID(int=1), uuid.UUID(int=2), uuid.UUID(int=1)])
+    monkeypatch.setattr(uuid, "uuid4", lambda: next(ids))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        store.issue_many([(Difficulty.MAKE, OPTION)] * 3)
+    assert len(store) == 0
+
+    monkeypatch.undo()
+    store.issue_many([(Difficulty.MAKE, OPTION)] * 2)
+    assert len(store) == 2
+
+
+def test_sqlite_store_sweep_expires_and_trims(tmp_path):
+    store = SQLiteQuestionStore(SQLiteDatabase(tmp_path / "db.sqlite3"), limit=2, ttl_seconds=60, sweep_interval_seconds=0)
+    issued = store.issue_many([(Difficulty.MAKE, OPTION)] * 3)
+
+    assert store.sweep(now=issued[0].created_at + 30) == 0
+    assert store.stats()["evicted"] == 1
+    assert store.sweep(now=issued[0].created_at + 90) == 2
+    assert len(store) == 0
+
+
+def test_sqlite_scoreboard_matches_memory_scoreboard(tmp_path):
+    memory = ScoreBoard(max_entries=2)
+    sqlite = SQLiteScoreBoard(SQLiteDatabase(tmp_path / "db.sqlite3"), max_entries=2)
+    attempts = [
+        ("alice", Difficulty.MAKE, True),
+        ("alice", Difficulty.MAKE_MODEL, True),
+        ("alice", Difficulty.MAKE_MODEL_YEAR, True),
+        ("bob", Difficulty.MAKE_MODEL_YEAR, True),
+        ("alice", Difficulty.MAKE, False),
+        ("carol", Difficulty.MAKE, False),
+    ]
+    for player, difficulty, correct in attempts:
+        expected = memory.register_attempt(player, difficulty, correct)
+        actual = sqlite.register_attempt(player, difficulty, correct)
+        assert actual == expected
+
+    assert sqlite.top_entries() == memory.top_entries()
+    for window in LeaderboardWindow:
+        for difficulty in (None, Difficulty.MAKE):
+            assert sqlite.top_entries(window, difficulty) == memory.top_entries(window, difficulty)
+    assert sqlite.reset() == 3
+    assert sqlite.top_entries() == []
+
+
+def test_sqlite_register_attempt_rolls_back_on_failure(tmp_path):
+    database = SQLiteDatabase(tmp_path / "db.sqlite3")
+    board = SQLiteScoreBoard(database)
+    board.register_attempt("alice", Difficulty.MAKE, True)
+    database.connection().execute(
+        "CREATE TRIGGER fail_bucket BEFORE INSERT ON score_buckets BEGIN SELECT RAISE(ABORT, 'boom'); END"
+    )
+
+    with pytest.raises(sqlite3.IntegrityError):
+        board.register_attempt("alice", Difficulty.MAKE, True)
+    with pytest.raises(sqlite3.IntegrityError):
+        board.register_attempt("bob", Difficulty.MAKE, True)
+
+    database.connection().execute("DROP TRIGGER fail_bucket")
+    record = board.register_attempt("alice", Difficulty.MAKE, False)
+    assert (record.total_correct, record.total_attempts) == (1, 2)
+    assert [entry.player for entry in board.top_entries()] == ["alice"]
+
+
+def test_answer_with_sqlite_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("CAR_PICKER_STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("CAR_PICKER_SQLITE_PATH", str(tmp_path / "app.sqlite3"))
+    with TestClient(create_app()) as client:
+        question = client.get("/api/question", params={"difficulty": "make"}).json()
+        payload = {"qid": question["qid"], "difficulty": "make", "answer": question["correct"], "player": "dana"}
+
+        assert client.post("/api/answer", json=payload).json()["correct"] is True
+        assert client.post("/api/answer", json=payload).status_code == 404
+        assert client.get("/api/leaderboard").json()["entries"][0]["player"] == "dana"
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from car_picker.app.models import Difficulty, QuizOption
+from car_picker.app.store import QuestionStore
+
+OPTION = QuizOption(make="Audi", label="Audi")
+
+
+def test_store_evicts_oldest_and_counts():
+    store = QuestionStore(limit=2, sweep_interval_seconds=0)
+    first = store.issue(Difficulty.MAKE, OPTION)
+    second = store.issue(Difficulty.MAKE, OPTION)
+    third = store.issue(Difficulty.MAKE, OPTION)
+
+    assert store.resolve(first.qid) is None
+    assert store.resolve(second.qid) is second
+    assert store.resolve(third.qid) is third
+    stats = store.stats()
+    assert stats["evicted"] == 1
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    assert stats["size"] == 0
+
+
+def test_store_sweep_removes_only_expired():
+    store = QuestionStore(limit=10, ttl_seconds=60, sweep_interval_seconds=0)
+    old = store.issue(Difficulty.MAKE, OPTION)
+    fresh = store.issue(Difficulty.MAKE, OPTION)
+    fresh.created_at = old.created_at + 120
+
+    assert store.sweep(now=old.created_at + 90) == 1
+    assert store.resolve(old.qid) is None
+    assert store.resolve(fresh.qid) is fresh
+    assert store.stats()["expired"] == 1
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from car_picker.app.images import content_digest
+from car_picker.app.thumbnails import ThumbnailService
+
+
+def _write_jpeg(path: Path, size: tuple[int, int] = (800, 400)) -> None:
+    Image.new("RGB", size, color=(200, 30, 30)).save(path, "JPEG")
+
+
+def test_pregenerate_creates_cached_widths(tmp_path: Path):
+    data_dir = tmp_path / "cars"
+    data_dir.mkdir()
+    _write_jpeg(data_dir / "Audi_A5_2013_40_Sedan_AAA.jpg")
+    service = ThumbnailService(data_dir, tmp_path / "cache", [100, 200], max_workers=1)
+    try:
+        assert service.pregenerate([("Audi_A5_2013_40_Sedan_AAA.jpg", None)]) == 2
+        assert service.pregenerate([("Audi_A5_2013_40_Sedan_AAA.jpg", None)]) == 0
+    finally:
+        service.shutdown()
+
+    source = service.source_path("Audi_A5_2013_40_Sedan_AAA.jpg")
+    with Image.open(service.target_for(content_digest(source), 200)) as thumbnail:
+        assert thumbnail.size == (200, 100)
+    assert service.source_path("../cars/Audi_A5_2013_40_Sedan_AAA.jpg") is not None
+    assert service.source_path("../../etc/passwd") is None
+
+
+def test_question_payload_carries_srcset(fastapi_app):
+    with TestClient(fastapi_app) as client:
+        question = client.get("/api/question", params={"difficulty": "make"}).json()
+        candidates = [item.split(" ")[0] for item in question["imageSrcset"].split(", ")]
+        assert len(candidates) == 3
+
+        # 샘플 파일은 JPEG 헤더뿐이라 디코딩할 수 없다.
+        assert client.get(candidates[0]).status_code == 415
+        assert client.get("/api/thumbnails/123/abc/whatever.jpg").status_code == 404
+        width, digest, relative_path = candidates[0].split("/", 5)[3:]
+        assert client.get(f"/api/thumbnails/{width}/%2E%2E/{relative_path}").status_code == 404
+        assert client.get(f"/api/thumbnails/{width}/{digest.upper()}/{relative_path}").status_code == 404
+
+
+def test_broken_process_pool_is_rebuilt(fastapi_app, monkeypatch):
+    class BrokenExecutor(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker died")
+
+    with TestClient(fastapi_app) as client:
+        question = client.get("/api/question", params={"difficulty": "make"}).json()
+        url = question["imageSrcset"].split(" ")[0]
+        thumbnails = fastapi_app.state.thumbnails
+        broken = BrokenExecutor(max_workers=1)
+        thumbnails._executor = broken
+        assert client.get(url).status_code == 415
+        assert thumbnails._executor is None
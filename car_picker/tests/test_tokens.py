@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+
+from fastapi.testclient import TestClient
+
+from car_picker.app.main import create_app
+from car_picker.app.models import Difficulty, QuizOption
+from car_picker.app.tokens import SignedQuestionTokens
+
+OPTION = QuizOption(make="Audi", model="A5", year="2013", label="Audi A5 2013")
+
+
+def test_token_roundtrip_and_replay_protection():
+    tokens = SignedQuestionTokens(b"secret")
+    issued = tokens.issue(Difficulty.MAKE_MODEL_YEAR, OPTION)
+
+    resolved = SignedQuestionTokens(b"secret").resolve(issued.qid)
+    assert resolved is not None
+    assert resolved.difficulty is Difficulty.MAKE_MODEL_YEAR
+    assert resolved.correct == OPTION
+
+    assert tokens.resolve(issued.qid) is not None
+    assert tokens.resolve(issued.qid) is None
+    assert tokens.stats()["replayed"] == 1
+
+
+def test_token_rejects_tampering_and_expiry(monkeypatch):
+    tokens = SignedQuestionTokens(b"secret", ttl_seconds=60)
+    issued = tokens.issue(Difficulty.MAKE, QuizOption(make="Audi", label="Audi"))
+
+    assert SignedQuestionTokens(b"other").resolve(issued.qid) is None
+    assert tokens.resolve(issued.qid[:-2] + "AA") is None
+    assert tokens.resolve("not-a-token") is None
+
+    monkeypatch.setattr(time, "time", lambda: issued.created_at + 120)
+    assert tokens.resolve(issued.qid) is None
+    assert tokens.stats()["expired"] == 1
+
+
+def test_full_replay_cache_rejects_instead_of_forgetting(monkeypatch):
+    tokens = SignedQuestionTokens(b"secret", ttl_seconds=60, replay_cache_size=2)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    # 나중에 발급한 토큰이 먼저 만료되도록 발급 시각을 섞는다.
+    first = tokens.issue(Difficulty.MAKE, OPTION)
+    monkeypatch.setattr(time, "time", lambda: now - 30)
+    older = tokens.issue(Difficulty.MAKE, OPTION)
+    monkeypatch.setattr(time, "time", lambda: now)
+    extra = tokens.issue(Difficulty.MAKE, OPTION)
+
+    assert tokens.resolve(first.qid) is not None
+    assert tokens.resolve(older.qid) is not None
+    assert tokens.resolve(extra.qid) is None
+    assert tokens.resolve(first.qid) is None
+    assert tokens.resolve(older.qid) is None
+    assert tokens.stats()["rejected"] == 1
+    assert tokens.stats()["replayed"] == 2
+
+    # 먼저 만료되는 nonce만 정리되고, 아직 유효한 토큰은 계속 재사용을 막는다.
+    monkeypatch.setattr(time, "time", lambda: now + 31)
+    assert tokens.resolve(older.qid) is None
+    assert tokens.resolve(first.qid) is None
+    assert tokens.resolve(extra.qid) is not None
+    assert len(tokens) == 2
+
+
+def test_answer_in_token_mode(monkeypatch):
+    monkeypatch.setenv("CAR_PICKER_QUESTION_MODE", "token")
+    monkeypatch.setenv("CAR_PICKER_QUESTION_TOKEN_SECRET", "test-secret")
+    with TestClient(create_app()) as client:
+        question = client.get("/api/question", params={"difficulty": "make_model"}).json()
+        payload = {"qid": question["qid"], "difficulty": "make_model", "answer": question["correct"]}
+
+        assert client.post("/api/answer", json=payload).json()["correct"] is True
+        assert client.post("/api/answer", json=payload).status_code == 404
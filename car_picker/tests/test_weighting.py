@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from car_picker.app.indexer import CarDataset, parse_relative_path
+from car_picker.app.sampler import pick_row
+from car_picker.app.weighting import AliasTable, SamplingPolicy
+
+
+def test_alias_table_follows_weights():
+    random.seed(7)
+    table = AliasTable([1.0, 0.0, 2.0, 7.0])
+    counts = Counter(table.draw() for _ in range(20000))
+
+    assert counts[1] == 0
+    assert counts[0] / 20000 == pytest.approx(0.1, abs=0.02)
+    assert counts[2] / 20000 == pytest.approx(0.2, abs=0.02)
+    assert counts[3] / 20000 == pytest.approx(0.7, abs=0.02)
+    with pytest.raises(ValueError):
+        AliasTable([0.0, 0.0])
+
+
+@pytest.fixture
+def skewed_dataset(tmp_path):
+    names = [f"Audi_A4_2015_40_Sedan_A{index:03d}.jpg" for index in range(90)]
+    names += [f"Audi_Q5_2016_40_SUV_Q{index:03d}.jpg" for index in range(8)]
+    names += ["BMW_X5_2016_40_SUV_BBB.jpg", "Kia_Rio_2017_40_Sedan_KKK.jpg"]
+    return CarDataset.from_names(tmp_path, names)
+
+
+def _draw(dataset, policy, count):
+    sampler = dataset.stratified_sampler(policy)
+    return [dataset.entry_at(pick_row(dataset, set(), sampler=sampler)) for _ in range(count)]
+
+
+def test_make_policy_is_uniform_over_makes(skewed_dataset):
+    random.seed(3)
+    makes = Counter(entry.make for entry in _draw(skewed_dataset, SamplingPolicy.load("make"), 3000))
+    for make in ("Audi", "BMW", "Kia"):
+        assert makes[make] / 3000 == pytest.approx(1 / 3, abs=0.05)
+
+    models = Counter(entry.model for entry in _draw(skewed_dataset, SamplingPolicy.load("model"), 4000))
+    assert models["A4"] / 4000 == pytest.approx(0.25, abs=0.05)
+
+
+def test_alias_table_reused_until_strata_change(skewed_dataset):
+    policy = SamplingPolicy.load("make")
+    sampler = skewed_dataset.stratified_sampler(policy)
+
+    updated = skewed_dataset.apply_delta([parse_relative_path("BMW_X5_2017_40_SUV_BBC.jpg")], set())
+    assert updated.stratified_sampler(policy).table is sampler.table
+
+    updated = updated.apply_delta([], {"Kia_Rio_2017_40_Sedan_KKK.jpg"})
+    assert updated.stratified_sampler(policy).table is not sampler.table
+    assert {entry.make for entry in _draw(updated, policy, 50)} == {"Audi", "BMW"}
+
+
+def test_weights_policy_from_file(tmp_path, skewed_dataset):
+    path = tmp_path / "weights.json"
+    path.write_text(json.dumps({"makes": {"Kia": 0}, "models": {"Audi": {"A4": 0}}}), encoding="utf-8")
+    policy = SamplingPolicy.load("weights", path)
+
+    picked = {entry.model for entry in _draw(skewed_dataset, policy, 200)}
+    assert picked == {"Q5", "X5"}
+
+    path.write_text(json.dumps({"makes": {"Kia": -1}}), encoding="utf-8")
+    with pytest.raises(ValueError, match="가중치"):
+        SamplingPolicy.load("weights", path)
+
+    path.write_text(json.dumps({"makes": {"Audi": 0, "BMW": 0, "Kia": 0}}), encoding="utf-8")
+    with pytest.raises(ValueError, match="사용 가능한 항목"):
+        _draw(skewed_dataset, SamplingPolicy.load("weights", path), 1)